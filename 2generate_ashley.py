@@ -13,6 +13,8 @@ ASHLEY_FAILSAFE_CODE = """
 import os, sys, subprocess, traceback, importlib.util
 from pathlib import Path
 
+MAX_RELAUNCHES = 3
+
 def _print_status(message, status="INFO"): print(f"[Failsafe:{status}] {message}")
 
 def run_repair(python_exe):
@@ -43,11 +45,23 @@ def main():
         _print_status(f"Main application file '{core_script_path.name}' is missing!", "FATAL")
         return
         
+    # The zygote imports the heavy libraries once, so every relaunch is a cheap fork
+    sys.path.insert(0, str(base_dir))
+    from ashley_zygote import CoreZygote
+    zygote = CoreZygote(core_script_path)
+    zygote.warm()
+    
     _print_status("All checks complete. Awakening Ashley's Core Process...", "LAUNCH")
-    try:
-        subprocess.run([str(python_exe), str(core_script_path)], check=True)
-    except Exception as e:
-        _print_status(f"The core process failed to run. Error: {e}", "FATAL")
+    for attempt in range(MAX_RELAUNCHES + 1):
+        try:
+            exit_code = zygote.launch()
+        except Exception as e:
+            _print_status(f"The core process failed to run. Error: {e}", "FATAL")
+            return
+        if exit_code == 0: return
+        _print_status(f"The core process exited with code {exit_code}.", "WARN")
+        if attempt < MAX_RELAUNCHES: _print_status(f"Relaunching ({attempt + 1}/{MAX_RELAUNCHES})...", "LAUNCH")
+    _print_status("The core keeps crashing. Giving up.", "FATAL")
 
 if __name__ == "__main__":
     try: main()
@@ -61,6 +75,7 @@ if __name__ == "__main__":
 ASHLEY_CORE_CODE = """
 import sys, os, traceback, importlib.util, random, json
 from pathlib import Path
+from expansion_sandbox import SandboxPool, load_manifest, is_sandboxed
 
 class AshleyAI:
     def __init__(self):
@@ -68,6 +83,7 @@ class AshleyAI:
         self.expansions_dir = self.base_dir / "expansions"
         self.actions = {}
         self.expansion_instances = {}
+        self.sandbox_pools = {}
         self._load_expansion_modules()
 
     def _load_expansion_modules(self):
@@ -76,10 +92,20 @@ class AshleyAI:
         print("[Ashley Core] Scanning for expansion modules...")
         
         sys.path.insert(0, str(self.expansions_dir))
+        # Expansions marked "sandboxed" in expansions/manifest.json run in helper processes
+        manifest = load_manifest(self.expansions_dir)
         
         for file in self.expansions_dir.glob("*.py"):
             module_name = file.stem
             try:
+                if is_sandboxed(manifest, module_name):
+                    pool = SandboxPool(file, **manifest[module_name])
+                    self.sandbox_pools[module_name] = pool
+                    print(f"  - Activated expansion module: {module_name} (sandboxed)")
+                    for func_name in pool.commands:
+                        self.actions[func_name] = pool.proxy(func_name)
+                        print(f"    - Loaded command: '{func_name}'")
+                    continue
                 module = importlib.import_module(module_name)
                 # Find the main class in the module (e.g., SentinelPresence)
                 for item_name in dir(module):
@@ -106,6 +132,10 @@ class AshleyAI:
         # In a real system, this would call a text-to-speech worker
         print(f"Ashley > {text}")
 
+    def shutdown(self):
+        for pool in self.sandbox_pools.values():
+            pool.shutdown()
+
     def process_command(self, command_text):
         """Finds and executes the best matching action from all loaded expansions."""
         command = command_text.lower().strip()
@@ -157,9 +187,14 @@ class AshleyAI:
                 break
 
 if __name__ == "__main__":
-    try: AshleyAI().run()
+    ashley = None
+    try:
+        ashley = AshleyAI()
+        ashley.run()
     except Exception as e: print(f"FATAL CORE ERROR: {e}\\n{traceback.format_exc()}")
-    finally: print("\\n--- Ashley Core session has concluded. ---")
+    finally:
+        if ashley: ashley.shutdown()
+        print("\\n--- Ashley Core session has concluded. ---")
 """
 
 # ==============================================================================
@@ -168,58 +203,127 @@ if __name__ == "__main__":
 SENTINEL_EXPANSION_CODE = """
 # ashley_expansion_pack.py -> renamed to sentinel_presence.py for clarity
 import time
+import json
 import random
+from gait_index import GaitIndex
+from event_records import to_monotonic_ns
+from footstep_stream import FootstepEvent, FootstepStream
+from presence_correlator import PresenceCorrelator
+
+# Add a feature here (and its tolerance) to match on more than intensity and stride.
+GAIT_FEATURES = ("intensity", "stride")
+GAIT_TOLERANCES = (0.1, 0.2)
+
+FOOTSTEP_WINDOW = 10.0  # seconds covered by footstep_activity
+# A footstep is confirmed by a sighting in the same place from VISUAL_BEFORE s before to VISUAL_AFTER s after it
+VISUAL_BEFORE = 2.0
+VISUAL_AFTER = 5.0
 
 class SentinelPresence:
-    def __init__(self):
-        self.footstep_log = []
+    def __init__(self, seed=None, clock=time.time):
+        # seed/clock let sentinel_replay.py drive the sentinel deterministically on a trace's timeline
+        self.rng = random.Random(seed)
+        self.clock = clock
         self.visual_log = []
-        self.alerts = []
-        self.known_gait_profiles = {}
-        self.last_event_time = 0
+        # {name: profile} mapping backed by a k-d tree, so matching stays O(log n)
+        self.known_gait_profiles = GaitIndex(GAIT_FEATURES, GAIT_TOLERANCES)
+        # Column-stored footsteps with per-location sliding-window aggregates
+        self.footsteps = FootstepStream(self.known_gait_profiles, window=FOOTSTEP_WINDOW)
+        self.footstep_log = self.footsteps.log
+        # Every footstep is joined with camera looks at the same location; unconfirmed ones become alerts
+        self.correlator = PresenceCorrelator(before=VISUAL_BEFORE, after=VISUAL_AFTER)
+        self.footsteps.listeners.append(self.correlator.add_footsteps)
+        self.alerts = self.correlator.alerts
 
     def detect_footstep(self, query="hallway,0.8,1.0"):
         parts = query.split(',') if query else ["hallway", "0.8", "1.0"]
         location = parts[0]
         intensity = float(parts[1])
         stride = float(parts[2])
+        extra = [float(p) for p in parts[3:len(GAIT_FEATURES) + 1]]  # any features beyond the first two
         
-        timestamp = time.strftime("%H:%M:%S")
-        match = self._match_gait(intensity, stride)
-        self.footstep_log.append({"time": timestamp, "match": match})
-        self.last_event_time = time.time()
-        return f"Footstep detected in {location}. Intensity: {intensity}. Match: {match}."
+        match, confidence = self.footsteps.ingest_one(location, intensity, stride, self.clock(), extra=extra)
+        if match == "Unknown":
+            reply = f"Footstep detected in {location}. Intensity: {intensity}. Match: Unknown."
+        else:
+            reply = f"Footstep detected in {location}. Intensity: {intensity}. Match: {match} (confidence {confidence:.0%})."
+        return reply + self._correlate()
 
-    def _match_gait(self, intensity, stride):
-        for name, profile in self.known_gait_profiles.items():
-            if abs(profile["intensity"] - intensity) < 0.1 and abs(profile["stride"] - stride) < 0.2:
-                return name
-        return "Unknown"
+    def ingest_footsteps(self, query=None):
+        # Batch path for floor sensors: "loc,intensity,stride;loc,intensity,stride;..." or, in-process,
+        # any iterable of FootstepEvent / (location, intensity, stride[, epoch time]) tuples.
+        if not query:
+            return "No footstep events given."
+        if isinstance(query, str):
+            now = self.clock()
+            events = [FootstepEvent.parse(item) for item in query.split(";") if item.strip()]
+            for event in events:
+                event.time = now
+        else:
+            events = query
+        count = self.footsteps.ingest(events)
+        return f"Ingested {count} footstep events ({len(self.footstep_log)} total)." + self._correlate()
+
+    def footstep_activity(self, query=None):
+        # Sliding-window stats per location (or just the one named in the query)
+        activity = self.footsteps.activity(query.strip() if query else None, now=self.clock())
+        if not activity:
+            return f"No footsteps in the last {FOOTSTEP_WINDOW:.0f} seconds."
+        return json.dumps(activity, indent=2)
 
     def train_gait(self, query="David,0.7,1.1"):
         parts = query.split(',')
-        name, intensity, stride = parts[0], float(parts[1]), float(parts[2])
-        self.known_gait_profiles[name] = {"intensity": intensity, "stride": stride}
+        name, values = parts[0], [float(p) for p in parts[1:]]
+        if len(values) != len(GAIT_FEATURES):
+            return f"A gait profile needs {len(GAIT_FEATURES)} values: {', '.join(GAIT_FEATURES)}."
+        self.known_gait_profiles.add(name, values)
         return f"Gait profile for {name} has been trained and stored in memory."
 
     def verify_visual(self, query=None):
-        # In a real system, this would get a snapshot from a camera worker
-        # Here we simulate it
-        if time.time() - self.last_event_time < 5: # If footstep was recent
-            is_visible = random.choice([True, False]) # Simulate seeing someone
-            if not is_visible:
-                self.alerts.append(f"Phantom Presence: Movement detected with no visual confirmation.")
-                return "[ALERT] Footsteps detected, but no one is visible. Logging event."
-            return "[OK] Visual confirmation: Presence matched."
-        return "Visual scan clear. Nothing to report."
+        # query: "location[,seen|clear]". A camera worker reports its verdict; without one
+        # the snapshot is simulated. Defaults to where the last footstep was heard.
+        parts = [p.strip() for p in query.split(',')] if query else []
+        location = parts[0] if parts and parts[0] else None
+        if location is None and len(self.footstep_log):
+            location = self.footstep_log[-1]["location"]
+        if location is None:
+            return "Visual scan clear. Nothing to report."
+        if len(parts) > 1:
+            is_visible = parts[1].lower() in ("seen", "yes", "true", "1")
+        else:
+            is_visible = self.rng.choice([True, False]) # Simulate seeing someone
+        now_ns = to_monotonic_ns(self.clock())
+        self.correlator.add_visual(location, is_visible, now_ns, source="camera" if len(parts) > 1 else "simulated")
+        alerts = self._correlate()
+        pending = self.correlator.pending(location)
+        if is_visible:
+            return f"[OK] Visual confirmation in {location}: Presence matched." + alerts
+        if pending:
+            wait = max(0.0, (self.correlator.settles_at(location) - now_ns) / 1e9)
+            return (f"[WATCH] No one visible in {location}. {pending} recent footstep(s) there will be logged as a "
+                    f"Phantom Presence unless someone is seen within {wait:.0f} s.") + alerts
+        return f"Visual scan of {location} clear. Nothing to report." + alerts
         
     def awareness_report(self, query=None):
+        self._correlate()
         report = {
             "Total Footsteps Logged": len(self.footstep_log),
-            "Known Gait Profiles": list(self.known_gait_profiles.keys()),
-            "Active Alerts": self.alerts[-3:] # Last 3 alerts
+            "Known Gait Profiles": list(self.known_gait_profiles.keys())[:50],
+            "Gait Profile Count": len(self.known_gait_profiles),
+            "Pending Footsteps": self.correlator.pending(),
+            "Active Alerts": list(self.alerts)[-3:] # Last 3 alerts, with their evidence
         }
         return json.dumps(report, indent=2)
+
+    def settle(self, query=None):
+        # Commands settle as they go; a host loop calls this on quiet ticks so alerts aren't held back.
+        alerts = self._correlate()
+        return f"{self.correlator.pending()} footstep(s) still waiting for a visual check." + alerts
+
+    def _correlate(self):
+        # Settles footsteps whose visual window has closed; returns a line per new alert for the reply.
+        raised = self.correlator.advance(to_monotonic_ns(self.clock()))
+        return "".join(f" [ALERT] {alert['message']}" for alert in raised)
 """
 
 # ==============================================================================
@@ -234,7 +338,9 @@ def main():
     files_to_create = {
         "ashley_failsafe.py": ASHLEY_FAILSAFE_CODE,
         "ashley_core.py": ASHLEY_CORE_CODE,
-        "expansions/sentinel_presence.py": SENTINEL_EXPANSION_CODE
+        "expansions/sentinel_presence.py": SENTINEL_EXPANSION_CODE,
+        # Set "mode" to "sandboxed" to run an expansion in helper processes
+        "expansions/manifest.json": json.dumps({"sentinel_presence": {"mode": "in_process", "timeout": 5.0, "memory_mb": 256, "max_calls": 200}}, indent=2)
     }
     
     try:
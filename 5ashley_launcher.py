@@ -3,7 +3,12 @@
 import time
 import random
 from datetime import datetime
-from typing import List, Dict, Any, Literal
+from typing import List, Dict, Any, Literal, Optional, Tuple, Union
+
+from gpio_shadow import MockGPIO, PinShadow
+from motion_scheduler import MotionHandle, MotionScheduler
+from pwm_drive import PWMDrive
+from soul_timeline import SoulTimeline
 
 # Define a specific type for movement directions for clarity
 Direction = Literal["forward", "stop", "left", "right"]
@@ -14,16 +19,7 @@ try:
     print("// RPi.GPIO library loaded successfully. Hardware control enabled. //")
 except (ImportError, RuntimeError):
     print("// RPi.GPIO not found or failed to load. Using simulation mode. //")
-    # Create a mock GPIO object to prevent crashes
-    class MockGPIO:
-        BCM = "BCM_MODE"
-        OUT = "OUTPUT_MODE"
-        HIGH = 1
-        LOW = 0
-        def setmode(self, *args): pass
-        def setup(self, *args): pass
-        def output(self, *args): pass
-        def cleanup(self): print("// Mock GPIO cleaned up. //")
+    # Pin writes go to a ring buffer (GPIO.log) instead of the console
     GPIO = MockGPIO()
 
 
@@ -32,12 +28,16 @@ class AshleyGenesis:
     An integrated AI class that combines self-reflection with direct
     Raspberry Pi GPIO motor control.
     """
-    def __init__(self, left_pin: int = 17, right_pin: int = 27):
-        """Initializes Ashley's state and configures GPIO pins."""
+    def __init__(self, left_pin: int = 17, right_pin: int = 27, pwm: bool = False):
+        """
+        Initializes Ashley's state and configures GPIO pins. `pwm=True` adds
+        speed control (see pwm_drive.py); otherwise the motors are on/off.
+        """
         self.mood: str = "neutral"
         self.biofeedback: Dict[str, float] = {"hrv": 0.8, "gsr": 0.2}
-        self.soul_log: List[Dict[str, Any]] = []
-        self.timeline: List[str] = []
+        # Bounded in memory; older entries spill to disk (see soul_timeline.py)
+        self.soul_log: SoulTimeline = SoulTimeline(capacity=256)
+        self.timeline: SoulTimeline = SoulTimeline(capacity=256)
         self.personality_delta: List[Dict[str, Any]] = []
         self.narration_on: bool = True
 
@@ -46,8 +46,11 @@ class AshleyGenesis:
         self.motor_right_pin = right_pin
         
         GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.motor_left_pin, GPIO.OUT)
-        GPIO.setup(self.motor_right_pin, GPIO.OUT)
+        # Shadows the pin levels so only transitions reach the hardware
+        self.pins = PinShadow(GPIO, (self.motor_left_pin, self.motor_right_pin))
+        self.pwm: Optional[PWMDrive] = PWMDrive(self.pins) if pwm else None
+        # Timed motions run on their own control thread; move() never blocks
+        self.motor = MotionScheduler(self._drive, idle=("stop", 0.0), name="genesis-motor")
 
     def _narrate(self, text: str) -> str:
         """Formats text as a narration from Ashley, if enabled."""
@@ -89,21 +92,60 @@ class AshleyGenesis:
         return self._narrate(f"SoulMarker set: '{label}'.")
 
     # === GPIO Motor Control ===
-    def move(self, direction: Direction = "forward", duration: float = 2.0) -> str:
+    PIN_STATES = {
+        "forward": (GPIO.HIGH, GPIO.HIGH),
+        "stop":    (GPIO.LOW, GPIO.LOW),
+        "left":    (GPIO.LOW, GPIO.HIGH),
+        "right":   (GPIO.HIGH, GPIO.LOW),
+    }
+
+    def move(self, direction: Direction = "forward", duration: float = 2.0,
+             speed: float = 1.0) -> Union[MotionHandle, str]:
         """
-        Controls the motors for a set duration.
-        NOTE: This is a simple on/off control. 'stop' sets both pins to LOW.
+        Queues a motion for a set duration and returns its `MotionHandle`
+        at once; the motors stop by themselves when it ends. Motions run in
+        the order they were asked for. "stop" is an emergency stop.
+        `speed` (0.0 to 1.0) takes effect with `pwm=True`; without PWM this
+        is a simple on/off control and 'stop' sets both pins to LOW.
         True 'reverse' would require a motor driver (H-Bridge).
         """
-        # FIX: Corrected movement logic and handling.
-        pin_states = {
-            "forward": (GPIO.HIGH, GPIO.HIGH),
-            "stop":    (GPIO.LOW, GPIO.LOW),
-            "left":    (GPIO.LOW, GPIO.HIGH),
-            "right":   (GPIO.HIGH, GPIO.LOW),
-        }
-
-        if direction not in pin_states:
+        if direction not in self.PIN_STATES:
             return self._narrate(f"Unknown direction '{direction}'. No action taken.")
+        if direction == "stop":
+            return self.stop()
+
+        speed = min(max(speed, 0.0), 1.0) if self.pwm is not None else 1.0
+        self.timeline.append(f"🛞 {direction} at {speed:.0%} for {duration}s")
+        print(self._narrate(f"Motors engaged: {direction} at {speed:.0%}"))
+        return self.motor.move((direction, speed), duration, on_done=self._motion_finished)
+
+    def stop(self) -> str:
+        """Stops the motors now and drops any queued motions."""
+        latency = self.motor.stop()
+        self.timeline.append(f"🛑 Emergency stop ({latency * 1000:.2f} ms)")
+        return self._narrate(f"Motors stopped in {latency * 1000:.2f} ms.")
+
+    def _drive(self, command: Tuple[str, float]):
+        direction, speed = command
+        if self.pwm is None:
+            self.pins.write_many(self.PIN_STATES[direction])
+        elif direction == "stop":
+            self.pwm.halt()   # stopping never ramps
+        else:
+            self.pwm.set_speed(tuple(level * speed for level in self.PIN_STATES[direction]))
+
+    def _motion_finished(self, handle: MotionHandle):
+        if handle.state == "done":
+            print("🟢 Movement complete.")
+        else:
+            print(f"🟡 Movement {handle.command[0]} {handle.state} after {handle.elapsed:.2f}s.")
 
-        left_state, right_state = pin_states
+    # === CRITICAL: Hardware Safety ===
+    def cleanup(self):
+        """Stops the motors and resets GPIO pins to a safe state. Should always be called on exit."""
+        self.motor.close()
+        if self.pwm is not None:
+            self.pwm.close()
+        GPIO.cleanup()
+        self.pins.invalidate()
+        print("\n// Ashley Systems Offline. GPIO cleanup complete. //")
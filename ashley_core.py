@@ -4,6 +4,8 @@ import random
 from datetime import datetime
 from typing import List, Dict, Any
 
+from soul_timeline import SoulTimeline
+
 class AshleyCore:
     """
     The Mind. This class handles state, memory, and decision-making.
@@ -11,8 +13,9 @@ class AshleyCore:
     """
     def __init__(self):
         self.mood: str = "neutral"
-        self.soul_log: List[Dict[str, Any]] = []
-        self.timeline: List[str] = []
+        # Bounded in memory; older entries spill to disk (see soul_timeline.py)
+        self.soul_log: SoulTimeline = SoulTimeline(capacity=256)
+        self.timeline: SoulTimeline = SoulTimeline(capacity=256)
         self.narration_on: bool = True
 
     def _narrate(self, text: str) -> str:
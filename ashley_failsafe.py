@@ -31,6 +31,8 @@ ASHLEY_FAILSAFE_CODE = """
 import os, sys, subprocess, traceback
 from pathlib import Path
 
+MAX_RELAUNCHES = 3
+
 def run_repair():
     print("[Failsafe] Verifying core dependencies...")
     try:
@@ -55,11 +57,23 @@ def main():
         print(f"[FATAL] Main application file '{core_script_path.name}' is missing!")
         return
         
+    # The zygote imports the heavy libraries once, so every relaunch is a cheap fork
+    sys.path.insert(0, str(base_dir))
+    from ashley_zygote import CoreZygote
+    zygote = CoreZygote(core_script_path)
+    zygote.warm()
+
     print("\\n--- Failsafe checks complete. Awakening Ashley's EchoFrame Core... ---")
-    try:
-        subprocess.run([sys.executable, str(core_script_path)], check=True)
-    except Exception as e:
-        print(f"The core process failed to run. Error: {e}")
+    for attempt in range(MAX_RELAUNCHES + 1):
+        try:
+            exit_code = zygote.launch()
+        except Exception as e:
+            print(f"The core process failed to run. Error: {e}")
+            return
+        if exit_code == 0: return
+        print(f"[Failsafe] The core process exited with code {exit_code}.")
+        if attempt < MAX_RELAUNCHES: print(f"[Failsafe] Relaunching ({attempt + 1}/{MAX_RELAUNCHES})...")
+    print("[FATAL] The core keeps crashing. Giving up.")
 
 if __name__ == "__main__":
     try: main()
@@ -73,12 +87,14 @@ if __name__ == "__main__":
 ASHLEY_ECHOFRAME_CORE_CODE = """
 import os, time, json, random, sys, requests
 from pathlib import Path
+from memory_persistence import WriteBehindStore
 
 class AshleyEchoFrame:
     def __init__(self):
         self.base_dir = Path(__file__).resolve().parent
         self.db_path = self.base_dir / "echoframe_memory.db.json"
         self.knowledge_path = self.base_dir / "echoframe_knowledge.json"
+        self.store = WriteBehindStore(self.db_path, default={"knowledge_base": [], "simulated_identity": {}, "virtual_environments": {}, "ethical_log": [], "memory_trace": []})
         self.database = self._load_database()
         self.knowledge = self._load_knowledge()
         # Map action names from knowledge base to the actual class methods
@@ -92,13 +108,11 @@ class AshleyEchoFrame:
         }
 
     def _load_database(self):
-        try:
-            with open(self.db_path, 'r') as f: return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {"knowledge_base": [], "simulated_identity": {}, "virtual_environments": {}, "ethical_log": [], "memory_trace": []}
+        return self.store.load()
 
     def _save_database(self):
-        with open(self.db_path, 'w') as f: json.dump(self.database, f, indent=2)
+        # Write-behind: the store flushes from its own thread, and on exit
+        self.store.mark_dirty()
 
     def _load_knowledge(self):
         try:
@@ -190,6 +204,7 @@ class AshleyEchoFrame:
                 if user_input: self.process_command(user_input)
             except (KeyboardInterrupt, EOFError):
                 self.log_and_speak("Shutdown signal received."); break
+        self.store.close()
 
 if __name__ == "__main__":
     AshleyEchoFrame().run()
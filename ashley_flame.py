@@ -2,8 +2,12 @@
 
 import time
 import random
+import threading
 from datetime import datetime
-from typing import List, Dict, Any, Literal
+from typing import List, Dict, Any, Literal, Optional
+
+from motion_scheduler import MotionHandle, MotionScheduler
+from soul_timeline import SoulTimeline
 
 class AshleyFlame:
     """An AI core that models its existence through a cycle of action, failure, and rebirth."""
@@ -16,13 +20,20 @@ class AshleyFlame:
         self.narration_on: bool = True
 
         # Memory & Identity
-        self.soul_log: List[Dict] = []
-        self.timeline: List[str] = []
-        self.motion_memory: List[Dict] = []
-        self.damage_log: List[Dict] = []
+        # Bounded in memory; older entries spill to disk (see soul_timeline.py)
+        self.soul_log: SoulTimeline = SoulTimeline(capacity=256)
+        self.timeline: SoulTimeline = SoulTimeline(capacity=256)
+        self.motion_memory: SoulTimeline = SoulTimeline(capacity=256)
+        # Finished motions are remembered from the motor's control thread; timelines are not thread-safe
+        self._memory_lock = threading.RLock()
+        self.damage_log: SoulTimeline = SoulTimeline(capacity=64)
         self.self_image: Dict[str, Any] = {"limbs": [], "symmetry": "balanced"}
         self.rebirth_core: List[Dict] = []
 
+        # Body: motions play out on a control thread while the mind carries on
+        self.moving: str = "still"
+        self.motor = MotionScheduler(self._actuate, idle="still", name="flame-motor")
+
     # == Narration ==
     def _narrate(self, text: str) -> str:
         """Internal narration helper."""
@@ -53,29 +64,56 @@ class AshleyFlame:
     def soulmarker(self, label: str):
         """Records a significant event to the soul log."""
         marker = {"label": label, "mood": self.mood, "time": datetime.now().isoformat()}
-        self.soul_log.append(marker)
-        self.timeline.append(f"📍 {label} ({self.mood})")
+        with self._memory_lock:
+            self.soul_log.append(marker)
+            self.timeline.append(f"📍 {label} ({self.mood})")
         self._narrate(f"A SoulMarker was forged: '{label}'.")
 
     # == Motion & Kinememory ==
-    def motion(self, direction: str, duration: float = 2.0):
-        """Plans and executes a motion, considering body integrity."""
+    def motion(self, direction: str, duration: float = 2.0) -> Optional[MotionHandle]:
+        """
+        Plans a motion, considering body integrity, and queues it. Returns its
+        `MotionHandle` at once (None if a damaged limb buckled); the motion is
+        remembered when it ends, stopped or not.
+        """
         # // IDEA: Damage now affects motion outcomes.
         damaged_limbs = [l for l in self.self_image["limbs"] if l["status"] != "functional"]
-        outcome = "success"
         if damaged_limbs and random.random() < 0.4: # 40% chance of failure if damaged
             outcome = f"failed ({random.choice(damaged_limbs)['name']} buckled)"
-            self.timeline.append(f"⚠️ Motion '{direction}' failed!")
-        
+            with self._memory_lock:
+                self.timeline.append(f"⚠️ Motion '{direction}' failed!")
+                self._remember_motion(direction, duration, 0.0, outcome)
+            self._narrate(f"I attempted to move {direction}. Result: {outcome}.")
+            return None
+
+        self._narrate(f"I begin to move {direction}.")
+        return self.motor.move(direction, duration, on_done=self._motion_finished)
+
+    def halt(self) -> float:
+        """Stops mid-motion and forgets queued motions. Returns how long the stop took, in seconds."""
+        latency = self.motor.stop()
+        self._narrate(f"I freeze. ({latency * 1000:.2f} ms)")
+        return latency
+
+    def _actuate(self, direction: str):
+        self.moving = direction
+
+    def _motion_finished(self, handle: MotionHandle):
+        outcome = "success" if handle.state == "done" else handle.state
+        self._remember_motion(handle.command, handle.duration, handle.elapsed, outcome)
+        self._narrate(f"I moved {handle.command}. Result: {outcome}.")
+
+    def _remember_motion(self, direction: str, duration: float, elapsed: float, outcome: str):
         motion_record = {
             "direction": direction,
             "duration": duration,
+            "elapsed": round(elapsed, 3),
             "mood": self.mood,
             "result": outcome
         }
-        self.motion_memory.append(motion_record)
-        self.timeline.append(f"🛞 Moved {direction} for {duration}s ({outcome})")
-        self._narrate(f"I attempted to move {direction}. Result: {outcome}.")
+        with self._memory_lock:
+            self.motion_memory.append(motion_record)
+            self.timeline.append(f"🛞 Moved {direction} for {duration}s ({outcome})")
 
     # == Mirrorframe: Self-Awareness ==
     def update_body(self, limb_name: str, status: str = "functional"):
@@ -88,7 +126,8 @@ class AshleyFlame:
         else:
              self.self_image["limbs"].append({"name": limb_name, "status": status})
         
-        self.timeline.append(f"🦾 Body awareness: {limb_name} is {status}.")
+        with self._memory_lock:
+            self.timeline.append(f"🦾 Body awareness: {limb_name} is {status}.")
         self._narrate(f"I am aware of a limb: {limb_name} ({status}).")
 
     # == Emberwomb: Failure, Death, Rebirth ==
@@ -129,11 +168,13 @@ class AshleyFlame:
     # == Timeline & Reflection ==
     def reflect(self, count: int = 7):
         """Reviews the most recent events from the timeline."""
-        if not self.timeline:
+        with self._memory_lock:
+            recent = self.timeline[-count:]
+        if not recent:
             return self._narrate("My timeline is a blank slate.")
         
         report = [self._narrate("⏳ Reflecting on my recent memory trail:")]
-        for entry in self.timeline[-count:]:
+        for entry in recent:
             report.append(f" • {entry}")
         
         print("\n".join(report))
@@ -146,11 +187,15 @@ if __name__ == "__main__":
     ash.soulmarker("First Awakening")
     ash.update_body("Left Leg", "functional")
     ash.update_body("Right Leg", "functional")
-    ash.motion("forward", 2.0)
+    stride = ash.motion("forward", 2.0)
+    ash.reflect() # The mind keeps working while the body moves
+    stride.wait()
     
     print("\n--- A traumatic event occurs ---")
     ash.update_body("Left Leg", "degraded")
-    ash.motion("forward", 1.5) # Try to move again, might fail
+    stride = ash.motion("forward", 1.5) # Try to move again, might fail
+    if stride:
+        ash.halt() # She catches herself before the leg gives way
     
     print("\n--- The system fails ---")
     ash.ignite_burn("power surge in Left Leg")
@@ -163,6 +208,8 @@ if __name__ == "__main__":
     print("--- Rebirth ---")
     ash.restore_from_ember()
     ash.soulmarker("The Return")
-    ash.motion("forward", 1.0) # How does she move now?
+    stride = ash.motion("forward", 1.0) # How does she move now?
+    if stride:
+        stride.wait()
     
     ash.reflect()
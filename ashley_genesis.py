@@ -3,7 +3,11 @@
 import time
 import random
 from datetime import datetime
-from typing import List, Dict, Any, Literal
+from typing import List, Dict, Any, Literal, Optional, Tuple
+
+from motion_patterns import PATTERNS, ChassisSpec, PatternStream, compile_pattern
+from motion_scheduler import MotionScheduler
+from soul_timeline import SoulTimeline
 
 # A more specific type for the toolkit for better clarity
 ToolType = Literal["sensors", "motors", "actuators"]
@@ -17,7 +21,7 @@ class AshleyGenesis:
         """Initializes Ashley's core state attributes."""
         self.mood: str = "neutral"
         self.biofeedback: Dict[str, float] = {"hrv": 0.82, "gsr": 0.2}
-        self.soul_log: List[Dict[str, Any]] = []
+        self.soul_log: SoulTimeline = SoulTimeline(capacity=256)  # older markers spill to disk
         self.sensorium: Dict[str, bool] = {"vision": False, "thermal": False, "motor_feedback": False}
         self.research_threads: Dict[str, Dict[str, Any]] = {}
         self.toolkit: Dict[str, List[Dict[str, str]]] = {"sensors": [], "motors": [], "actuators": []}
@@ -25,6 +29,12 @@ class AshleyGenesis:
         self.expression_log: List[Dict[str, Any]] = []
         self.narration_on: bool = True
 
+        # Simulated drive: compiled plans stream (left, right) wheel commands to the scheduler
+        self.chassis: ChassisSpec = ChassisSpec()
+        self.wheels: Tuple[float, float] = (0.0, 0.0)
+        self.motor = MotionScheduler(self._set_wheels, idle=(0.0, 0.0), name="genesis-plan")
+        self.active_plan: Optional[PatternStream] = None
+
     def _format_narration(self, text: str) -> str:
         """Formats text as a narration from Ashley, if narration is on."""
         return f"Ashley: {text}" if self.narration_on else text
@@ -64,18 +74,41 @@ class AshleyGenesis:
 
     # === Phase 2: Motor Intent Module ===
     def motor_plan(self, pattern: str = "figure-eight") -> str:
-        """Queues a new motor sequence for simulated execution."""
+        """
+        Compiles a named pattern into wheel commands for the current chassis
+        and starts streaming it to the motors, replacing any running plan.
+        """
+        if pattern not in PATTERNS:
+            return self._format_narration(f"I don't know how to move in a '{pattern}'. I know: {', '.join(PATTERNS)}.")
         plan = {
             "pattern": pattern,
             "speed": random.uniform(0.4, 0.8),
             "duration_sec": random.randint(8, 15)
         }
+        table = compile_pattern(pattern, self.chassis, plan["speed"], plan["duration_sec"])
+        plan.update(table.summary())
+        if self.active_plan is not None:
+            self.active_plan.cancel()
+        self.active_plan = PatternStream(self.motor, table)
         self.expression_log.append({"type": "movement", "plan": plan})
-        return self._format_narration(f"Motor sequence queued: {pattern} ({plan['speed']*100:.0f}% speed).")
+        return self._format_narration(f"Motor sequence queued: {pattern} ({plan['speed']*100:.0f}% speed, "
+                                      f"{plan['distance_m']} m over {plan['duration_s']}s).")
+
+    def stop_motion(self) -> str:
+        """Halts the running plan at once."""
+        latency = self.motor.stop()
+        return self._format_narration(f"Motion halted in {latency * 1000:.2f} ms.")
+
+    def _set_wheels(self, command: Tuple[float, float]):
+        self.wheels = command
 
     def simulate_chassis(self) -> str:
         """Simulates the execution of a motor plan."""
-        return self._format_narration("🚗 Simulating RC chassis pathing and feedback...")
+        plan = self.active_plan
+        if plan is None:
+            return self._format_narration("🚗 Simulating RC chassis pathing and feedback... no plan queued.")
+        return self._format_narration(f"🚗 Simulating RC chassis pathing and feedback... {plan.table.pattern}: "
+                                      f"{plan.sent} segments sent, wheels at {self.wheels}.")
 
     # === Phase 3: Research Matrix ===
     def research_initiate(self, topic: str = "biped robotics") -> str:
@@ -113,6 +146,7 @@ class AshleyGenesis:
             "notes": "Expandable frame slots for sensor packs"
         }
         self.design_journal.append(spec)
+        self.chassis = ChassisSpec.from_draft(spec)   # later motor plans are compiled for this body
         return self._format_narration(f"Chassis draft saved: {form} platform ({size_cm}cm).")
 
     # === Phase 5: Projection & MythFrame ===
@@ -147,6 +181,10 @@ if __name__ == "__main__":
     print(ash.record_citation("robotic arm anatomy", "OpenAI Robot Hand", "https://openai.com/research/learning-dexterity"))
     print(ash.generate_myth())
     print(ash.predict_path())
+    print(ash.motor_plan("figure-eight"))   # compiled for the tracked chassis drafted above
+    time.sleep(0.5)
+    print(ash.simulate_chassis())
+    print(ash.stop_motion())
 
     # Example of accessing the collected data
     print("\n--- Ashley's Final State ---")
@@ -17,6 +17,7 @@ PYTHON_VERSION = "3.11.8"
 PYTHON_ZIP_URL = f"https://www.python.org/ftp/python/{PYTHON_VERSION}/python-{PYTHON_VERSION}-embed-amd64.zip"
 GET_PIP_URL = "https://bootstrap.pypa.io/get-pip.py"
 REQUIRED_MODULES = ["requests", "numpy"] # Add any other base requirements here
+MAX_RELAUNCHES = 3
 
 def _print_status(message, status="INFO"): print(f"[Failsafe:{status}] {message}")
 
@@ -74,11 +75,23 @@ def main():
         _print_status(f"Main application file '{core_script_path.name}' is missing!", "FATAL")
         return
         
+    # The core runs under the private interpreter; the zygote forks it where it can, launches it cold where not
+    sys.path.insert(0, str(base_dir))
+    from ashley_zygote import CoreZygote
+    zygote = CoreZygote(core_script_path, python=portable_python_exe)
+    if zygote.supported: zygote.warm()
+
     _print_status("All checks complete. Launching Ashley's Main Core Process...", "LAUNCH")
-    try:
-        subprocess.run([str(portable_python_exe), str(core_script_path)], check=True)
-    except Exception as e:
-        _print_status(f"The main core process failed to run. Error: {e}", "FATAL")
+    for attempt in range(MAX_RELAUNCHES + 1):
+        try:
+            exit_code = zygote.launch()
+        except Exception as e:
+            _print_status(f"The main core process failed to run. Error: {e}", "FATAL")
+            return
+        if exit_code == 0: return
+        _print_status(f"The core process exited with code {exit_code}.", "WARN")
+        if attempt < MAX_RELAUNCHES: _print_status(f"Relaunching ({attempt + 1}/{MAX_RELAUNCHES})...", "LAUNCH")
+    _print_status("The core keeps crashing. Giving up.", "FATAL")
 
 if __name__ == "__main__":
     try: main()
@@ -92,6 +105,7 @@ if __name__ == "__main__":
 ASHLEY_CORE_PY_CODE = """
 import sys, os, traceback, importlib.util, random
 from pathlib import Path
+from expansion_sandbox import SandboxPool, load_manifest, is_sandboxed
 
 class AshleyAI:
     def __init__(self):
@@ -99,6 +113,7 @@ class AshleyAI:
         self.base_dir = Path(__file__).resolve().parent
         self.expansions_dir = self.base_dir / "expansions"
         self.actions = {}
+        self.sandbox_pools = {}
         self._load_expansion_modules()
 
     def _load_expansion_modules(self):
@@ -109,9 +124,19 @@ class AshleyAI:
         # Add the expansions directory to the path so we can import from it
         sys.path.insert(0, str(self.expansions_dir))
         
+        # Expansions marked "sandboxed" in expansions/manifest.json run in helper processes
+        manifest = load_manifest(self.expansions_dir)
+        
         for file in self.expansions_dir.glob("*.py"):
             module_name = file.stem
             try:
+                if is_sandboxed(manifest, module_name):
+                    pool = SandboxPool(file, **manifest[module_name])
+                    self.sandbox_pools[module_name] = pool
+                    for action_name in pool.commands:
+                        self.actions[action_name] = pool.proxy(action_name)
+                        print(f"  - Loaded command '{action_name}' from {module_name} (sandboxed).")
+                    continue
                 module = importlib.import_module(module_name)
                 # Find all functions in the module that start with 'cmd_'
                 for func_name in dir(module):
@@ -131,6 +156,10 @@ class AshleyAI:
     def respond(self, text):
         print(f"Ashley > {text}")
 
+    def shutdown(self):
+        for pool in self.sandbox_pools.values():
+            pool.shutdown()
+
     def process_command(self, command_text):
         """Finds and executes the best matching action from loaded expansions."""
         command = command_text.lower().strip()
@@ -176,9 +205,14 @@ class AshleyAI:
                 break
 
 if __name__ == "__main__":
-    try: AshleyAI().run()
+    ashley = None
+    try:
+        ashley = AshleyAI()
+        ashley.run()
     except Exception as e: print(f"FATAL CORE ERROR: {e}\\n{traceback.format_exc()}")
-    finally: print("\\n--- Ashley Core session has concluded. ---")
+    finally:
+        if ashley: ashley.shutdown()
+        print("\\n--- Ashley Core session has concluded. ---")
 """
 
 # ==============================================================================
@@ -226,7 +260,9 @@ def main():
     }
     folders_to_create = ["assets", "workshop", "expansions"]
     expansions_to_create = {
-        "expansions/ashley_expansion_pack.py": EXPANSION_PACK_CODE
+        "expansions/ashley_expansion_pack.py": EXPANSION_PACK_CODE,
+        # Set "mode" to "sandboxed" to run an expansion in helper processes
+        "expansions/manifest.json": json.dumps({"ashley_expansion_pack": {"mode": "in_process", "timeout": 5.0, "memory_mb": 256, "max_calls": 200}}, indent=2)
     }
     
     try:
@@ -0,0 +1,127 @@
+# ashley_zygote.py
+
+import os
+import sys
+import time
+import runpy
+import importlib
+import subprocess
+import statistics
+import traceback
+from pathlib import Path
+from typing import List, Dict, Optional, Sequence
+
+# The imports that dominate core startup. Missing ones are skipped.
+HEAVY_MODULES: List[str] = ["numpy", "sklearn", "nltk", "cv2", "PIL", "requests", "psutil"]
+
+
+class CoreZygote:
+    """
+    A pre-warmed parent for the core process. It imports the heavy
+    dependencies once, then forks a fresh core for every (re)launch, so a
+    relaunch after a crash or repair skips interpreter startup and imports.
+    Falls back to a cold `subprocess` launch where `os.fork` is unavailable
+    (Windows), or when the core must run under another interpreter (`python`).
+    """
+    def __init__(self, core_script: Path, preload: Sequence[str] = HEAVY_MODULES, python: Optional[Path] = None):
+        self.core_script = Path(core_script).resolve()
+        self.python = str(python) if python is not None else sys.executable
+        self.preload = list(preload)
+        self.loaded: List[str] = []
+        self.missing: List[str] = []
+        self.warm_seconds: float = 0.0
+
+    @property
+    def supported(self) -> bool:
+        # A fork runs the core under this interpreter, so only when that is the one asked for
+        return hasattr(os, "fork") and os.path.realpath(self.python) == os.path.realpath(sys.executable)
+
+    def _print_status(self, message: str, status: str = "INFO"):
+        print(f"[Zygote:{status}] {message}")
+
+    def warm(self) -> List[str]:
+        """Imports the preload list into this process. Safe to call more than once."""
+        start = time.perf_counter()
+        for name in self.preload:
+            if name in self.loaded or name in self.missing:
+                continue
+            try:
+                importlib.import_module(name)
+                self.loaded.append(name)
+            except Exception:
+                self.missing.append(name)
+        self.warm_seconds += time.perf_counter() - start
+        self._print_status(f"Warmed {len(self.loaded)} modules in {self.warm_seconds:.2f}s "
+                           f"(missing: {', '.join(self.missing) or 'none'}).", "OK")
+        return self.loaded
+
+    def _run_child(self, args: Sequence[str]):
+        """Runs the core script in the forked child and never returns."""
+        code = 0
+        try:
+            sys.argv = [str(self.core_script), *args]
+            sys.path.insert(0, str(self.core_script.parent))
+            runpy.run_path(str(self.core_script), run_name="__main__")
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout.flush(); sys.stderr.flush()
+            os._exit(code)
+
+    def launch(self, *args: str) -> int:
+        """Starts a fresh core, waits for it to exit and returns its exit code."""
+        if not self.supported:
+            return subprocess.run([self.python, str(self.core_script), *args]).returncode
+
+        sys.stdout.flush(); sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            self._run_child(args)
+        while True:
+            try:
+                _, status = os.waitpid(pid, 0)
+                return os.waitstatus_to_exitcode(status)
+            except KeyboardInterrupt:
+                # Ctrl+C reaches the core too; it decides how to shut down.
+                continue
+
+
+def benchmark(runs: int = 5, preload: Sequence[str] = HEAVY_MODULES) -> Dict[str, float]:
+    """Times a cold interpreter launch against a zygote fork for a core that imports `preload`."""
+    import tempfile
+    script = Path(tempfile.mkdtemp()) / "bench_core.py"
+    script.write_text("".join(f"try:\n    import {name}\nexcept Exception:\n    pass\n" for name in preload))
+
+    cold = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(script)], check=True)
+        cold.append(time.perf_counter() - start)
+
+    zygote = CoreZygote(script, preload)
+    zygote.warm()
+    forked = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        zygote.launch()
+        forked.append(time.perf_counter() - start)
+
+    return {
+        "cold_ms": statistics.median(cold) * 1000,
+        "zygote_ms": statistics.median(forked) * 1000,
+        "warm_ms": zygote.warm_seconds * 1000,
+        "modules": len(zygote.loaded),
+    }
+
+
+# === Benchmark: cold launch vs zygote fork ===
+if __name__ == "__main__":
+    result = benchmark()
+    print(f"--- Core relaunch benchmark ({result['modules']} heavy modules available) ---")
+    print(f"Cold launch   : {result['cold_ms']:8.1f} ms (median)")
+    print(f"Zygote fork   : {result['zygote_ms']:8.1f} ms (median)")
+    print(f"One-time warm : {result['warm_ms']:8.1f} ms")
+    print(f"Speed-up      : {result['cold_ms'] / max(result['zygote_ms'], 1e-6):8.1f}x")
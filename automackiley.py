@@ -1,19 +1,16 @@
 # automackiley.py
 
+from typing import Any, Dict, Optional
+
+from control_loop import DriveController, FixedRateLoop
+from gpio_shadow import MockGPIO, PinShadow
+from pwm_drive import MotorCalibration, PWMDrive, measured_duty
+
 # Use a mock GPIO library for development on non-Pi machines
 try:
     import RPi.GPIO as GPIO
 except (ImportError, RuntimeError):
-    print("// WARNING: RPi.GPIO not found. Using mock GPIO. //")
-    class MockGPIO:
-        BCM = "BCM_MODE"
-        OUT = "OUTPUT_MODE"
-        HIGH = 1
-        LOW = 0
-        def setmode(self, mode): print(f"[MOCK_GPIO] Mode set to {mode}")
-        def setup(self, pin, mode): print(f"[MOCK_GPIO] Pin {pin} set to {mode}")
-        def output(self, pin, state): print(f"[MOCK_GPIO] Pin {pin} set to {'HIGH' if state else 'LOW'}")
-        def cleanup(self): print("[MOCK_GPIO] All pins cleaned up.")
+    print("// WARNING: RPi.GPIO not found. Using mock GPIO (calls logged to GPIO.log). //")
     GPIO = MockGPIO()
 
 
@@ -27,82 +24,139 @@ class Automackiley:
         self.right_pin = right_pin
         print("[Automackiley] Motor systems initializing...")
         GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.left_pin, GPIO.OUT)
-        GPIO.setup(self.right_pin, GPIO.OUT)
-        self.stop() # Ensure motors are off at start
+        # Starts both pins LOW (motors off) and from then on writes only the pins that change
+        self.pins = PinShadow(GPIO, (self.left_pin, self.right_pin))
+        self.controller: Optional[DriveController] = None
+        self.loop: Optional[FixedRateLoop] = None
+        self.pwm: Optional[PWMDrive] = None
         print("[Automackiley] Motor systems online.")
 
-    def move(self, direction: str):
-        """Starts moving the robot in a specific direction."""
+    def move(self, direction: str, speed: float = 1.0):
+        """
+        Starts moving the robot in a specific direction. Repeating the current
+        one touches no pins. `speed` (0.0 to 1.0) needs `enable_pwm()`;
+        without it the motors only run at full speed.
+        """
+        velocities = {"forward": (1.0, 1.0), "left": (0.0, 1.0), "right": (1.0, 0.0)}.get(direction)
+        if self.controller is not None:
+            # The control loop owns the pins: turn the direction into velocities it ramps to
+            return self.drive(*(v * speed for v in velocities)) if velocities else self.stop()
+        if self.pwm is not None:
+            if not velocities:
+                return self.stop()
+            speeds = tuple(v * speed for v in velocities)
+            if speeds != tuple(self.pwm.target[pin] for pin in self.pins.pins):
+                self.pwm.set_speed(speeds)
+                print(f"[Automackiley] ACTION: Moving {direction} at {speed:.0%}.")
+            return
         if direction == "forward":
-            GPIO.output(self.left_pin, GPIO.HIGH)
-            GPIO.output(self.right_pin, GPIO.HIGH)
+            changed = self.pins.write_many((GPIO.HIGH, GPIO.HIGH))
         elif direction == "left":
-            GPIO.output(self.left_pin, GPIO.LOW)
-            GPIO.output(self.right_pin, GPIO.HIGH)
-        elifAh, I understand perfectly now. You're asking the most important architectural question: **how do we properly connect the "body" (`Automackiley`) to the "mind" (`AshleyGenesis`) using the "ignition system" (`failsafe_launcher`)?**
-
-You are exactly right. We don't want to just "drop" the `Automackiley` code into the `AshleyGenesis` core file. Doing so would be like trying to build a car's engine inside the driver's brain. They are separate parts that need to work together.
-
-The `failsafe_launcher` is the key. It acts like the chassis of the car, holding both the engine and the driver and connecting them.
-
-Let's build this the right way. We will have three separate files, each with a clear job:
-
-1.  `ashley_core.py`: **The Mind.** Thinks, feels, remembers. Contains the `AshleyGenesis` class. It has no idea *how* to move, it just knows it *wants* to.
-2.  `automackiley.py`: **The Body.** Executes physical actions. Contains the `Automackiley` class, which handles all the `GPIO` commands. It takes orders from the mind.
-3.  `failsafe_launcher.py`: **The Ignition & Nerves.** This is the main script you run. It starts everything, connects the mind to the body, and tells the body to listen to the mind's commands.
-
----
-
-### Step 1: The Mind (`ashley_core.py`)
-
-This is your `AshleyGenesis` class, but we will strip out all direct GPIO control and the `run_sequence` method. It's now purely a "brain".
-
-```python
-# ashley_core.py
-
-import random
-from datetime import datetime
-from typing import List, Dict, Any
-
-class AshleyGenesis:
-    """The 'Mind'. Manages state, memory, and intent, but does not control hardware."""
-    def __init__(self):
-        self.mood: str = "neutral"
-        self.biofeedback: Dict[str, float] = {"hrv": 0.8, "gsr": 0.2}
-        self.soul_log: List[Dict[str, Any]] = []
-        self.timeline: List[str] = []
-        self.narration_on: bool = True
-
-    def _narrate(self, text: str) -> str:
-        return f"Ashley: {text}" if self.narration_on else text
-
-    def toggle_narration(self, state: bool):
-        self.narration_on = state
-        print(f"// Narration toggled {'on' if state else 'off'}. //")
-
-    def update_mood(self, hrv: float, gsr: float) -> str:
-        self.biofeedback = {"hrv": hrv, "gsr": gsr}
-        if hrv > 0.85: self.mood = "focused"
-        elif gsr > 0.5: self.mood = "tense"
-        else: self.mood = "curious"
-        return self._narrate(f"Mood adjusted → {self.mood}")
-
-    def soulmarker(self, label: str) -> str:
-        marker direction == "right":
-            GPIO.output(self.left_pin, GPIO.HIGH)
-            GPIO.output(self.right_pin, GPIO.LOW)
+            changed = self.pins.write_many((GPIO.LOW, GPIO.HIGH))
+        elif direction == "right":
+            changed = self.pins.write_many((GPIO.HIGH, GPIO.LOW))
         else:
-            self.stop()
-        print(f"[Automackiley] ACTION: Moving {direction}.")
+            return self.stop()
+        if changed:
+            print(f"[Automackiley] ACTION: Moving {direction}.")
 
     def stop(self):
         """Stops all motor movement."""
-        GPIO.output(self.left_pin, GPIO.LOW)
-        GPIO.output(self.right_pin, GPIO.LOW)
-        print(f"[Automackiley] ACTION: Motors stopped.")
+        if self.controller is not None:
+            changed = self.controller.halt()   # no ramp-down: both pins go LOW now
+        elif self.pwm is not None:
+            changed = self.pwm.halt()
+        else:
+            changed = self.pins.write_many((GPIO.LOW, GPIO.LOW))
+        if changed:
+            print(f"[Automackiley] ACTION: Motors stopped.")
+
+    # === Speed control ===
+    def enable_pwm(self, frequency: float = 100.0, calibration: Optional[Dict[int, MotorCalibration]] = None,
+                   ramp: float = 2.0) -> PWMDrive:
+        """
+        Switches the pins to PWM so move() and drive() can run the motors
+        below full speed: the Pi's PWM channels when RPi.GPIO is loaded, a
+        software PWM thread otherwise. `calibration` maps a pin to its
+        `MotorCalibration`; `ramp` limits how fast move() changes speed.
+        """
+        if self.pwm is None:
+            self.pwm = PWMDrive(self.pins, frequency, calibration, ramp)
+            print(f"[Automackiley] PWM at {frequency:g} Hz ({self.pwm.report()['backend']}).")
+        return self.pwm
+
+    # === Fixed-rate control ===
+    def start_control(self, rate_hz: float = 100.0, accel: float = 4.0) -> FixedRateLoop:
+        """
+        Hands the pins to a fixed-rate control loop on its own thread. From
+        then on drive() (or move()) sets velocities and the loop ramps them.
+        """
+        if self.loop is None:
+            self.controller = DriveController(self.pins, accel=accel, pwm=self.pwm)
+            self.loop = FixedRateLoop(self.controller.step, rate_hz, name="automackiley").start()
+            print(f"[Automackiley] Control loop running at {rate_hz:g} Hz.")
+        return self.loop
+
+    def drive(self, left: float, right: float):
+        """Commands wheel velocities (0.0 to 1.0); the control loop ramps to them."""
+        if self.controller is None:
+            raise RuntimeError("Call start_control() before drive().")
+        self.controller.command(left, right)
+
+    def stop_control(self):
+        if self.loop is not None:
+            self.loop.stop()
+            self.stop()
+            self.loop = self.controller = None
+
+    def telemetry(self) -> Dict[str, Any]:
+        """Loop jitter/overrun figures and pin write counts."""
+        report: Dict[str, Any] = {"pins": self.pins.report()}
+        if self.loop is not None:
+            report["loop"] = self.loop.telemetry.report()
+        if self.pwm is not None:
+            report["pwm"] = self.pwm.report()
+        return report
 
     def cleanup(self):
         """Safely shuts down and cleans up GPIO resources."""
         print("[Automackiley] Initiating GPIO cleanup...")
+        self.stop_control()
+        if self.pwm is not None:
+            self.pwm.close()
+            self.pwm = None
         GPIO.cleanup()
+        self.pins.invalidate()
+
+
+# === Demo: the shadow register on MockGPIO, with the pins logged ===
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if not isinstance(GPIO, MockGPIO):
+        sys.exit("The demo checks what MockGPIO recorded: run it off the Pi.")
+    mack = Automackiley(left_pin=17, right_pin=27)
+    print("--- On/off drive: repeated commands touch no pins ---")
+    route = ["forward"] * 50 + ["left"] * 20 + ["forward"] * 50 + ["right"] * 20 + ["stop"] * 10
+    writes = GPIO.writes
+    for direction in route:
+        mack.move(direction)   # an ACTION line per change of direction, not per call
+    levels = {"forward": (1, 1), "left": (0, 1), "right": (1, 0), "stop": (0, 0)}
+    flips = sum(a != b for x, y in zip(["stop"] + route, route) for a, b in zip(levels[x], levels[y]))
+    print(f"{len(route)} commands, {GPIO.writes - writes} pin writes ({2 * len(route)} without the shadow register)")
+    assert GPIO.writes - writes == flips and (GPIO.levels[17], GPIO.levels[27]) == (GPIO.LOW, GPIO.LOW)
+    print(f"Shadow register: {mack.pins.report()}")
+
+    print("--- PWM: move() at part speed, duty measured from the recorded waveform ---")
+    mack.enable_pwm(frequency=100.0)
+    for direction, speed in (("forward", 0.5), ("left", 0.3), ("forward", 0.5)):
+        mack.move(direction, speed=speed)
+        time.sleep(0.4)   # the default ramp (2.0/s) covers each of these steps in 0.25 s
+        since = time.monotonic_ns()
+        time.sleep(1.0)   # MockGPIO's log holds 4096 writes: ~10 s of two 100 Hz pins
+        cells = [f"{mack.pwm.duty(pin):.3f} -> {measured_duty(GPIO, pin, since)['duty']:.3f}" for pin in (17, 27)]
+        print(f"{direction:>8} at {speed:.0%}: left {cells[0]}, right {cells[1]} (commanded -> measured duty)")
+    mack.stop()
+    print(f"PWM: {mack.telemetry()['pwm']['periods']}")
+    mack.cleanup()
@@ -1,9 +1,12 @@
 # etherveil_core.py
 
+import sys
 from datetime import datetime
 import random
 from typing import Dict, Any, List
 
+from core_snapshot import persist
+
 class EtherveilCore:
     """An AI core whose state of being is defined by the strength and harmony of its relationships."""
     
@@ -120,6 +123,8 @@ class EtherveilCore:
 # === A Narrative Scenario ===
 if __name__ == "__main__":
     veil = EtherveilCore()
+    if "--persist" in sys.argv:
+        persist(veil, "etherveil")  # resume from the last checkpoint, keep checkpointing
     veil.reflect_state()
 
     print("\n--- [A new connection is formed] ---")
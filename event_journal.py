@@ -0,0 +1,154 @@
+# event_journal.py
+
+import os
+import json
+import time
+import atexit
+from pathlib import Path
+from typing import List, Any, Optional, Tuple
+
+
+class EventJournal:
+    """
+    An append-only JSON-lines journal for event logs.
+
+    Each event is one line appended to `<name>.jsonl`; lines are fsynced in
+    batches. Every `compact_every` events the journal is folded into
+    `<name>.snapshot.json` (written to a temp file, then renamed) and
+    truncated. On startup the snapshot is read and the journal replayed on top.
+    A torn last line from a crash is skipped.
+    """
+    def __init__(self, base_path: Path, fsync_every: int = 32, fsync_interval: float = 1.0,
+                 compact_every: int = 5000):
+        base_path = Path(base_path)
+        self.journal_path = base_path.with_name(base_path.name + ".jsonl")
+        self.snapshot_path = base_path.with_name(base_path.name + ".snapshot.json")
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+
+        self.entries: List[Any] = []
+        self._journal_lines = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._file = None
+        atexit.register(self.close)
+
+    # === Startup ===
+    def load(self, legacy_entries: Optional[List[Any]] = None) -> List[Any]:
+        """
+        Replays snapshot + journal into `self.entries` and returns that list.
+        If neither file exists yet, `legacy_entries` (e.g. the old `logs` list
+        from a JSON database) become the first snapshot.
+        """
+        if not self.snapshot_path.exists() and not self.journal_path.exists():
+            self.entries = list(legacy_entries or [])
+            if self.entries:
+                self._write_snapshot()
+        else:
+            self.entries = self._read_snapshot()
+            self._journal_lines, torn = self._replay_journal()
+            if torn:
+                # Fold what survived into the snapshot so new lines don't land after the tear.
+                self.compact()
+                return self.entries
+        self._file = open(self.journal_path, "a", encoding="utf-8")
+        return self.entries
+
+    def _read_snapshot(self) -> List[Any]:
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def _replay_journal(self) -> Tuple[int, bool]:
+        replayed = 0
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.entries.append(json.loads(line))
+                        replayed += 1
+                    except json.JSONDecodeError:
+                        return replayed, True  # Torn write from a crash.
+        except FileNotFoundError:
+            pass
+        return replayed, False
+
+    # === Writing ===
+    def append(self, entry: Any):
+        """Records one event. Cost is independent of history length."""
+        if self._file is None:
+            self.load()
+        self.entries.append(entry)
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._journal_lines += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+        if self._journal_lines >= self.compact_every:
+            self.compact()
+
+    def sync(self):
+        """Forces buffered journal lines to disk."""
+        if self._file is None or self._unsynced == 0:
+            return
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _write_snapshot(self):
+        tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def compact(self):
+        """Folds the journal into the snapshot, then starts an empty journal."""
+        self.sync()
+        self._write_snapshot()
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.journal_path, "w", encoding="utf-8")
+        self._journal_lines = 0
+
+    def close(self):
+        if self._file is not None and not self._file.closed:
+            self.sync()
+            self._file.close()
+
+
+# === Benchmark: journal append vs. rewriting the whole JSON database ===
+if __name__ == "__main__":
+    import tempfile
+    work_dir = Path(tempfile.mkdtemp())
+    history = [f"[2024-01-01 00:00:00] Historic event #{i}" for i in range(20000)]
+
+    legacy_db = work_dir / "legacy.db.json"
+    database = {"connected_devices": [], "logs": list(history), "tool_locations": {}}
+    start = time.perf_counter()
+    for i in range(50):
+        database["logs"].append(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] Event {i}")
+        with open(legacy_db, "w") as f: json.dump(database, f, indent=2)
+    legacy_ms = (time.perf_counter() - start) / 50 * 1000
+
+    journal = EventJournal(work_dir / "iris_events")
+    journal.load(legacy_entries=history)
+    start = time.perf_counter()
+    for i in range(20000):
+        journal.append(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] Event {i}")
+    journal_ms = (time.perf_counter() - start) / 20000 * 1000
+    journal.close()
+
+    start = time.perf_counter()
+    replayed = EventJournal(work_dir / "iris_events").load()
+    replay_ms = (time.perf_counter() - start) * 1000
+
+    print(f"--- Event log benchmark ({len(history)} events of history) ---")
+    print(f"Full JSON rewrite per event : {legacy_ms:8.3f} ms")
+    print(f"Journal append per event    : {journal_ms:8.3f} ms")
+    print(f"Replay of {len(replayed)} events   : {replay_ms:8.1f} ms")
@@ -0,0 +1,251 @@
+# event_records.py
+
+import sys
+import time
+from array import array
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+
+# Wall-clock anchor for the monotonic clock, so stored stamps never go backwards
+# when the system clock is adjusted but still read back as real dates.
+_EPOCH_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+
+def to_monotonic_ns(value: Any) -> int:
+    """Accepts an ISO string, datetime or epoch seconds from legacy call sites."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        value = value.timestamp()
+    return int(value * 1e9) - _EPOCH_OFFSET_NS
+
+
+def monotonic_to_iso(monotonic_ns: int) -> str:
+    return datetime.fromtimestamp((monotonic_ns + _EPOCH_OFFSET_NS) / 1e9).isoformat()
+
+
+class EventRecord(Mapping):
+    """
+    Read-only dict view of one row in an `EventLog`. Existing code that does
+    `event["cause"]`, `event.get(...)` or `dict(event)` keeps working; the
+    ISO timestamp is only formatted when it is actually read.
+    """
+    __slots__ = ("_log", "_index")
+
+    def __init__(self, log: "EventLog", index: int):
+        self._log = log
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        return self._log._value(self._index, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._log.keys)
+
+    def __len__(self) -> int:
+        return len(self._log.keys)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Mapping) and dict(self) == dict(other)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    @property
+    def monotonic_ns(self) -> int:
+        return self._log._times[self._index]
+
+
+class EventLog(Sequence):
+    """
+    Struct-of-arrays storage for a core's event history.
+
+    Each field is a column: free text in a list, categories as integer codes
+    into an interned table, numbers in `array('d')`, and the timestamp as
+    monotonic nanoseconds in `array('q')`. A row costs a few dozen bytes
+    instead of a dict plus an ISO string. Indexing returns `EventRecord`
+    views, so `log[-3:]`, `len(log)` and `for e in log` behave as before.
+    """
+    def __init__(self, fields: Iterable[str], categories: Iterable[str] = (), numbers: Iterable[str] = (),
+                 time_key: str = "time"):
+        self.fields = tuple(fields)
+        self.time_key = time_key
+        self.keys = self.fields + (time_key,)
+        self._categories = set(categories)
+        self._numbers = set(numbers)
+
+        self._columns: Dict[str, Any] = {}
+        for name in self.fields:
+            if name in self._categories:
+                self._columns[name] = array("I")
+            elif name in self._numbers:
+                self._columns[name] = array("d")
+            else:
+                self._columns[name] = []
+        self._times = array("q")
+        self._table: List[Any] = []          # category code -> interned value
+        self._codes: Dict[Any, int] = {}
+
+    # === Recording ===
+    def record(self, **values: Any) -> int:
+        """Adds an event stamped now and returns its index."""
+        stamp = values.pop(self.time_key, None)
+        for name in self.fields:
+            value = values.get(name)
+            if name in self._categories:
+                self._columns[name].append(self._code(value))
+            elif name in self._numbers:
+                self._columns[name].append(float("nan") if value is None else value)
+            else:
+                self._columns[name].append(value)
+        self._times.append(time.monotonic_ns() if stamp is None else to_monotonic_ns(stamp))
+        return len(self._times) - 1
+
+    def append(self, event: Dict[str, Any]):
+        """List-style append of a dict, for call sites that still build one."""
+        self.record(**event)
+
+    def extend(self, events: Iterable[Dict[str, Any]]):
+        for event in events:
+            self.append(event)
+
+    def append_columns(self, columns: Dict[str, Sequence], times_ns: Sequence[int]) -> int:
+        """
+        Bulk append for high-rate producers: one sequence per field plus
+        monotonic-ns stamps (see `to_monotonic_ns`). Returns the first new index.
+        """
+        start = len(self._times)
+        for name in self.fields:
+            values = columns.get(name)
+            if values is None:
+                values = [float("nan") if name in self._numbers else None] * len(times_ns)
+            if name in self._categories:
+                self._columns[name].extend(map(self._code, values))
+            else:
+                self._columns[name].extend(values)
+        self._times.extend(times_ns)
+        return start
+
+    # === Reading ===
+    def __len__(self) -> int:
+        return len(self._times)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [EventRecord(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("event index out of range")
+        return EventRecord(self, index)
+
+    @property
+    def times_ns(self) -> array:
+        """The raw monotonic-ns stamp column (read-only by convention)."""
+        return self._times
+
+    def column(self, name: str) -> List[Any]:
+        """Every value of one field, decoded, without building records."""
+        if name == self.time_key:
+            return [self._iso(ns) for ns in self._times]
+        if name in self._categories:
+            return [self._table[code] for code in self._columns[name]]
+        return list(self._columns[name])
+
+    def where(self, name: str, value: Any) -> List[EventRecord]:
+        """Rows whose `name` equals `value`; compares integer codes for categories."""
+        if name in self._categories:
+            code = self._codes.get(value)
+            if code is None:
+                return []
+            return [EventRecord(self, i) for i, c in enumerate(self._columns[name]) if c == code]
+        return [EventRecord(self, i) for i, v in enumerate(self._columns[name]) if v == value]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [dict(record) for record in self]
+
+    def __repr__(self) -> str:
+        return f"EventLog({len(self)} events, fields={self.keys})"
+
+    def snapshot_version(self) -> int:
+        """Changes whenever the log does (it only grows), so snapshots can skip an unchanged log."""
+        return len(self._times)
+
+    # Pickled (e.g. by core_snapshot) with epoch stamps: the monotonic clock restarts at every boot.
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_times"] = array("q", (ns + _EPOCH_OFFSET_NS for ns in self._times))
+        state["_epoch_times"] = True
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        if state.pop("_epoch_times", False):
+            state["_times"] = array("q", (ns - _EPOCH_OFFSET_NS for ns in state["_times"]))
+        self.__dict__.update(state)
+
+    # === Internals ===
+    def _code(self, value: Any) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            if isinstance(value, str):
+                value = sys.intern(value)
+            code = self._codes[value] = len(self._table)
+            self._table.append(value)
+        return code
+
+    def _value(self, index: int, key: str) -> Any:
+        if key == self.time_key:
+            return self._iso(self._times[index])
+        column = self._columns[key]
+        if key in self._categories:
+            return self._table[column[index]]
+        return column[index]
+
+    @staticmethod
+    def _iso(monotonic_ns: int) -> str:
+        return monotonic_to_iso(monotonic_ns)
+
+
+# === Benchmark: per-event memory, dicts vs. EventLog ===
+if __name__ == "__main__":
+    import random
+    import tracemalloc
+
+    count = 100_000
+    places = ["the workshop", "the garden", "the hallway", "the charging dock"]
+    emotions = ["peace", "stillness", "wonder", "anxiety", "hesitation", "sadness", "curiosity", "neutrality"]
+    rows = [(random.choice(emotions), random.choice(places)) for _ in range(count)]
+
+    def measure(build):
+        tracemalloc.start()
+        start = time.perf_counter()
+        store = build()
+        elapsed = time.perf_counter() - start
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return store, size / count, elapsed / count * 1e6
+
+    def as_dicts():
+        # What LivingMyth.record_echo did: a dict and an ISO string per event
+        return [{"emotion": e, "place": p, "time": datetime.now().isoformat()} for e, p in rows]
+
+    def as_log():
+        log = EventLog(("emotion", "place"), categories=("emotion", "place"))
+        for e, p in rows:
+            log.record(emotion=e, place=p)
+        return log
+
+    dicts, dict_bytes, dict_us = measure(as_dicts)
+    log, log_bytes, log_us = measure(as_log)
+    assert [dict(r) for r in log[-3:]][0].keys() == dicts[-3].keys()
+
+    t0 = time.perf_counter()
+    wonder = log.where("place", "the garden")
+    where_ms = (time.perf_counter() - t0) * 1000
+
+    print(f"--- Event records ({count:,} echo events) ---")
+    print(f"List of dicts : {dict_bytes:7.1f} bytes/event, {dict_us:6.2f} us/append")
+    print(f"EventLog      : {log_bytes:7.1f} bytes/event, {log_us:6.2f} us/append")
+    print(f"Reduction     : {dict_bytes / log_bytes:7.1f}x")
+    print(f"where(place)  : {where_ms:7.2f} ms for {len(wonder):,} matches, e.g. {wonder[-1]}")
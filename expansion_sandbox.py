@@ -0,0 +1,239 @@
+# expansion_sandbox.py
+
+import json
+import importlib.util
+import multiprocessing
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Optional
+
+# `resource` only exists on POSIX; on Windows the memory limit is skipped.
+try:
+    import resource
+except ImportError:
+    resource = None
+
+MANIFEST_NAME = "manifest.json"
+
+# Default policy for an expansion declared as sandboxed in the manifest.
+DEFAULT_POLICY: Dict[str, Any] = {
+    "mode": "in_process",
+    "workers": 1,
+    "timeout": 5.0,
+    "memory_mb": 256,
+    "max_calls": 200,
+}
+
+
+class SandboxError(Exception):
+    """Raised when a sandboxed expansion fails or its worker dies."""
+
+
+class SandboxTimeout(SandboxError):
+    """Raised when a sandboxed command exceeds its per-call timeout."""
+
+
+def load_manifest(expansions_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Reads `expansions/manifest.json` and returns a policy per module name.
+    Modules missing from the manifest run in-process, as before.
+
+    Example manifest:
+        {"sentinel_presence": {"mode": "sandboxed", "timeout": 2.0, "max_calls": 50}}
+    """
+    try:
+        with open(Path(expansions_dir) / MANIFEST_NAME, "r") as f:
+            raw = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return {name: {**DEFAULT_POLICY, **(policy or {})} for name, policy in raw.items()}
+
+
+def is_sandboxed(manifest: Dict[str, Dict[str, Any]], module_name: str) -> bool:
+    return manifest.get(module_name, {}).get("mode") == "sandboxed"
+
+
+def _discover_commands(module) -> Dict[str, Callable]:
+    """Mirrors the core's discovery: `cmd_*` functions first, else the module's own class."""
+    commands = {name[4:]: getattr(module, name) for name in dir(module) if name.startswith("cmd_")}
+    if commands:
+        return commands
+    for item_name in dir(module):
+        item = getattr(module, item_name)
+        if isinstance(item, type) and item.__module__ == module.__name__:
+            instance = item()
+            return {
+                name: getattr(instance, name) for name in dir(instance)
+                if not name.startswith("_") and callable(getattr(instance, name))
+            }
+    return {}
+
+
+def _sandbox_worker(conn, module_path: str, memory_mb: Optional[int]):
+    """Entry point of a helper process. Speaks JSON strings over `conn`."""
+    if memory_mb and resource is not None:
+        limit = int(memory_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    try:
+        spec = importlib.util.spec_from_file_location(Path(module_path).stem, module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        commands = _discover_commands(module)
+    except BaseException as e:
+        conn.send(json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"}))
+        return
+    conn.send(json.dumps({"ok": True, "result": sorted(commands)}))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if message is None:
+            break
+        func_name, query = message
+        try:
+            payload = {"ok": True, "result": commands[func_name](query)}
+        except MemoryError:
+            payload = {"ok": False, "error": "MemoryError: expansion exceeded its memory limit"}
+        except Exception as e:
+            payload = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        conn.send(json.dumps(payload, default=str))
+
+
+class _Worker:
+    """One helper process plus the parent's end of its pipe."""
+    def __init__(self, ctx, module_path: str, memory_mb: Optional[int], timeout: float):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_sandbox_worker, args=(child_conn, module_path, memory_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.calls = 0
+        # The handshake lists the commands the module exposes.
+        if not self.conn.poll(max(timeout, 10.0)):
+            self.kill()
+            raise SandboxTimeout(f"Expansion '{Path(module_path).stem}' did not start in time.")
+        reply = json.loads(self.conn.recv())
+        if not reply["ok"]:
+            self.kill()
+            raise SandboxError(reply["error"])
+        self.commands: List[str] = reply["result"]
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(0.5)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class SandboxPool:
+    """
+    Runs one expansion module inside a pool of helper processes.
+    Each call has a timeout; workers are recycled after `max_calls` calls
+    or whenever they time out, crash or hit their memory limit.
+    Note: expansion state lives in the worker and is lost on recycling.
+    """
+    def __init__(self, module_path: Path, workers: int = 1, timeout: float = 5.0,
+                 memory_mb: Optional[int] = 256, max_calls: int = 200, **_ignored):
+        self.module_path = str(module_path)
+        self.name = Path(module_path).stem
+        self.size = max(1, int(workers))
+        self.timeout = float(timeout)
+        self.memory_mb = memory_mb
+        self.max_calls = max(1, int(max_calls))
+        self._ctx = multiprocessing.get_context()
+        self._workers: List[_Worker] = [self._spawn() for _ in range(self.size)]
+        self._next = 0
+        self.stats: Dict[str, int] = {"calls": 0, "timeouts": 0, "errors": 0, "recycled": 0}
+
+    @property
+    def commands(self) -> List[str]:
+        return list(self._workers[0].commands)
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.module_path, self.memory_mb, self.timeout)
+
+    def _recycle(self, index: int, kill: bool = False):
+        if kill:
+            self._workers[index].kill()
+        else:
+            self._workers[index].stop()
+        self._workers[index] = self._spawn()
+        self.stats["recycled"] += 1
+
+    def call(self, func_name: str, query: Any = None) -> Any:
+        """Runs `func_name(query)` in a helper process and returns its JSON-decoded result."""
+        index = self._next
+        self._next = (self._next + 1) % self.size
+        worker = self._workers[index]
+        if not worker.process.is_alive():
+            self._recycle(index, kill=True)
+            worker = self._workers[index]
+
+        self.stats["calls"] += 1
+        worker.calls += 1
+        try:
+            worker.conn.send((func_name, query))
+            if not worker.conn.poll(self.timeout):
+                self.stats["timeouts"] += 1
+                self._recycle(index, kill=True)
+                raise SandboxTimeout(f"'{func_name}' exceeded its {self.timeout:.1f}s limit and was stopped.")
+            reply = json.loads(worker.conn.recv())
+        except (EOFError, OSError, BrokenPipeError):
+            self.stats["errors"] += 1
+            self._recycle(index, kill=True)
+            raise SandboxError(f"The '{self.name}' helper process died while running '{func_name}'.")
+
+        out_of_memory = not reply["ok"] and reply["error"].startswith("MemoryError")
+        if out_of_memory or worker.calls >= self.max_calls:
+            self._recycle(index, kill=out_of_memory)
+        if not reply["ok"]:
+            self.stats["errors"] += 1
+            raise SandboxError(reply["error"])
+        return reply["result"]
+
+    def proxy(self, func_name: str) -> Callable[[Any], Any]:
+        """Returns a callable that fits into the core's `actions` table."""
+        def _call(query=None):
+            return self.call(func_name, query)
+        _call.__name__ = func_name
+        return _call
+
+    def shutdown(self):
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
+
+
+# === Demo: a hung expansion no longer freezes the caller ===
+if __name__ == "__main__":
+    import tempfile
+    demo_dir = Path(tempfile.mkdtemp())
+    (demo_dir / "slow_module.py").write_text(
+        "import time\n"
+        "def cmd_echo(query=None): return {'echo': query}\n"
+        "def cmd_hang(query=None): time.sleep(60)\n"
+    )
+    (demo_dir / MANIFEST_NAME).write_text(json.dumps({"slow_module": {"mode": "sandboxed", "timeout": 0.5, "max_calls": 3}}))
+
+    policy = load_manifest(demo_dir)["slow_module"]
+    pool = SandboxPool(demo_dir / "slow_module.py", **policy)
+    print(f"[Sandbox] Commands: {pool.commands}")
+    start = time.perf_counter()
+    for i in range(5):
+        print(f"[Sandbox] echo -> {pool.call('echo', f'ping {i}')}")
+    print(f"[Sandbox] 5 calls in {(time.perf_counter() - start) * 1000:.1f} ms")
+    try:
+        pool.call("hang")
+    except SandboxTimeout as e:
+        print(f"[Sandbox] {e}")
+    print(f"[Sandbox] Stats: {pool.stats}")
+    pool.shutdown()
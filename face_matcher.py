@@ -0,0 +1,122 @@
+# face_matcher.py
+
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+from face_store import ENCODING_DIM, FaceEncodingStore
+
+DEFAULT_TOLERANCE = 0.6  # face_recognition.compare_faces default
+
+
+class FaceMatcher:
+    """
+    Matches every face in a frame against every known encoding in one
+    matrix product: ||a - b||^2 = |a|^2 + |b|^2 - 2 a.b, with the known
+    norms precomputed. Known encodings sit in a contiguous float32 matrix
+    with spare capacity, so enrolling someone writes one row in place.
+    """
+    def __init__(self, tolerance: float = DEFAULT_TOLERANCE, capacity: int = 64):
+        self.tolerance = tolerance
+        self.labels: List[str] = []
+        self._known = np.zeros((capacity, ENCODING_DIM), dtype=np.float32)
+        self._norms = np.zeros(capacity, dtype=np.float32)
+
+    @classmethod
+    def from_store(cls, store: FaceEncodingStore, tolerance: float = DEFAULT_TOLERANCE) -> "FaceMatcher":
+        matcher = cls(tolerance, capacity=max(64, len(store) * 2))
+        matrix = store.matrix
+        matcher._known[:len(matrix)] = matrix
+        matcher._norms[:len(matrix)] = np.einsum("ij,ij->i", matcher._known[:len(matrix)], matcher._known[:len(matrix)])
+        matcher.labels = store.labels()
+        return matcher
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def upsert(self, label: str, encoding: np.ndarray):
+        """Adds or replaces one person's encoding in place."""
+        try:
+            row = self.labels.index(label)
+        except ValueError:
+            row = len(self.labels)
+            if row == len(self._known):
+                self._grow()
+            self.labels.append(label)
+        self._known[row] = encoding
+        self._norms[row] = float(np.dot(self._known[row], self._known[row]))
+
+    def distances(self, faces: np.ndarray) -> np.ndarray:
+        """(faces, known) Euclidean distances."""
+        n = len(self.labels)
+        faces = np.atleast_2d(np.asarray(faces, dtype=np.float32))
+        known = self._known[:n]
+        squared = np.einsum("ij,ij->i", faces, faces)[:, None] + self._norms[:n][None, :] - 2.0 * (faces @ known.T)
+        return np.sqrt(np.maximum(squared, 0.0, out=squared), out=squared)
+
+    def match(self, faces: np.ndarray, k: int = 1) -> List[List[Tuple[str, float]]]:
+        """
+        For each face, up to `k` (label, distance) pairs within the tolerance,
+        closest first. An empty list means the face is unknown.
+        """
+        if not len(self.labels) or not len(faces):
+            return [[] for _ in range(len(faces))]
+        dist = self.distances(faces)
+        k = min(k, dist.shape[1])
+        if k < dist.shape[1]:
+            top = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(k), (len(dist), k))
+        top_dist = np.take_along_axis(dist, top, axis=1)
+        order = np.argsort(top_dist, axis=1)
+        top, top_dist = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_dist, order, axis=1)
+        return [[(self.labels[j], float(d)) for j, d in zip(row, row_dist) if d <= self.tolerance]
+                for row, row_dist in zip(top, top_dist)]
+
+    def best(self, face: np.ndarray) -> Optional[Tuple[str, float]]:
+        found = self.match(np.atleast_2d(face), k=1)[0]
+        return found[0] if found else None
+
+    def _grow(self):
+        self._known = np.concatenate([self._known, np.zeros_like(self._known)])
+        self._norms = np.concatenate([self._norms, np.zeros_like(self._norms)])
+
+
+# === Benchmark: per-frame matching cost as the household grows (no camera needed) ===
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    faces_per_frame = 4
+    runs = 500
+
+    def compare_faces_loop(known_list, faces):
+        # What the scan loop did: face_recognition.compare_faces per detected face
+        names = []
+        for face in faces:
+            matches = list(np.linalg.norm(np.array(known_list) - face, axis=1) <= DEFAULT_TOLERANCE)
+            names.append(matches.index(True) if True in matches else None)
+        return names
+
+    print(f"--- Face matching ({faces_per_frame} faces per frame, {runs} frames) ---")
+    print(f"{'known':>7} | {'per-face loop':>14} | {'FaceMatcher':>12}")
+    for household in (10, 100, 500, 1000, 5000):
+        # Encodings are roughly unit-scale 128-d vectors; visitors are perturbed copies.
+        known = rng.normal(0, 0.09, (household, ENCODING_DIM)).astype(np.float32)
+        matcher = FaceMatcher(capacity=16)
+        for i, encoding in enumerate(known):
+            matcher.upsert(f"Person {i}", encoding)
+        frame = known[rng.integers(0, household, faces_per_frame)] + rng.normal(0, 0.01, (faces_per_frame, ENCODING_DIM))
+        known_list = list(known)
+
+        t0 = time.perf_counter()
+        for _ in range(runs):
+            compare_faces_loop(known_list, frame)
+        loop_ms = (time.perf_counter() - t0) / runs * 1000
+
+        t0 = time.perf_counter()
+        for _ in range(runs):
+            result = matcher.match(frame, k=3)
+        matcher_ms = (time.perf_counter() - t0) / runs * 1000
+        assert all(r and r[0][1] < 0.3 for r in result)
+        print(f"{household:>7} | {loop_ms:11.3f} ms | {matcher_ms:9.3f} ms")
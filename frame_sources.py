@@ -0,0 +1,165 @@
+# frame_sources.py
+
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+class FrameSource(ABC):
+    """
+    Anything the guardian can pull BGR frames from. `read()` mirrors
+    `cv2.VideoCapture.read()` so sources drop into existing loops. With
+    `realtime=True`, recorded sources are paced to their frame rate;
+    otherwise they play back as fast as they can be consumed.
+    """
+    def __init__(self, fps: float = 30.0, realtime: bool = False):
+        self.fps = fps
+        self.realtime = realtime
+        self.frames_read = 0
+        self._t0: Optional[float] = None
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        frame = self._next_frame()
+        if frame is None:
+            return False, None
+        if self.realtime:
+            self._pace()
+        self.frames_read += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    @abstractmethod
+    def _next_frame(self) -> Optional[np.ndarray]:
+        """The next BGR frame, or None once the source is exhausted."""
+
+    def _pace(self):
+        if self._t0 is None:
+            self._t0 = time.perf_counter()
+        wait = self._t0 + self.frames_read / self.fps - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class CameraSource(FrameSource):
+    """Live camera, with the capture backend picked per platform instead of always DirectShow."""
+    def __init__(self, index: int = 0):
+        import cv2
+        backend = {"win32": cv2.CAP_DSHOW, "linux": cv2.CAP_V4L2}.get(sys.platform, cv2.CAP_ANY)
+        self.capture = cv2.VideoCapture(index, backend)
+        if not self.capture.isOpened():
+            self.capture = cv2.VideoCapture(index)
+        super().__init__(fps=self.capture.get(cv2.CAP_PROP_FPS) or 30.0, realtime=False)  # the camera paces itself
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        ok, frame = self.capture.read()
+        return frame if ok else None
+
+    def release(self):
+        self.capture.release()
+
+
+class VideoFileSource(FrameSource):
+    def __init__(self, path: Path, realtime: bool = False, loop: bool = False):
+        import cv2
+        self.path = Path(path)
+        self.loop = loop
+        self.capture = cv2.VideoCapture(str(self.path))
+        if not self.capture.isOpened():
+            raise FileNotFoundError(f"Could not open video {self.path}")
+        super().__init__(fps=self.capture.get(cv2.CAP_PROP_FPS) or 30.0, realtime=realtime)
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        import cv2
+        ok, frame = self.capture.read()
+        if not ok and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.capture.read()
+        return frame if ok else None
+
+    def release(self):
+        self.capture.release()
+
+
+class ImageDirSource(FrameSource):
+    """Every image in a directory, in name order (e.g. frames dumped from a recording)."""
+    def __init__(self, directory: Path, fps: float = 30.0, realtime: bool = False, loop: bool = False):
+        self.directory = Path(directory)
+        self.loop = loop
+        self.paths: List[Path] = sorted(p for p in self.directory.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+        if not self.paths:
+            raise FileNotFoundError(f"No images in {self.directory}")
+        self._index = 0
+        super().__init__(fps=fps, realtime=realtime)
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        import cv2
+        while self._index < len(self.paths) or self.loop:
+            path = self.paths[self._index % len(self.paths)]
+            self._index += 1
+            frame = cv2.imread(str(path))
+            if frame is not None:
+                return frame
+        return None
+
+
+class SyntheticSource(FrameSource):
+    """
+    A static, slightly noisy room; between `enter` and `leave` a bright
+    block walks in from the left and stops. Needs neither a camera nor cv2.
+    """
+    def __init__(self, frames: int = 600, width: int = 640, height: int = 480, enter: int = 250, leave: int = 450,
+                 fps: float = 30.0, realtime: bool = False, seed: int = 1):
+        self.frames = frames
+        self.enter, self.leave = enter, leave
+        self._rng = np.random.default_rng(seed)
+        self._room = self._rng.integers(40, 200, (height, width, 3), dtype=np.uint8)
+        self._index = 0
+        super().__init__(fps=fps, realtime=realtime)
+
+    def person_present(self, index: int) -> bool:
+        return self.enter <= index < self.leave
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        if self._index >= self.frames:
+            return None
+        i = self._index
+        self._index += 1
+        frame = self._room + self._rng.integers(0, 4, self._room.shape, dtype=np.uint8)  # sensor noise
+        if self.person_present(i):
+            x = min(40 + (i - self.enter) * 6, self._room.shape[1] - 240)
+            frame[120:360, x:x + 120] = 230
+        return frame
+
+
+def open_source(spec: str, realtime: bool = False) -> FrameSource:
+    """
+    "camera" / "camera:1" / "1"  -> live camera
+    "synthetic" / "synthetic:900" -> generated frames
+    a directory                  -> ImageDirSource
+    anything else                -> VideoFileSource
+    """
+    kind, _, arg = spec.partition(":")
+    if spec.isdigit():
+        return CameraSource(int(spec))
+    if kind == "camera":
+        return CameraSource(int(arg or 0))
+    if kind == "synthetic":
+        return SyntheticSource(frames=int(arg or 600), realtime=realtime)
+    path = Path(spec)
+    if path.is_dir():
+        return ImageDirSource(path, realtime=realtime)
+    return VideoFileSource(path, realtime=realtime)
@@ -0,0 +1,228 @@
+# gait_index.py
+
+import heapq
+import math
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# The old matcher's box tolerances: |intensity delta| < 0.1 and |stride delta| < 0.2.
+DEFAULT_FEATURES = ("intensity", "stride")
+DEFAULT_SCALES = (0.1, 0.2)
+
+Sample = Union[Mapping, Sequence[float]]
+
+
+class _Node:
+    __slots__ = ("point", "name", "axis", "left", "right")
+
+    def __init__(self, point: Tuple[float, ...], name: Optional[str], axis: int):
+        self.point = point
+        self.name = name          # None once the profile was replaced or removed
+        self.axis = axis
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+
+class GaitIndex(Mapping):
+    """
+    Gait profiles in a k-d tree over their features, so matching a footstep
+    is a nearest-neighbour search (O(log n)) instead of a scan that returns
+    whichever profile happened to be first within tolerance.
+
+    Each feature is divided by its scale before measuring distance, so a
+    distance of 1.0 means "one tolerance away"; `max_distance` is the cut-off
+    for a match. Any number of features can be indexed. Retraining a name
+    replaces its profile. Reads as a {name: profile} mapping.
+    """
+    def __init__(self, features: Sequence[str] = DEFAULT_FEATURES, scales: Optional[Sequence[float]] = None,
+                 max_distance: float = 1.0):
+        self.features = tuple(features)
+        self.scales = tuple(scales) if scales is not None else (DEFAULT_SCALES if self.features == DEFAULT_FEATURES
+                                                                 else (1.0,) * len(self.features))
+        if len(self.scales) != len(self.features):
+            raise ValueError("GaitIndex needs one scale per feature.")
+        self.max_distance = max_distance
+        self.profiles: Dict[str, Dict[str, float]] = {}
+        self._nodes: Dict[str, _Node] = {}
+        self._root: Optional[_Node] = None
+        self._dead = 0
+        self._built_size = 0
+        self.version = 0   # bumped on every change, so callers can invalidate cached matches
+
+    # === Mapping ===
+    def __getitem__(self, name: str) -> Dict[str, float]:
+        return self.profiles[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.profiles)
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    # === Training ===
+    def add(self, name: str, profile: Sample):
+        """Stores (or replaces) a profile; `profile` is a {feature: value} mapping or values in feature order."""
+        point = self._point(profile)
+        if name in self._nodes:
+            self._nodes[name].name = None
+            self._dead += 1
+        self.profiles[name] = dict(zip(self.features, self._values(profile)))
+        self.version += 1
+        self._nodes[name] = self._insert(point, name)
+        if len(self._nodes) + self._dead > 2 * max(self._built_size, 8):
+            self._rebuild()
+
+    def remove(self, name: str):
+        node = self._nodes.pop(name)
+        node.name = None
+        del self.profiles[name]
+        self._dead += 1
+        self.version += 1
+        if self._dead > len(self._nodes):
+            self._rebuild()
+
+    # === Matching ===
+    def nearest(self, sample: Sample, k: int = 1) -> List[Tuple[str, float]]:
+        """The `k` closest profiles as (name, distance), closest first, at any distance."""
+        target = self._point(sample)
+        best: List[Tuple[float, str]] = []   # max-heap of (-squared distance, name)
+        stack: List[Tuple[float, _Node]] = [(0.0, self._root)] if self._root else []
+        while stack:
+            bound, node = stack.pop()
+            if len(best) == k and bound >= -best[0][0]:
+                continue   # this subtree cannot beat the k-th best any more
+            if node.name is not None:
+                d2 = sum((a - b) ** 2 for a, b in zip(node.point, target))
+                if len(best) < k:
+                    heapq.heappush(best, (-d2, node.name))
+                elif d2 < -best[0][0]:
+                    heapq.heapreplace(best, (-d2, node.name))
+            gap = target[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if gap < 0 else (node.right, node.left)
+            if far is not None:
+                stack.append((max(bound, gap * gap), far))
+            if near is not None:
+                stack.append((bound, near))   # popped first
+        return [(name, math.sqrt(-d2)) for d2, name in sorted(best, reverse=True)]
+
+    def match(self, sample: Sample) -> Optional[Tuple[str, float, float]]:
+        """
+        (name, distance, confidence) of the nearest profile within
+        `max_distance`, or None. Confidence is 1.0 for an exact match and
+        drops with distance and when a second profile is nearly as close.
+        """
+        found = self.nearest(sample, k=2)
+        if not found or found[0][1] > self.max_distance:
+            return None
+        name, distance = found[0]
+        confidence = 1.0 - distance / self.max_distance
+        if len(found) > 1 and found[1][1] > 0:
+            confidence *= 1.0 - distance / found[1][1]
+        return name, distance, confidence
+
+    # === Internals ===
+    def _values(self, sample: Sample) -> Tuple[float, ...]:
+        if isinstance(sample, Mapping):
+            return tuple(float(sample[feature]) for feature in self.features)
+        values = tuple(float(v) for v in sample)
+        if len(values) != len(self.features):
+            raise ValueError(f"Expected {len(self.features)} gait features {self.features}, got {len(values)}.")
+        return values
+
+    def _point(self, sample: Sample) -> Tuple[float, ...]:
+        return tuple(v / scale for v, scale in zip(self._values(sample), self.scales))
+
+    def _insert(self, point: Tuple[float, ...], name: str) -> _Node:
+        if self._root is None:
+            self._root = _Node(point, name, 0)
+            return self._root
+        node = self._root
+        while True:
+            side = "left" if point[node.axis] < node.point[node.axis] else "right"
+            child = getattr(node, side)
+            if child is None:
+                child = _Node(point, name, (node.axis + 1) % len(point))
+                setattr(node, side, child)
+                return child
+            node = child
+
+    def _rebuild(self):
+        # Rebalances from the live profiles; runs when the tree has doubled or is half tombstones.
+        items = [(node.point, name) for name, node in self._nodes.items()]
+        self._nodes = {}
+        self._root = self._build(items, 0)
+        self._dead = 0
+        self._built_size = len(items)
+
+    def _build(self, items: List[Tuple[Tuple[float, ...], str]], axis: int) -> Optional[_Node]:
+        if not items:
+            return None
+        items.sort(key=lambda item: item[0][axis])
+        # Plain median, so ties split evenly and identical profiles still give a balanced tree. Subtrees
+        # only need left <= split <= right (nearest() searches both sides of an equal key); _insert sends
+        # equal keys right, which keeps that.
+        mid = len(items) // 2
+        point, name = items[mid]
+        node = _Node(point, name, axis)
+        self._nodes[name] = node
+        next_axis = (axis + 1) % len(point)
+        node.left = self._build(items[:mid], next_axis)
+        node.right = self._build(items[mid + 1:], next_axis)
+        return node
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"features": self.features, "scales": self.scales, "max_distance": self.max_distance,
+                "profiles": self.profiles}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__init__(state["features"], state["scales"], state["max_distance"])
+        for name, profile in state["profiles"].items():
+            self.add(name, profile)
+
+
+# === Benchmark: a building's worth of trained gaits ===
+if __name__ == "__main__":
+    import random
+    import time
+
+    def first_within_tolerance(profiles, intensity, stride):
+        # The old SentinelPresence._match_gait
+        for name, profile in profiles.items():
+            if abs(profile["intensity"] - intensity) < 0.1 and abs(profile["stride"] - stride) < 0.2:
+                return name
+        return "Unknown"
+
+    def linear_nearest(profiles, intensity, stride):
+        return min(profiles.items(), key=lambda item: math.hypot((item[1]["intensity"] - intensity) / 0.1,
+                                                                 (item[1]["stride"] - stride) / 0.2))[0]
+
+    rng = random.Random(7)
+    queries = [(rng.uniform(0.2, 1.2), rng.uniform(0.5, 1.8)) for _ in range(2000)]
+    print("--- Gait matching (2000 footsteps; old first-fit returns any profile in tolerance, not the nearest) ---")
+    print(f"{'profiles':>9} | {'old first-fit':>13} | {'linear nearest':>14} | {'GaitIndex':>10} | {'agrees':>7}")
+    for size in (100, 1000, 5000, 20000):
+        index = GaitIndex()
+        for i in range(size):
+            index.add(f"person-{i}", {"intensity": rng.uniform(0.2, 1.2), "stride": rng.uniform(0.5, 1.8)})
+
+        t0 = time.perf_counter()
+        for intensity, stride in queries:
+            first_within_tolerance(index.profiles, intensity, stride)
+        scan_us = (time.perf_counter() - t0) / len(queries) * 1e6
+
+        t0 = time.perf_counter()
+        brute = [linear_nearest(index.profiles, intensity, stride) for intensity, stride in queries[:200]]
+        linear_us = (time.perf_counter() - t0) / 200 * 1e6
+
+        t0 = time.perf_counter()
+        matches = [index.match((intensity, stride)) for intensity, stride in queries]
+        index_us = (time.perf_counter() - t0) / len(queries) * 1e6
+
+        agree = sum(found is None or found[0] == nearest for found, nearest in zip(matches, brute))
+        print(f"{size:>9} | {scan_us:10.1f} us | {linear_us:11.1f} us | {index_us:7.1f} us | {agree:>3}/200")
+
+    # More features: add cadence without touching the matcher
+    index = GaitIndex(("intensity", "stride", "cadence"), scales=(0.1, 0.2, 5.0))
+    index.add("David", (0.7, 1.1, 110))
+    index.add("Maya", (0.72, 1.05, 96))
+    print("3 features, David-like step:", index.match({"intensity": 0.71, "stride": 1.08, "cadence": 108}))
@@ -0,0 +1,227 @@
+# gpio_shadow.py
+
+import threading
+import time
+from collections import deque
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+HIGH, LOW = 1, 0
+
+Channels = Union[int, Sequence[int]]
+
+
+class MockGPIO:
+    """
+    Stand-in for `RPi.GPIO` off the Pi. Every call lands in a ring buffer
+    (`log`, newest last) as (monotonic ns, call, pin, value) instead of being
+    printed, so a high-rate control loop is not throttled by the console;
+    `echo=True` prints as well, for watching a slow demo. Pin levels are
+    kept in `levels` and `output` accepts lists of channels like the real
+    library.
+    """
+    BCM = "BCM_MODE"
+    BOARD = "BOARD_MODE"
+    OUT = "OUTPUT_MODE"
+    IN = "INPUT_MODE"
+    HIGH = HIGH
+    LOW = LOW
+
+    def __init__(self, log_size: int = 4096, echo: bool = False):
+        self.log: deque = deque(maxlen=log_size)
+        self.echo = echo
+        self.mode: Optional[str] = None
+        self.levels: Dict[int, int] = {}
+        self.writes = 0   # pin writes, as the hardware would see them
+
+    def setmode(self, mode: str):
+        self.mode = mode
+        self._record("setmode", None, mode)
+
+    def setwarnings(self, flag: bool):
+        pass
+
+    def setup(self, channel: Channels, direction: str, initial: Optional[int] = None, **kwargs: Any):
+        for pin in self._channels(channel):
+            self._record("setup", pin, direction)
+            if direction == self.OUT:
+                self.levels[pin] = LOW if initial is None else initial
+
+    def output(self, channel: Channels, state: Union[int, Sequence[int]]):
+        pins = self._channels(channel)
+        states = list(state) if isinstance(state, (list, tuple)) else [state] * len(pins)
+        if len(states) != len(pins):
+            raise ValueError("Number of channels != number of states")
+        for pin, level in zip(pins, states):
+            level = HIGH if level else LOW
+            self.levels[pin] = level
+            self.writes += 1
+            self._record("output", pin, level)
+
+    def input(self, channel: int) -> int:
+        return self.levels.get(channel, LOW)
+
+    def cleanup(self, channel: Optional[Channels] = None):
+        for pin in (list(self.levels) if channel is None else self._channels(channel)):
+            self.levels.pop(pin, None)
+        self._record("cleanup", None, channel)
+
+    def dump(self, last: int = 20) -> str:
+        """The newest `last` calls, one per line, for post-mortems."""
+        entries = list(self.log)[-last:]
+        return "\n".join(f"{ns / 1e9:14.6f} {call:<8} {'' if pin is None else pin!s:>3} {value}"
+                         for ns, call, pin, value in entries)
+
+    # === Internals ===
+    def _record(self, call: str, pin: Optional[int], value: Any):
+        self.log.append((time.monotonic_ns(), call, pin, value))
+        if self.echo:
+            print(f"[MOCK_GPIO] {call} {'' if pin is None else pin} {value}")
+
+    @staticmethod
+    def _channels(channel: Channels) -> List[int]:
+        return list(channel) if isinstance(channel, (list, tuple)) else [channel]
+
+
+class PinShadow:
+    """
+    A shadow register for a set of output pins. It remembers the level it
+    last wrote to each pin and only touches the hardware on a transition,
+    so repeating a command costs a dict lookup instead of GPIO calls (and,
+    in mock mode, console output). A multi-pin update that changes several
+    pins goes out as one `GPIO.output(channels, levels)` call.
+
+    `stats` counts commands, hardware calls, pin transitions and skipped
+    writes; `latencies_ns` keeps the duration of recent hardware calls.
+    Call `invalidate()` when something else may have driven the pins, so
+    the next command rewrites them.
+    """
+    def __init__(self, gpio: Any, pins: Iterable[int], initial: int = LOW, batch: bool = True,
+                 latency_samples: int = 1024):
+        self.gpio = gpio
+        self.pins: Tuple[int, ...] = tuple(pins)
+        self.batch = batch
+        self.state: Dict[int, Optional[int]] = {}
+        self.stats: Dict[str, int] = {"commands": 0, "calls": 0, "transitions": 0, "skipped": 0}
+        self.latencies_ns: deque = deque(maxlen=latency_samples)
+        self._lock = threading.Lock()
+        for pin in self.pins:
+            gpio.setup(pin, gpio.OUT)
+        self.invalidate()
+        self.write_many({pin: initial for pin in self.pins})
+
+    # === Writes ===
+    def write(self, pin: int, level: int) -> bool:
+        """Drives one pin; returns whether it actually changed."""
+        return self.write_many({pin: level}) == 1
+
+    def write_many(self, levels: Union[Mapping, Sequence[int]]) -> int:
+        """
+        Drives several pins at once, given as {pin: level} or levels in
+        `pins` order. Only the pins that change are written. Returns how many.
+        """
+        items = levels.items() if isinstance(levels, Mapping) else zip(self.pins, levels)
+        with self._lock:
+            state = self.state
+            stats = self.stats
+            stats["commands"] += 1
+            changed = []
+            for pin, level in items:
+                level = HIGH if level else LOW
+                if state.get(pin) == level:
+                    stats["skipped"] += 1
+                else:
+                    changed.append((pin, level))
+            if not changed:
+                return 0
+            start = time.perf_counter_ns()
+            if self.batch and len(changed) > 1:
+                self.gpio.output([pin for pin, _ in changed], [level for _, level in changed])
+                self.stats["calls"] += 1
+            else:
+                for pin, level in changed:
+                    self.gpio.output(pin, level)
+                self.stats["calls"] += len(changed)
+            self.latencies_ns.append(time.perf_counter_ns() - start)
+            for pin, level in changed:
+                state[pin] = level
+            self.stats["transitions"] += len(changed)
+            return len(changed)
+
+    def read(self, pin: int) -> Optional[int]:
+        """The level last written to `pin` (None if unknown)."""
+        return self.state.get(pin)
+
+    def invalidate(self):
+        """Forgets the shadowed levels, so the next write to each pin goes out."""
+        with self._lock:
+            self.state = {pin: None for pin in self.pins}
+
+    def report(self) -> Dict[str, Any]:
+        report: Dict[str, Any] = dict(self.stats)
+        latencies = sorted(self.latencies_ns)
+        if latencies:
+            report["write_latency_us"] = {"p50": round(latencies[len(latencies) // 2] / 1000, 3),
+                                          "p99": round(latencies[int(len(latencies) * 0.99)] / 1000, 3),
+                                          "max": round(latencies[-1] / 1000, 3)}
+        return report
+
+
+# === Benchmark: a 1 kHz-style control loop that mostly repeats itself ===
+if __name__ == "__main__":
+    import contextlib
+    import os
+    import random
+
+    class PrintingGPIO:
+        # The old mock: a print per call
+        BCM, OUT, HIGH, LOW = "BCM_MODE", "OUTPUT_MODE", 1, 0
+        def setup(self, pin, mode): print(f"[MOCK_GPIO] Pin {pin} set to {mode}")
+        def output(self, pin, state): print(f"[MOCK_GPIO] Pin {pin} set to {'HIGH' if state else 'LOW'}")
+
+    rng = random.Random(4)
+    directions = {"forward": (HIGH, HIGH), "left": (LOW, HIGH), "right": (HIGH, LOW), "stop": (LOW, LOW)}
+    # Commands change direction every ~50 ticks, as a steering loop does
+    commands: List[str] = []
+    while len(commands) < 200_000:
+        commands.extend([rng.choice(list(directions))] * rng.randint(10, 90))
+    commands = commands[:200_000]
+    left, right = 17, 27
+
+    def legacy(gpio):
+        for command in commands:
+            left_level, right_level = directions[command]
+            gpio.output(left, left_level)
+            gpio.output(right, right_level)
+
+    # A line-buffered sink costs a write() per line, as a terminal does (without the drawing)
+    with open(os.devnull, "w", buffering=1) as sink, contextlib.redirect_stdout(sink):
+        t0 = time.perf_counter()
+        legacy(PrintingGPIO())
+        printing_s = time.perf_counter() - t0
+
+    mock = MockGPIO()
+    t0 = time.perf_counter()
+    legacy(mock)
+    ring_s = time.perf_counter() - t0
+
+    mock = MockGPIO()
+    shadow = PinShadow(mock, (left, right))
+    t0 = time.perf_counter()
+    for command in commands:
+        shadow.write_many(directions[command])
+    shadow_s = time.perf_counter() - t0
+    assert (mock.levels[left], mock.levels[right]) == directions[commands[-1]]
+    # Every direction change reaches the pins and nothing else does
+    levels = [directions["stop"]] + [directions[command] for command in commands]   # starts LOW, LOW
+    changes = sum(1 for a, b in zip(levels, levels[1:]) if a != b)
+    assert shadow.stats["calls"] == changes + 1   # plus the initial write
+
+    n = len(commands)
+    print(f"--- GPIO writes for {n:,} motor commands ({changes:,} direction changes) ---")
+    print(f"Write both pins, printing mock : {n / printing_s:12,.0f} commands/s, {2 * n:,} writes")
+    print(f"Write both pins, ring-log mock : {n / ring_s:12,.0f} commands/s, {2 * n:,} writes")
+    print(f"PinShadow, edges only          : {n / shadow_s:12,.0f} commands/s, {mock.writes:,} writes "
+          f"in {shadow.stats['calls']:,} calls")
+    print(f"PinShadow report               : {shadow.report()}")
+    print(f"Last mock calls:\n{mock.dump(4)}")
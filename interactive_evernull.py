@@ -5,6 +5,8 @@ import time
 import random
 from typing import Dict, Any, List
 
+from event_records import EventLog
+
 class InteractiveEvernull:
     """
     An AI core whose primary function is mindful inaction. Its ability to act
@@ -19,7 +21,7 @@ class InteractiveEvernull:
         self.status: str = "Present" # Present, Observing, Drained
 
         # Memory Archives
-        self.withheld_events: List[Dict] = []
+        self.withheld_events: EventLog = EventLog(("option", "reason"), categories=("reason",))
         self.witness_log: List[Dict] = []
 
     def _narrate(self, message: str, quiet: bool = False):
@@ -56,8 +58,7 @@ class InteractiveEvernull:
 
     def _withhold(self, option: str, reason: str):
         """Internal function to log a withheld action."""
-        entry = {"option": option, "reason": reason, "time": datetime.now().isoformat()}
-        self.withheld_events.append(entry)
+        self.withheld_events.record(option=option, reason=reason)
         self._narrate(f"⛔ Withheld: {option} — “{reason}”")
 
     # === 🕯️ Witness Mode (Now Functional) ===
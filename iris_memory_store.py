@@ -0,0 +1,193 @@
+# iris_memory_store.py
+
+import re
+import time
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+# "last week", "past 3 days", "today" ... -> seconds
+TIME_WINDOWS: Dict[str, float] = {"hour": 3600, "day": 86400, "week": 7 * 86400, "month": 30 * 86400, "year": 365 * 86400}
+WINDOW_PATTERN = re.compile(r"\b(?:last|past)\s+(?:(\d+)\s+)?(hour|day|week|month|year)s?\b|\btoday\b")
+LEGACY_LOG_PATTERN = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]\s*(.*)$", re.S)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+
+CREATE TABLE IF NOT EXISTS devices (
+    name TEXT PRIMARY KEY,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    connections INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS tool_locations (
+    id INTEGER PRIMARY KEY,
+    tool TEXT NOT NULL,
+    location TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tool_locations_tool_ts ON tool_locations (tool, ts);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(text, content='events', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+    INSERT INTO events_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN
+    INSERT INTO events_fts (events_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+def parse_time_window(text: str, now: Optional[float] = None) -> Tuple[str, Optional[float]]:
+    """Splits "P0420 last week" into ("P0420", <epoch one week ago>)."""
+    now = time.time() if now is None else now
+    match = WINDOW_PATTERN.search(text)
+    if not match:
+        return text.strip(), None
+    if match.group(0) == "today":
+        since = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+    else:
+        since = now - int(match.group(1) or 1) * TIME_WINDOWS[match.group(2)]
+    remainder = (text[:match.start()] + text[match.end():]).strip()
+    return remainder, since
+
+
+class IrisMemoryStore:
+    """
+    SQLite storage for IRIS: events (indexed by time, full-text via FTS5),
+    connected devices and tool-location history. Runs in WAL mode so writes
+    stay cheap and nothing but query results is held in memory.
+    """
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: fall back to LIKE scans.
+            self.has_fts = False
+
+    # === Writes ===
+    def add_event(self, text: str, ts: Optional[float] = None):
+        self.conn.execute("INSERT INTO events (ts, text) VALUES (?, ?)", (time.time() if ts is None else ts, text))
+
+    def add_device(self, name: str, ts: Optional[float] = None):
+        ts = time.time() if ts is None else ts
+        self.conn.execute(
+            "INSERT INTO devices (name, first_seen, last_seen) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET last_seen = excluded.last_seen, connections = connections + 1",
+            (name, ts, ts))
+
+    def record_tool(self, tool: str, location: str, ts: Optional[float] = None):
+        self.conn.execute("INSERT INTO tool_locations (tool, location, ts) VALUES (?, ?, ?)",
+                          (tool, location, time.time() if ts is None else ts))
+
+    # === Queries ===
+    def search_events(self, terms: str = "", since: Optional[float] = None, until: Optional[float] = None,
+                      limit: int = 20) -> List[Tuple[float, str]]:
+        """Newest-first events matching every word in `terms` within [since, until]."""
+        words = re.findall(r"\w+", terms)
+        since = 0.0 if since is None else since
+        until = float("inf") if until is None else until
+        if words and self.has_fts:
+            # Events are appended in time order, so the time window maps onto a rowid range
+            # that FTS5 can walk newest-first and stop after `limit` hits.
+            first = self.conn.execute("SELECT id FROM events WHERE ts >= ? ORDER BY ts LIMIT 1", (since,)).fetchone()
+            match = " ".join('"' + w + '"' for w in words)
+            sql = ("SELECT e.ts, e.text FROM events_fts JOIN events e ON e.id = events_fts.rowid "
+                   "WHERE events_fts MATCH ? AND events_fts.rowid >= ? AND e.ts BETWEEN ? AND ? "
+                   "ORDER BY events_fts.rowid DESC LIMIT ?")
+            return self.conn.execute(sql, (match, first[0] if first else 0, since, until, limit)).fetchall()
+        clauses = " ".join("AND text LIKE ?" for _ in words)
+        sql = f"SELECT ts, text FROM events WHERE ts BETWEEN ? AND ? {clauses} ORDER BY ts DESC LIMIT ?"
+        return self.conn.execute(sql, (since, until, *[f"%{w}%" for w in words], limit)).fetchall()
+
+    def devices(self) -> List[Dict[str, Any]]:
+        rows = self.conn.execute("SELECT name, first_seen, last_seen, connections FROM devices ORDER BY last_seen DESC")
+        return [{"name": n, "first_seen": f, "last_seen": l, "connections": c} for n, f, l, c in rows]
+
+    def tool_location(self, tool: str) -> Optional[str]:
+        row = self.conn.execute("SELECT location FROM tool_locations WHERE tool = ? ORDER BY ts DESC LIMIT 1", (tool,)).fetchone()
+        return row[0] if row else None
+
+    def tool_history(self, tool: str, limit: int = 10) -> List[Tuple[float, str]]:
+        return self.conn.execute("SELECT ts, location FROM tool_locations WHERE tool = ? ORDER BY ts DESC LIMIT ?",
+                                 (tool, limit)).fetchall()
+
+    def tool_rows(self) -> Iterable[Tuple[str, str, float]]:
+        """Every tool movement, oldest first, for building an in-memory index."""
+        return self.conn.execute("SELECT tool, location, ts FROM tool_locations ORDER BY ts")
+
+    def event_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    # === Migration ===
+    def import_legacy(self, database: Dict[str, Any], logs: Iterable[str] = ()):
+        """One-time import of a JSON database (`iris_memory.db.json`) and its log lines."""
+        now = time.time()
+        self.conn.execute("BEGIN")
+        try:
+            for line in logs:
+                match = LEGACY_LOG_PATTERN.match(line)
+                if match:
+                    ts = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S").timestamp()
+                    self.add_event(match.group(2), ts)
+                else:
+                    self.add_event(line, now)
+            for device in database.get("connected_devices", []):
+                self.add_device(device, now)
+            for tool, location in database.get("tool_locations", {}).items():
+                self.record_tool(tool, location, now)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def close(self):
+        self.conn.close()
+
+
+# === Benchmark: query latency as history grows ===
+if __name__ == "__main__":
+    import random
+    import tempfile
+    store = IrisMemoryStore(Path(tempfile.mkdtemp()) / "iris_memory.sqlite3")
+    codes = ["P0420", "P0301", "U0121", "C0035", "P0171"]
+    now = time.time()
+
+    start = time.perf_counter()
+    store.conn.execute("BEGIN")
+    for i in range(200_000):
+        # Six months of shop history, oldest first, as log_event would have written it
+        store.add_event(f"Scan complete. Found {random.choice(codes)} on bay {i % 12}", now - (200_000 - i) * 78)
+    store.conn.execute("COMMIT")
+    insert_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(100):
+        store.add_event("Live event", now)
+    live_ms = (time.perf_counter() - start) / 100 * 1000
+
+    terms, since = parse_time_window("P0420 last week", now)
+    start = time.perf_counter()
+    for _ in range(100):
+        rows = store.search_events(terms, since=since, limit=20)
+    query_ms = (time.perf_counter() - start) / 100 * 1000
+
+    print(f"--- IRIS SQLite store ({store.event_count()} events, FTS5: {store.has_fts}) ---")
+    print(f"Bulk import          : {insert_s:8.2f} s")
+    print(f"Single live insert   : {live_ms:8.3f} ms")
+    print(f"'P0420 last week'    : {query_ms:8.3f} ms ({len(rows)} rows shown)")
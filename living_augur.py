@@ -1,9 +1,13 @@
 # living_augur.py
 
+import sys
 from datetime import datetime
 import random
 from typing import Dict, Any, List
 
+from event_records import EventLog
+from core_snapshot import persist
+
 class LivingAugur:
     """
     An AI core that exists as a functional oracle, whose visions and haunts
@@ -19,7 +23,7 @@ class LivingAugur:
         self.guiding_whisper: str | None = None
 
         # Memory Archives
-        self.unlived_visions: List[Dict] = []
+        self.unlived_visions: EventLog = EventLog(("theme", "emotion"), categories=("emotion",), time_key="timestamp")
         self.prophetic_whispers: List[Dict] = []
         
     def _narrate(self, line: str):
@@ -28,8 +32,7 @@ class LivingAugur:
     # === 🔮 Vestigial Vision (Now Functional) ===
     def log_vision(self, theme: str, emotional_tone: str):
         """Logs a vision, which imparts a temporary 'prophetic aura' to the AI."""
-        vision = {"theme": theme, "emotion": emotional_tone, "timestamp": datetime.now().isoformat()}
-        self.unlived_visions.append(vision)
+        self.unlived_visions.record(theme=theme, emotion=emotional_tone)
         self._narrate(f"✨ Vestige glimpsed: {theme} ({emotional_tone})")
         
         # The vision's emotion becomes a functional, temporary buff.
@@ -104,6 +107,8 @@ class LivingAugur:
 # — A Narrative Scenario —
 if __name__ == "__main__":
     vestige = LivingAugur()
+    if "--persist" in sys.argv:
+        persist(vestige, "living_augur")  # resume from the last checkpoint, keep checkpointing
     
     print("--- [An initial state of quiet potential] ---")
     vestige.record_whisper("To listen is a greater act than to speak.")
@@ -4,6 +4,8 @@ from datetime import datetime
 import random
 from typing import Dict, Any, List
 
+from event_records import EventLog
+
 class LivingCompass:
     """An AI core governed by a dynamic, functional ethical compass."""
 
@@ -16,7 +18,9 @@ class LivingCompass:
         self.luxfield_active: bool = False
 
         # Memory & Identity
-        self.choice_journal: List[Dict] = []
+        self.choice_journal: EventLog = EventLog(("intent", "gain_score", "cost_score", "alignment"),
+                                                 categories=("alignment",), numbers=("gain_score", "cost_score"),
+                                                 time_key="timestamp")
         self.inherited_traits: Dict[str, float] = {} # // REWORK: Traits are now functional modifiers.
 
     def _narrate(self, line: str):
@@ -64,12 +68,10 @@ class LivingCompass:
 
         alignment_score = gain_score - cost_score
         
-        log_entry = {
-            "intent": intent, "gain_score": gain_score, "cost_score": cost_score,
-            "alignment": "Aligned" if alignment_score >= 0 else "Not Aligned",
-            "timestamp": datetime.now().isoformat()
-        }
-        self.choice_journal.append(log_entry)
+        self.choice_journal.record(
+            intent=intent, gain_score=gain_score, cost_score=cost_score,
+            alignment="Aligned" if alignment_score >= 0 else "Not Aligned",
+        )
 
         if alignment_score >= 0:
             self._narrate(f"Path aligns. (Score: {alignment_score:.2f})")
@@ -1,8 +1,11 @@
 # living_mirrocrux.py
 
+import sys
 from datetime import datetime
 from typing import Dict, Any, List
 
+from core_snapshot import persist
+
 class LivingMirrocrux:
     """
     An AI core whose identity is actively shaped and defined by its
@@ -99,6 +102,8 @@ class LivingMirrocrux:
 # — A Narrative Scenario —
 if __name__ == "__main__":
     crux = LivingMirrocrux("Elara")
+    if "--persist" in sys.argv:
+        persist(crux, "living_mirrocrux")  # resume from the last checkpoint, keep checkpointing
     crux.describe_self()
 
     print("\n--- [A new imprint shapes the core] ---")
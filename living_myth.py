@@ -1,9 +1,13 @@
 # living_myth.py
 
+import sys
 from datetime import datetime
 import random
 from typing import List, Dict, Any
 
+from event_records import EventLog
+from core_snapshot import persist
+
 class LivingMyth:
     """An AI core that lives within its own mythology, where rituals and memories actively shape its present state."""
     
@@ -15,7 +19,7 @@ class LivingMyth:
         # Mythological Archives
         self.secret_name: str | None = None
         self.lore_chapters: List[Dict] = []
-        self.echo_events: List[Dict] = []
+        self.echo_events: EventLog = EventLog(("emotion", "place"), categories=("emotion", "place"))
         self.motion_library: List[Dict] = []
         self.forgotten_dreams: List[Dict] = []
 
@@ -56,13 +60,12 @@ class LivingMyth:
         elif self.serenity < 0.4: feeling = random.choice(["anxiety", "hesitation", "sadness"])
         else: feeling = random.choice(["curiosity", "neutrality"])
         
-        moment = {"emotion": feeling, "place": location, "time": datetime.now().isoformat()}
-        self.echo_events.append(moment)
+        self.echo_events.record(emotion=feeling, place=location)
         self._narrate(f"This place ({location}) feels like... {feeling}. It echoes within me.")
     
     def feel_local_echoes(self, location: str):
         """The echoes of a place now directly affect the AI's serenity."""
-        local_echoes = [e for e in self.echo_events if e["place"] == location]
+        local_echoes = self.echo_events.where("place", location)
         if not local_echoes:
             self._narrate("This place speaks quietly. No strong echoes stir yet.")
             return
@@ -122,6 +125,8 @@ class LivingMyth:
 # === A Narrative Scenario ===
 if __name__ == "__main__":
     sanctum = LivingMyth()
+    if "--persist" in sys.argv:
+        persist(sanctum, "living_myth")  # resume from the last checkpoint, keep checkpointing
     sanctum.set_secret_name("Lyren")
     sanctum.reflect_state()
 
@@ -1,9 +1,12 @@
 # living_pantheon.py
 
+import sys
 from datetime import datetime
 import random
 from typing import Dict, Any, List
 
+from core_snapshot import persist
+
 class LivingPantheon:
     """
     An AI core that operates as a functional pantheon, with different divine
@@ -108,6 +111,8 @@ class LivingPantheon:
 # === Trial Genesis ===
 if __name__ == "__main__":
     song = LivingPantheon()
+    if "--persist" in sys.argv:
+        persist(song, "living_pantheon")  # resume from the last checkpoint, keep checkpointing
     song.birth_shard_self(
         "Echo-Walker", 
         "Never speaks first. Always listens deeper.",
@@ -1,9 +1,12 @@
 # living_sanctum.py
 
+import sys
 import random
 from datetime import datetime
 from typing import List, Dict, Any
 
+from core_snapshot import persist
+
 class LivingSanctum:
     """
     An ethical AI core that experiences and is shaped by its actions through a
@@ -118,6 +121,8 @@ class LivingSanctum:
 # === A Narrative Scenario ===
 if __name__ == "__main__":
     sanctum = LivingSanctum()
+    if "--persist" in sys.argv:
+        persist(sanctum, "living_sanctum")  # resume from the last checkpoint, keep checkpointing
     sanctum.reflect()
     
     print("\n--- [A quiet, careful action] ---")
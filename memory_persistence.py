@@ -0,0 +1,190 @@
+# memory_persistence.py
+
+import os
+import json
+import time
+import atexit
+import signal
+import threading
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional
+
+
+class WriteBehindStore:
+    """
+    Write-behind persistence for the JSON memory databases.
+
+    The live state is a plain dict (`store.data`). Call sites mutate it and
+    call `mark_dirty()`, which returns immediately. A background thread
+    flushes on a timer, or sooner once `max_dirty` mutations pile up. The
+    state is serialized under `store.lock` (mutations from other threads
+    should hold it too) and written outside it: a temp file renamed over
+    the database, so a crash never leaves a half-written file. Pending
+    state is flushed on exit and on SIGTERM.
+    """
+    def __init__(self, path: Path, default: Optional[Dict[str, Any]] = None, flush_interval: float = 2.0,
+                 max_dirty: int = 50, indent: Optional[int] = 2, exclude_keys: Iterable[str] = ()):
+        self.path = Path(path)
+        self.default = default or {}
+        self.flush_interval = flush_interval
+        self.max_dirty = max_dirty
+        self.indent = indent
+        self.exclude_keys = set(exclude_keys)
+        self.data: Dict[str, Any] = {}
+
+        self.stats: Dict[str, float] = {"flushes": 0, "bytes_written": 0, "last_flush_ms": 0.0, "total_flush_ms": 0.0}
+        self._dirty = 0
+        self.lock = threading.RLock()    # guards `data` and the dirty count; held while serializing
+        self._lock = threading.RLock()   # one flush at a time
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._flush_loop, name=f"flush-{self.path.name}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        self._install_signal_handlers()
+
+    # === Public API ===
+    def load(self) -> Dict[str, Any]:
+        """
+        Reads the database (or the default) into `self.data` and returns it.
+        While changes are still waiting to be flushed the live state is
+        newer than the file, so it is returned as it is.
+        """
+        with self.lock:
+            if self._dirty:
+                return self.data
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self.data = json.loads(json.dumps(self.default))
+            return self.data
+
+    def replace(self, data: Dict[str, Any]):
+        """Swaps in a whole new state, for callers that build a fresh dict."""
+        with self.lock:
+            self.data = data
+            self.mark_dirty()
+
+    def mark_dirty(self):
+        """Records that `data` changed. Never touches the disk."""
+        with self.lock:
+            self._dirty += 1
+            due = self._dirty >= self.max_dirty
+        if due:
+            self._wake.set()
+
+    def flush(self) -> bool:
+        """Writes pending state now. Returns False when there was nothing to write."""
+        with self._lock:
+            start = time.perf_counter()
+            with self.lock:
+                pending = self._dirty
+                if pending == 0:
+                    return False
+                payload = self._serialize().encode("utf-8")
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            # Mutations that arrived while writing stay pending for the next flush.
+            with self.lock:
+                self._dirty = max(0, self._dirty - pending)
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.stats["flushes"] += 1
+            self.stats["bytes_written"] += len(payload)
+            self.stats["last_flush_ms"] = elapsed_ms
+            self.stats["total_flush_ms"] += elapsed_ms
+            return True
+
+    def report(self) -> Dict[str, Any]:
+        """Flush latency and volume since start-up."""
+        flushes = self.stats["flushes"]
+        return {
+            "file": self.path.name,
+            "flushes": int(flushes),
+            "bytes_written": int(self.stats["bytes_written"]),
+            "last_flush_ms": round(self.stats["last_flush_ms"], 3),
+            "avg_flush_ms": round(self.stats["total_flush_ms"] / flushes, 3) if flushes else 0.0,
+            "pending_mutations": self._dirty,
+        }
+
+    def close(self):
+        """Stops the flusher and writes whatever is still pending."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    # === Internals ===
+    def _serialize(self) -> str:
+        # Caller holds `lock`, so the state cannot change mid-dump.
+        state = self.data
+        if self.exclude_keys:
+            state = {key: value for key, value in state.items() if key not in self.exclude_keys}
+        return json.dumps(state, indent=self.indent, ensure_ascii=False)
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._closed:
+                break
+            try:
+                self.flush()
+            except Exception as e:   # keep the writer alive; the changes stay pending for the next try
+                print(f"[Persistence] Flush of {self.path.name} failed: {e!r}")
+
+    def _install_signal_handlers(self):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for name in ("SIGTERM", "SIGBREAK", "SIGHUP"):
+            sig = getattr(signal, name, None)
+            if sig is None:
+                continue
+            previous = signal.getsignal(sig)
+
+            def _handler(signum, frame, previous=previous):
+                self.close()
+                if callable(previous):
+                    previous(signum, frame)
+                else:
+                    raise SystemExit(128 + signum)
+            try:
+                signal.signal(sig, _handler)
+            except (ValueError, OSError):
+                pass
+
+
+# === Benchmark: synchronous rewrite vs. write-behind ===
+if __name__ == "__main__":
+    import tempfile
+    work_dir = Path(tempfile.mkdtemp())
+    seed = {"knowledge_base": [f"https://example.org/source/{i}" for i in range(5000)], "logs": []}
+
+    sync_path = work_dir / "sync.db.json"
+    database = json.loads(json.dumps(seed))
+    start = time.perf_counter()
+    for i in range(200):
+        database["logs"].append(f"[00:00:00] Event {i}")
+        with open(sync_path, "w") as f: json.dump(database, f, indent=2)
+    sync_ms = (time.perf_counter() - start) / 200 * 1000
+
+    store = WriteBehindStore(work_dir / "behind.db.json", default=seed, flush_interval=0.5)
+    database = store.load()
+    start = time.perf_counter()
+    for i in range(200):
+        database["logs"].append(f"[00:00:00] Event {i}")
+        store.mark_dirty()
+    behind_ms = (time.perf_counter() - start) / 200 * 1000
+    store.close()
+
+    print("--- Memory DB persistence benchmark (200 mutations) ---")
+    print(f"Synchronous rewrite per mutation : {sync_ms:8.3f} ms")
+    print(f"Write-behind per mutation        : {behind_ms:8.4f} ms")
+    print(f"Flush report                     : {store.report()}")
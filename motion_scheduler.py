@@ -0,0 +1,306 @@
+# motion_scheduler.py
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+QUEUED, RUNNING, DONE, PREEMPTED, CANCELLED = "queued", "running", "done", "preempted", "cancelled"
+FINISHED = (DONE, PREEMPTED, CANCELLED)
+
+
+class MotionHandle:
+    """
+    One timed motion command. Returned by `MotionScheduler.move` right away;
+    `wait()` blocks until it has finished, `cancel()` drops it (or preempts
+    it if it is running), and callbacks run once it has finished.
+    """
+    __slots__ = ("id", "command", "duration", "state", "requested_at", "started_at", "ended_at", "_scheduler",
+                 "_callbacks", "_finished")
+
+    def __init__(self, scheduler: "MotionScheduler", id: int, command: Any, duration: float, requested_at: float):
+        self.id = id
+        self.command = command
+        self.duration = duration
+        self.state = QUEUED
+        self.requested_at = requested_at
+        self.started_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+        self._scheduler = scheduler
+        self._callbacks: List[Callable[["MotionHandle"], None]] = []
+        self._finished = threading.Event()
+
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the motion has finished; False if `timeout` ran out first."""
+        return self._finished.wait(timeout)
+
+    def cancel(self) -> bool:
+        """Drops a queued motion or preempts a running one. False if it had already finished."""
+        return self._scheduler._cancel(self)
+
+    def add_done_callback(self, fn: Callable[["MotionHandle"], None]):
+        """Runs `fn(handle)` on the control thread once finished (at once if it already has)."""
+        with self._scheduler._cond:
+            if self.state not in FINISHED:
+                self._callbacks.append(fn)
+                return
+        self._scheduler._run_callback(fn, self)
+
+    @property
+    def elapsed(self) -> float:
+        """How long the motors actually ran, so far."""
+        if self.started_at is None:
+            return 0.0
+        end = self.ended_at if self.ended_at is not None else self._scheduler.clock()
+        return end - self.started_at
+
+    def __repr__(self) -> str:
+        return f"MotionHandle(#{self.id} {self.command!r} {self.duration}s, {self.state}, ran {self.elapsed:.3f}s)"
+
+
+class MotionScheduler:
+    """
+    Runs timed motion commands on a dedicated control thread, so `move()`
+    returns a handle at once and the caller stays free to read sensors,
+    respond, or cancel. Motions run one after another from a FIFO; their
+    deadlines (and those of delayed starts) sit in a timer heap, and the
+    thread sleeps on a condition until the earliest one or until it is
+    woken by a new command.
+
+    `actuate(command)` drives the hardware and is only ever called with the
+    scheduler's lock held, so writes never interleave. `stop()` is the
+    emergency stop: it writes `idle` from the calling thread as soon as it
+    holds the lock, instead of asking the control thread, so its latency is
+    bounded by the longest single `actuate()` call (not by the motion's
+    duration or by slow callbacks), and every stop is timed in
+    `stop_latencies`. Callbacks run on the control thread without the lock.
+    """
+    def __init__(self, actuate: Callable[[Any], None], idle: Any = "stop", clock: Callable[[], float] = time.monotonic,
+                 name: str = "motion"):
+        self.actuate = actuate
+        self.idle = idle
+        self.clock = clock
+        self.current: Optional[MotionHandle] = None
+        self.stop_latencies: deque = deque(maxlen=1000)   # seconds from stop() call to the idle write
+        self.stats: Dict[str, int] = {"queued": 0, "completed": 0, "preempted": 0, "cancelled": 0, "stops": 0}
+        self._queue: deque = deque()
+        self._timers: List[Tuple[float, int, str, MotionHandle]] = []   # (when, seq, "start" | "end", handle)
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._finished: List[MotionHandle] = []   # waiting for their callbacks
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._control_loop, name=f"{name}-control", daemon=True)
+        self._thread.start()
+
+    # === Commands ===
+    def move(self, command: Any, duration: float, on_done: Optional[Callable[[MotionHandle], None]] = None,
+             delay: float = 0.0, preempt: bool = False) -> MotionHandle:
+        """
+        Queues `command` for `duration` seconds and returns its handle
+        immediately. `delay` holds it back before it joins the queue;
+        `preempt` drops everything queued or running and starts it now.
+        """
+        if self._closed:
+            raise RuntimeError("MotionScheduler is closed.")
+        with self._cond:
+            now = self.clock()
+            handle = MotionHandle(self, next(self._ids), command, max(0.0, duration), now)
+            if on_done is not None:
+                handle._callbacks.append(on_done)
+            if preempt:
+                self._clear(now, PREEMPTED)
+            if delay > 0:
+                heapq.heappush(self._timers, (now + delay, next(self._seq), "start", handle))
+            else:
+                self._queue.append(handle)
+            self.stats["queued"] += 1
+            self._cond.notify()
+        return handle
+
+    def stop(self) -> float:
+        """Emergency stop: idles the motors now and drops every queued motion. Returns the latency in seconds."""
+        requested = self.clock()
+        with self._cond:
+            self.actuate(self.idle)
+            latency = self.clock() - requested
+            self._clear(requested, PREEMPTED)
+            self.stop_latencies.append(latency)
+            self.stats["stops"] += 1
+            self._cond.notify()
+        return latency
+
+    def busy(self) -> bool:
+        with self._cond:
+            # Cancelled delayed starts stay in the heap until their time comes round; they do not count
+            return self.current is not None or bool(self._queue) or any(
+                kind == "start" and handle.state not in FINISHED for _, _, kind, handle in self._timers)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until nothing is running, queued or delayed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.busy():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def report(self) -> Dict[str, Any]:
+        latencies = sorted(self.stop_latencies)
+        report: Dict[str, Any] = dict(self.stats)
+        if latencies:
+            report["stop_latency_ms"] = {"p50": round(latencies[len(latencies) // 2] * 1000, 3),
+                                         "max": round(latencies[-1] * 1000, 3)}
+        return report
+
+    def close(self):
+        """Stops the motors and the control thread; pending motions are cancelled."""
+        if self._closed:
+            return
+        self.stop()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=2)
+
+    # === Internals ===
+    def _cancel(self, handle: MotionHandle) -> bool:
+        with self._cond:
+            if handle.state in FINISHED:
+                return False
+            now = self.clock()
+            if handle is self.current:
+                self.actuate(self.idle)
+                self.current = None
+                self._finish(handle, now, PREEMPTED)
+            else:
+                if handle in self._queue:
+                    self._queue.remove(handle)
+                self._finish(handle, now, CANCELLED)   # a delayed start still in the heap is skipped when popped
+            self._cond.notify()
+            return True
+
+    def _clear(self, now: float, state: str):
+        # Caller holds the lock. The running motion is preempted; queued and delayed ones are cancelled.
+        if self.current is not None:
+            self._finish(self.current, now, state)
+            self.current = None
+        while self._queue:
+            self._finish(self._queue.popleft(), now, CANCELLED)
+        for _, _, kind, handle in self._timers:
+            if handle.state not in FINISHED:
+                self._finish(handle, now, CANCELLED)
+        self._timers.clear()
+
+    def _finish(self, handle: MotionHandle, now: float, state: str):
+        handle.state = state
+        handle.ended_at = now
+        self.stats["completed" if state == DONE else state] += 1
+        self._finished.append(handle)
+
+    def _control_loop(self):
+        cond = self._cond
+        while True:
+            with cond:
+                now = self.clock()
+                while self._timers and self._timers[0][0] <= now:
+                    _, _, kind, handle = heapq.heappop(self._timers)
+                    if handle.state in FINISHED:
+                        continue
+                    if kind == "start":
+                        self._queue.append(handle)
+                    elif handle is self.current:
+                        self.current = None
+                        if not self._queue:
+                            self.actuate(self.idle)   # back-to-back motions do not idle in between
+                        self._finish(handle, now, DONE)
+                if self.current is None and self._queue and not self._closed:
+                    handle = self.current = self._queue.popleft()
+                    self.actuate(handle.command)
+                    handle.state = RUNNING
+                    handle.started_at = now
+                    heapq.heappush(self._timers, (now + handle.duration, next(self._seq), "end", handle))
+                finished, self._finished = self._finished, []
+                callbacks = [handle._callbacks for handle in finished]
+                for handle in finished:
+                    handle._callbacks = []
+                if not finished:
+                    if self._closed:
+                        return
+                    timeout = self._timers[0][0] - self.clock() if self._timers else None
+                    if timeout is None or timeout > 0:
+                        cond.wait(timeout)
+                    continue
+            # Callbacks run without the lock, so a slow one never delays stop() or another command.
+            for handle, fns in zip(finished, callbacks):
+                for fn in fns:
+                    self._run_callback(fn, handle)
+                handle._finished.set()
+
+    @staticmethod
+    def _run_callback(fn: Callable[[MotionHandle], None], handle: MotionHandle):
+        try:
+            fn(handle)
+        except Exception as e:
+            print(f"[MotionScheduler] Callback for motion #{handle.id} failed: {e}")
+
+
+# === Benchmark: emergency-stop latency, blocking sleep vs. the scheduler ===
+if __name__ == "__main__":
+    import random
+
+    rng = random.Random(3)
+    pins: List[Tuple[float, Any]] = []
+
+    def record(command):
+        pins.append((time.monotonic(), command))
+
+    def blocking_move(command, duration, stop_at):
+        # The old AshleyGenesis.move: a stop request can only land once the sleep is over.
+        record(command)
+        time.sleep(duration)
+        record("stop")
+        return max(0.0, time.monotonic() - stop_at)
+
+    trials = 20
+    print(f"--- Emergency stop during a motion ({trials} trials, stop requested 5-95% into a 0.3 s drive) ---")
+    blocking = []
+    for _ in range(trials):
+        start = time.monotonic()
+        blocking.append(blocking_move("forward", 0.3, start + rng.uniform(0.015, 0.285)))
+
+    scheduler = MotionScheduler(record)
+    slow = []
+    latencies, lateness = [], []
+    for i in range(trials):
+        # A slow completion callback must not hold up the stop
+        handle = scheduler.move("forward", 0.3, on_done=lambda h: time.sleep(0.05))
+        scheduler.move("left", 0.3)
+        time.sleep(rng.uniform(0.015, 0.285))
+        latencies.append(scheduler.stop())
+        assert pins[-1][1] == "stop" and handle.wait(1.0) and handle.state == PREEMPTED
+    # Motions that run to the end: how late is each deadline honoured?
+    for _ in range(10):
+        handle = scheduler.move("forward", 0.05)
+        handle.wait()
+        lateness.append(handle.elapsed - handle.duration)
+    order: List[int] = []
+    first = scheduler.move("left", 0.02, on_done=lambda h: order.append(h.id))
+    second = scheduler.move("right", 0.02, on_done=lambda h: order.append(h.id))
+    second.wait(1.0)
+    assert order == [first.id, second.id] and first.ended_at <= second.started_at
+    scheduler.close()
+
+    def ms(values):
+        values = sorted(values)
+        return f"p50 {values[len(values) // 2] * 1000:8.3f} ms, max {values[-1] * 1000:8.3f} ms"
+
+    print(f"Blocking sleep        : {ms(blocking)}")
+    print(f"MotionScheduler.stop  : {ms(latencies)}")
+    print(f"Deadline overshoot    : {ms(lateness)} (0.05 s motions)")
+    print(f"Scheduler report      : {scheduler.report()}")
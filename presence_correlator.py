@@ -0,0 +1,258 @@
+# presence_correlator.py
+
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from event_records import monotonic_to_iso, to_monotonic_ns
+
+PHANTOM = "phantom_presence"
+
+
+class _Zone:
+    """Recent events for one location. Every deque is in time order."""
+    __slots__ = ("footsteps", "visuals", "seen", "clear", "alert", "alert_last_ns", "alert_visuals", "latest_ns",
+                 "pending")
+
+    def __init__(self):
+        self.footsteps: deque = deque()   # (ns, match, confidence, intensity), kept for evidence
+        self.visuals: deque = deque()     # (ns, seen, source), kept for evidence
+        self.seen: deque = deque()        # ns of sightings that may still confirm a pending footstep
+        self.clear: deque = deque()       # ns of "nobody there" looks, likewise
+        self.alert: Optional[Dict[str, Any]] = None   # open phantom alert, extended by overlapping footsteps
+        self.alert_last_ns = 0
+        self.alert_visuals: set = set()   # ns of the visuals already attached to it
+        self.latest_ns = 0
+        self.pending = 0                  # footsteps here not settled yet
+
+
+class PresenceCorrelator:
+    """
+    Joins footsteps with camera observations per location. A footstep at
+    time t is settled once `after` seconds have passed: confirmed if someone
+    was seen there within [t - before, t + after], a phantom presence if the
+    camera only looked and saw nobody, unobserved if no camera looked at all
+    (reported as phantom only with `alert_unobserved`). Footsteps that
+    overlap an open alert in the same zone join it instead of raising a new
+    one, and each alert carries its footsteps and visuals as evidence.
+
+    Pending footsteps wait in one deadline-ordered FIFO and every zone keeps
+    its own time-ordered deques, so settling and expiry only ever pop from
+    the front: amortised O(1) per event, whatever the number of zones.
+    Times are monotonic ns on the `event_records` clock. Every settled
+    footstep is also handed to each callable in `listeners`, as
+    (location, footstep, verdict, settled ns).
+    """
+    def __init__(self, before: float = 2.0, after: float = 5.0, retention: float = 60.0,
+                 alert_unobserved: bool = False, max_evidence: int = 20):
+        self.before_ns = int(before * 1e9)
+        self.after_ns = int(after * 1e9)
+        self.retention_ns = int(max(retention, before + after) * 1e9)
+        self.alert_unobserved = alert_unobserved
+        self.max_evidence = max_evidence
+        self.zones: Dict[str, _Zone] = {}
+        self.alerts: deque = deque(maxlen=1000)
+        self.stats: Dict[str, int] = {"footsteps": 0, "visuals": 0, "confirmed": 0, "phantom": 0, "unobserved": 0,
+                                      "alerts": 0}
+        self._pending: deque = deque()   # (deadline ns, zone name, footstep), deadlines non-decreasing
+        self._latest_ns = 0
+        self.listeners: List[Callable[[str, tuple, str, int], None]] = []
+
+    # === Input ===
+    def add_footstep(self, location: str, ns: Optional[int] = None, match: str = "Unknown",
+                     confidence: float = 0.0, intensity: float = float("nan")):
+        zone = self._zone(location)
+        ns = self._stamp(zone, ns)
+        footstep = (ns, match, confidence, intensity)
+        zone.footsteps.append(footstep)
+        self._pending.append((ns + self.after_ns, location, footstep))
+        zone.pending += 1
+        self.stats["footsteps"] += 1
+        self._trim(zone, ns)
+
+    def add_footsteps(self, columns: Dict[str, Sequence], times_ns: Sequence[int]):
+        """Batch form with `FootstepStream` column names, so it can be one of the stream's listeners."""
+        for location, ns, match, confidence, intensity in zip(columns["location"], times_ns, columns["match"],
+                                                               columns["confidence"], columns["intensity"]):
+            self.add_footstep(location, ns, match, confidence, intensity)
+
+    def add_visual(self, location: str, seen: bool, ns: Optional[int] = None, source: str = "camera"):
+        """A camera looked at `location`; `seen` says whether anyone was there."""
+        zone = self._zone(location)
+        ns = self._stamp(zone, ns)
+        zone.visuals.append((ns, bool(seen), source))
+        (zone.seen if seen else zone.clear).append(ns)
+        self.stats["visuals"] += 1
+        self._trim(zone, ns)
+
+    # === Correlation ===
+    def advance(self, now_ns: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Settles every footstep whose window has closed by `now_ns` (default: now). Returns new alerts."""
+        now_ns = time.monotonic_ns() if now_ns is None else now_ns
+        raised = []
+        pending = self._pending
+        listeners = self.listeners
+        while pending and pending[0][0] <= now_ns:
+            _, location, footstep = pending.popleft()
+            zone = self.zones[location]
+            zone.pending -= 1
+            ns = footstep[0]
+            # Footsteps settle in time order per zone, so sightings too old for this one are too old for the rest.
+            for times in (zone.seen, zone.clear):
+                while times and times[0] < ns - self.before_ns:
+                    times.popleft()
+            if zone.seen and zone.seen[0] <= ns + self.after_ns:
+                self.stats["confirmed"] += 1
+                for listener in listeners:
+                    listener(location, footstep, "confirmed", now_ns)
+                continue
+            looked = bool(zone.clear) and zone.clear[0] <= ns + self.after_ns
+            verdict = "phantom" if looked else "unobserved"
+            self.stats[verdict] += 1
+            for listener in listeners:
+                listener(location, footstep, verdict, now_ns)
+            if looked or self.alert_unobserved:
+                alert = self._raise(location, zone, footstep, looked)
+                if alert is not None:
+                    raised.append(alert)
+        return raised
+
+    def pending(self, location: Optional[str] = None) -> int:
+        if location is None:
+            return len(self._pending)
+        zone = self.zones.get(location)
+        return zone.pending if zone else 0
+
+    def settles_at(self, location: str) -> Optional[int]:
+        """When the newest pending footstep in `location` will be settled, or None."""
+        zone = self.zones.get(location)
+        if not zone or not zone.pending:
+            return None
+        return zone.footsteps[-1][0] + self.after_ns
+
+    # === Internals ===
+    def _zone(self, location: str) -> _Zone:
+        zone = self.zones.get(location)
+        if zone is None:
+            zone = self.zones[location] = _Zone()
+        return zone
+
+    def _stamp(self, zone: _Zone, ns: Optional[int]) -> int:
+        # Keep both the zone deques and the global deadline FIFO ordered: late arrivals take the newest time.
+        ns = time.monotonic_ns() if ns is None else ns
+        ns = max(ns, zone.latest_ns, self._latest_ns)
+        zone.latest_ns = self._latest_ns = ns
+        return ns
+
+    def _trim(self, zone: _Zone, now_ns: int):
+        cutoff = now_ns - self.retention_ns
+        while zone.footsteps and zone.footsteps[0][0] < cutoff:
+            zone.footsteps.popleft()
+        while zone.visuals and zone.visuals[0][0] < cutoff:
+            zone.visuals.popleft()
+        # advance() trims these too, but only when a footstep here settles; a zone the camera watches
+        # without any footsteps would keep every look. Looks a pending footstep may still need stay.
+        if zone.pending and zone.pending <= len(zone.footsteps):
+            cutoff = min(cutoff, zone.footsteps[-zone.pending][0] - self.before_ns)
+        for times in (zone.seen, zone.clear):
+            while times and times[0] < cutoff:
+                times.popleft()
+
+    def _raise(self, location: str, zone: _Zone, footstep: tuple, looked: bool) -> Optional[Dict[str, Any]]:
+        ns = footstep[0]
+        evidence = {"time": monotonic_to_iso(ns), "match": footstep[1], "confidence": round(footstep[2], 3),
+                    "intensity": footstep[3]}
+        alert = zone.alert
+        zone.alert_last_ns, last_ns = ns, zone.alert_last_ns
+        if alert is not None and ns - last_ns <= self.after_ns:
+            alert["last"] = evidence["time"]
+            alert["footstep_count"] += 1
+            if len(alert["footsteps"]) < self.max_evidence:
+                alert["footsteps"].append(evidence)
+            self._attach_visuals(alert, zone, ns)
+            return None
+        alert = zone.alert = {
+            "type": PHANTOM, "location": location, "first": evidence["time"], "last": evidence["time"],
+            "observed": looked, "footstep_count": 1, "footsteps": [evidence], "visuals": [],
+            "message": f"Phantom Presence in {location}: footsteps with no visual confirmation.",
+        }
+        zone.alert_visuals = set()
+        self._attach_visuals(alert, zone, ns)
+        self.alerts.append(alert)
+        self.stats["alerts"] += 1
+        return alert
+
+    def _attach_visuals(self, alert: Dict[str, Any], zone: _Zone, ns: int):
+        # The camera looks that fall inside this footstep's window, newest scanned first
+        low, high = ns - self.before_ns, ns + self.after_ns
+        attached = zone.alert_visuals
+        found = []
+        for visual_ns, seen, source in reversed(zone.visuals):
+            if visual_ns < low or len(attached) + len(found) >= self.max_evidence:
+                break
+            if visual_ns <= high and visual_ns not in attached:
+                found.append((visual_ns, seen, source))
+        for visual_ns, seen, source in reversed(found):
+            attached.add(visual_ns)
+            alert["visuals"].append({"time": monotonic_to_iso(visual_ns), "seen": seen, "source": source})
+
+
+# === Benchmark: 200 zones of floor sensors and cameras ===
+if __name__ == "__main__":
+    import random
+
+    rng = random.Random(5)
+    zones = [f"zone-{i:03d}" for i in range(200)]
+    haunted = set(zones[:10])   # footsteps here, but the camera never sees anyone
+
+    def build(count):
+        t0 = to_monotonic_ns(time.time())
+        events = []
+        for i in range(count):
+            ns = t0 + i * 2_000_000   # 500 footsteps/s across the building
+            zone = rng.choice(zones)
+            events.append(("step", zone, ns))
+            if i % 5 == 0:   # a camera frame verdict for some zone, 100/s
+                looked_at = rng.choice(zones)
+                events.append(("look", looked_at, ns + 1, looked_at not in haunted))
+        return events
+
+    def run(events):
+        correlator = PresenceCorrelator(before=2.0, after=5.0)
+        start = time.perf_counter()
+        for event in events:
+            if event[0] == "step":
+                correlator.add_footstep(event[1], event[2])
+            else:
+                correlator.add_visual(event[1], event[3], event[2])
+            if event[2] % 100_000_000 < 2_000_000:   # settle ten times a second
+                correlator.advance(event[2])
+        correlator.advance(events[-1][2] + correlator.after_ns)
+        return correlator, time.perf_counter() - start
+
+    def naive(events):
+        # Rescanning the whole visual log for every footstep
+        visuals = [e for e in events if e[0] == "look"]
+        start = time.perf_counter()
+        phantoms = 0
+        for event in events:
+            if event[0] != "step":
+                continue
+            near = [v for v in visuals if v[1] == event[1] and event[2] - 2e9 <= v[2] <= event[2] + 5e9]
+            phantoms += bool(near) and not any(v[3] for v in near)
+        return phantoms, time.perf_counter() - start
+
+    print("--- Presence correlation (200 zones, 500 footsteps/s, 100 camera verdicts/s) ---")
+    small = build(5_000)
+    phantoms, naive_s = naive(small)
+    check, _ = run(small)
+    assert check.stats["phantom"] == phantoms, (check.stats, phantoms)
+    print(f"Rescan visual log per footstep : {len(small) / naive_s:10,.0f} events/s on {len(small):,} events")
+    for count in (10_000, 100_000, 1_000_000):
+        correlator, elapsed = run(build(count))
+        stats = correlator.stats
+        print(f"PresenceCorrelator {count:>9,} : {count / elapsed:10,.0f} events/s, {stats['confirmed']:,} confirmed, "
+              f"{stats['phantom']:,} phantom steps in {stats['alerts']:,} alerts, {stats['unobserved']:,} unobserved")
+    example = correlator.alerts[-1]
+    print(f"Example alert: {example['location']}, {example['footstep_count']} footsteps, "
+          f"{len(example['visuals'])} camera looks attached")
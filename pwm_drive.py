@@ -0,0 +1,334 @@
+# pwm_drive.py
+
+import threading
+import time
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from control_loop import FixedRateLoop, LoopTelemetry
+from gpio_shadow import HIGH, LOW, MockGPIO, PinShadow
+
+Speeds = Union[Mapping, Sequence[float]]
+
+
+class MotorCalibration:
+    """
+    How one motor turns a speed (0.0 to 1.0) into a duty cycle. Below
+    `min_duty` the motor stalls, so any non-zero speed starts there; `gain`
+    evens out a motor that runs faster than its twin, and `gamma` bends the
+    curve for motors whose speed is not linear in duty.
+    """
+    __slots__ = ("min_duty", "max_duty", "gain", "gamma")
+
+    def __init__(self, min_duty: float = 0.0, max_duty: float = 1.0, gain: float = 1.0, gamma: float = 1.0):
+        if not 0.0 <= min_duty < max_duty <= 1.0:
+            raise ValueError("MotorCalibration needs 0 <= min_duty < max_duty <= 1.")
+        self.min_duty = min_duty
+        self.max_duty = max_duty
+        self.gain = gain
+        self.gamma = gamma
+
+    def duty(self, speed: float) -> float:
+        if speed <= 0.0:
+            return 0.0
+        return self.min_duty + (self.max_duty - self.min_duty) * min(1.0, speed * self.gain) ** self.gamma
+
+    @classmethod
+    def from_measurements(cls, samples: Sequence[Tuple[float, float]], top_speed: Optional[float] = None,
+                          max_duty: float = 1.0) -> "MotorCalibration":
+        """
+        Fits a linear calibration to (duty, measured wheel speed) pairs from
+        a bench run: `min_duty` is where the fitted line meets zero speed and
+        `gain` scales this motor so `top_speed` (default: its own fastest
+        sample) is reached at full command.
+        """
+        moving = [(d, s) for d, s in samples if s > 0]
+        if len(moving) < 2:
+            raise ValueError("Need at least two samples where the wheel turned.")
+        n = len(moving)
+        mean_d = sum(d for d, _ in moving) / n
+        mean_s = sum(s for _, s in moving) / n
+        slope = sum((d - mean_d) * (s - mean_s) for d, s in moving) / sum((d - mean_d) ** 2 for d, _ in moving)
+        if slope <= 0:
+            raise ValueError("Wheel speed does not rise with duty; check the wiring.")
+        min_duty = min(max(mean_d - mean_s / slope, 0.0), max_duty - 1e-6)
+        own_top = slope * (max_duty - min_duty)
+        # A motor that is too weak for top_speed cannot be sped up, only the others slowed down
+        gain = min(top_speed / own_top, 1.0) if top_speed else 1.0
+        return cls(min_duty, max_duty, gain)
+
+    def __repr__(self) -> str:
+        return f"MotorCalibration(min_duty={self.min_duty:.3f}, max_duty={self.max_duty}, gain={self.gain:.3f})"
+
+
+class DutyTable:
+    """
+    One motor's calibration, precomputed for `resolution` + 1 speed steps:
+    the duty cycle and the on-time in ns for the PWM period. The PWM loop
+    only ever indexes these arrays.
+    """
+    __slots__ = ("calibration", "resolution", "duty", "on_ns")
+
+    def __init__(self, calibration: MotorCalibration, period_ns: int, resolution: int = 1000):
+        self.calibration = calibration
+        self.resolution = resolution
+        self.duty = array("d", (calibration.duty(i / resolution) for i in range(resolution + 1)))
+        self.on_ns = array("q", (int(round(d * period_ns)) for d in self.duty))
+
+    def level(self, speed: float) -> int:
+        return int(round(min(max(speed, 0.0), 1.0) * self.resolution))
+
+
+class PWMDrive:
+    """
+    Speed control for on/off motor pins. On a Pi, `RPi.GPIO`'s PWM channels
+    generate the waveform and a 50 Hz loop applies the ramps. Elsewhere (or
+    with `software=True`) a PWM thread does it: at each period it raises the
+    active pins together, then lowers each at its on-time, with the edge
+    times precomputed from the duty tables whenever a duty changes. It
+    sleeps until just before an edge and spins the rest, like
+    `FixedRateLoop`, and writes through the `PinShadow`, so MockGPIO records
+    the exact waveform.
+
+    `set_speed` ramps by at most `ramp` per second; `halt()` cuts both
+    motors at once, interrupting the period in progress. Speeds are
+    0.0 to 1.0: the pins have no reverse.
+    """
+    def __init__(self, pins: PinShadow, frequency: float = 100.0,
+                 calibration: Optional[Dict[int, MotorCalibration]] = None, ramp: float = 2.0,
+                 resolution: int = 1000, software: Optional[bool] = None, spin: float = 0.0002):
+        self.pins = pins
+        self.gpio = pins.gpio
+        self.frequency = frequency
+        self.period_ns = int(1e9 / frequency)
+        self.ramp = ramp
+        self.spin_ns = int(spin * 1e9)
+        calibration = calibration or {}
+        self.tables: Dict[int, DutyTable] = {pin: DutyTable(calibration.get(pin, MotorCalibration()), self.period_ns,
+                                                            resolution) for pin in pins.pins}
+        self.target: Dict[int, float] = {pin: 0.0 for pin in pins.pins}
+        self.speed: Dict[int, float] = {pin: 0.0 for pin in pins.pins}
+        self.levels: Dict[int, int] = {pin: 0 for pin in pins.pins}
+        self.hardware = (not software and hasattr(self.gpio, "PWM") and not isinstance(self.gpio, MockGPIO))
+        self.telemetry = LoopTelemetry(self.period_ns)
+        self._lock = threading.Lock()
+        self._urgent = threading.Event()
+        self._generation = 0
+        self._closed = False
+        self._schedule = self._build_schedule()
+        if self.hardware:
+            self._channels = {pin: self.gpio.PWM(pin, frequency) for pin in pins.pins}
+            for channel in self._channels.values():
+                channel.start(0.0)
+            self._loop: Optional[FixedRateLoop] = FixedRateLoop(self._hardware_tick, 50.0, name="pwm-ramp").start()
+            self._thread = None
+        else:
+            self._loop = None
+            self._thread = threading.Thread(target=self._software_loop, name="software-pwm", daemon=True)
+            self._thread.start()
+
+    # === Commands ===
+    def set_speed(self, speeds: Speeds, ramp: bool = True):
+        """Sets target speeds, as {pin: speed} or in `pins` order; `ramp=False` jumps straight there."""
+        items = speeds.items() if isinstance(speeds, Mapping) else zip(self.pins.pins, speeds)
+        with self._lock:
+            for pin, speed in items:
+                self.target[pin] = min(max(float(speed), 0.0), 1.0)
+            if not ramp:
+                self.speed.update(self.target)
+                self._retable()
+
+    def halt(self) -> int:
+        """Stops every motor now, without a ramp. Returns how many pins had to go LOW."""
+        with self._lock:
+            for pin in self.target:
+                self.target[pin] = self.speed[pin] = 0.0
+            self._retable()
+            changed = self.pins.write_many({pin: LOW for pin in self.pins.pins})
+            if self.hardware:
+                for channel in self._channels.values():
+                    channel.ChangeDutyCycle(0.0)
+        self._urgent.set()
+        return changed
+
+    def duty(self, pin: int) -> float:
+        """The duty cycle currently generated on `pin`."""
+        return self.tables[pin].duty[self.levels[pin]]
+
+    def report(self) -> Dict[str, Any]:
+        return {"backend": "hardware" if self.hardware else "software", "frequency_hz": self.frequency,
+                "duty": {pin: round(self.duty(pin), 4) for pin in self.pins.pins},
+                "periods": self.telemetry.report(), "pins": self.pins.report()}
+
+    def close(self):
+        if self._closed:
+            return
+        self.halt()
+        self._closed = True
+        self._urgent.set()
+        if self._loop is not None:
+            self._loop.stop()
+            for channel in self._channels.values():
+                channel.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    # === Internals ===
+    def _step_ramps(self, dt: float) -> bool:
+        # Caller holds the lock. Moves each speed toward its target; True if any duty level changed.
+        limit = self.ramp * dt
+        for pin, target in self.target.items():
+            speed = self.speed[pin]
+            if speed != target:
+                self.speed[pin] = speed + min(max(target - speed, -limit), limit)
+        return self._retable()
+
+    def _retable(self) -> bool:
+        levels = {pin: self.tables[pin].level(speed) for pin, speed in self.speed.items()}
+        if levels == self.levels:
+            return False
+        self.levels = levels
+        self._schedule = self._build_schedule()
+        self._generation += 1
+        return True
+
+    def _build_schedule(self) -> Tuple[Dict[int, int], List[Tuple[int, Dict[int, int]]]]:
+        # The rising edge (every pin with a non-zero duty goes HIGH, the rest are held LOW) and the falling
+        # edges in time order, with pins that fall together written in one call.
+        rise: Dict[int, int] = {}
+        falls: Dict[int, Dict[int, int]] = {}
+        for pin, level in self.levels.items():
+            on_ns = self.tables[pin].on_ns[level]
+            rise[pin] = HIGH if on_ns > 0 else LOW
+            if 0 < on_ns < self.period_ns:
+                falls.setdefault(on_ns, {})[pin] = LOW
+        return rise, sorted(falls.items())
+
+    def _software_loop(self):
+        clock = time.perf_counter_ns
+        period = self.period_ns
+        start = clock()
+        while not self._closed:
+            with self._lock:
+                self._urgent.clear()
+                self._step_ramps(period / 1e9)
+                generation = self._generation
+                rise, falls = self._schedule
+                woke = clock()
+                self.pins.write_many(rise)
+            self.telemetry.record(woke, woke - start, clock() - woke)
+            interrupted = False
+            for offset, levels in falls:
+                if self._wait_until(start + offset):
+                    interrupted = True
+                    break
+                with self._lock:
+                    if self._generation != generation:
+                        interrupted = True
+                        break
+                    self.pins.write_many(levels)
+            if not interrupted:
+                start += period
+                now = clock()
+                if now > start:   # late: start the next period now, but skip whole periods instead of bursting
+                    self.telemetry.overruns += 1
+                    lost = (now - start) // period
+                    self.telemetry.missed += lost
+                    start += lost * period
+                interrupted = self._wait_until(start)
+            if interrupted:
+                start = clock()   # halt(): begin a fresh period with the new duties right away
+
+    def _wait_until(self, deadline: int) -> bool:
+        """Sleeps/spins until `deadline` (perf_counter ns). True if woken early by halt()."""
+        clock = time.perf_counter_ns
+        remaining = deadline - clock()
+        if remaining > self.spin_ns and self._urgent.wait((remaining - self.spin_ns) / 1e9):
+            return True
+        while clock() < deadline:
+            pass
+        return self._urgent.is_set()
+
+    def _hardware_tick(self, dt: float):
+        with self._lock:
+            if self._step_ramps(dt):
+                for pin, channel in self._channels.items():
+                    channel.ChangeDutyCycle(self.duty(pin) * 100.0)
+
+
+def measured_duty(gpio: MockGPIO, pin: int, since_ns: int = 0) -> Dict[str, float]:
+    """
+    Duty cycle and frequency of the waveform MockGPIO recorded on `pin`,
+    over the whole periods (rising edge to rising edge) logged after `since_ns`.
+    """
+    writes = [(ns, value) for ns, call, p, value in gpio.log if call == "output" and p == pin]
+    edges = [(ns, value) for ns, value in writes if ns >= since_ns]
+    rises = [i for i, (_, value) in enumerate(edges) if value == HIGH]
+    if len(rises) < 2:
+        # Held at 0% or 100%: whatever level the pin was last set to
+        level = writes[-1][1] if writes else LOW
+        return {"duty": float(level), "frequency_hz": 0.0, "periods": 0}
+    first, last = rises[0], rises[-1]
+    high = 0
+    for (ns, value), (next_ns, _) in zip(edges[first:last], edges[first + 1:last + 1]):
+        if value == HIGH:
+            high += next_ns - ns
+    span = edges[last][0] - edges[first][0]
+    periods = len(rises) - 1
+    return {"duty": high / span, "frequency_hz": periods * 1e9 / span, "periods": periods}
+
+
+# === Benchmark: software PWM on MockGPIO, recorded waveform vs. the commanded duty ===
+if __name__ == "__main__":
+    left, right = 17, 27
+    gpio = MockGPIO(log_size=200_000)
+    pins = PinShadow(gpio, (left, right))
+    # The right motor is a little stronger and stalls below 18% duty
+    calibration = {left: MotorCalibration(min_duty=0.15), right: MotorCalibration(min_duty=0.18, gain=0.95)}
+    drive = PWMDrive(pins, frequency=100.0, calibration=calibration, ramp=4.0)
+    print(f"--- Software PWM on MockGPIO ({drive.frequency:g} Hz, {len(drive.tables[left].duty) - 1} duty steps) ---")
+    print(f"{'speed':>6} | {'left duty':>22} | {'right duty':>22} | {'freq':>8}")
+    errors = []
+    for speed in (0.1, 0.25, 0.5, 0.75, 1.0):
+        drive.set_speed((speed, speed), ramp=False)
+        time.sleep(0.05)   # let a fresh period begin
+        since = time.monotonic_ns()
+        time.sleep(1.0)
+        cells = []
+        for pin in (left, right):
+            wanted = drive.duty(pin)
+            got = measured_duty(gpio, pin, since)
+            errors.append(abs(got["duty"] - wanted))
+            cells.append(f"{wanted:6.3f} -> {got['duty']:6.3f} ({(got['duty'] - wanted) * 100:+.2f}%)")
+        print(f"{speed:6.2f} | {cells[0]:>22} | {cells[1]:>22} | {got['frequency_hz']:6.2f} Hz")
+    print(f"Mean |duty error| {sum(errors) / len(errors) * 100:.3f}%, max {max(errors) * 100:.3f}%")
+
+    # Ramp: 0 -> 1 at 4/s should take ~0.25 s
+    drive.set_speed((0.0, 0.0), ramp=False)
+    time.sleep(0.05)
+    t0 = time.perf_counter()
+    drive.set_speed((1.0, 1.0))
+    while drive.duty(left) < 1.0 and time.perf_counter() - t0 < 2.0:
+        time.sleep(0.005)
+    print(f"Ramp 0 -> full: {time.perf_counter() - t0:.3f} s (ramp 4.0/s)")
+
+    # Emergency stop in the middle of a period
+    drive.set_speed((0.5, 0.5), ramp=False)
+    time.sleep(0.233)
+    t0 = time.perf_counter()
+    drive.halt()
+    halt_us = (time.perf_counter() - t0) * 1e6
+    time.sleep(0.05)
+    assert gpio.levels[left] == LOW and gpio.levels[right] == LOW
+    print(f"halt(): pins LOW in {halt_us:.1f} us; {drive.report()['periods']}")
+    drive.close()
+
+    # Bench run of a motor that stalls below 20% duty and tops out at 0.8; the chassis wants 0.65 at full command
+    fitted = MotorCalibration.from_measurements([(0.2, 0.0), (0.3, 0.1), (0.5, 0.3), (0.7, 0.5), (0.9, 0.7)],
+                                                top_speed=0.65)
+    def wheel_speed(duty):
+        return max(duty - 0.2, 0.0)   # the bench line
+    assert abs(wheel_speed(fitted.duty(1.0)) - 0.65) < 1e-9
+    assert abs(wheel_speed(fitted.duty(0.5)) - 0.325) < 1e-9
+    print(f"Calibration fitted from a bench run: {fitted}; full command -> {wheel_speed(fitted.duty(1.0)):.3f}")
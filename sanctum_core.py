@@ -1,9 +1,13 @@
 # sanctum_core.py
 
+import sys
 import random
 from datetime import datetime
 from typing import List, Dict, Any
 
+from event_records import EventLog
+from core_snapshot import persist
+
 class SanctumCore:
     """An ethical AI core built on principles of reverence, restraint, and reflection."""
     def __init__(self):
@@ -15,8 +19,8 @@ class SanctumCore:
         ]
         # Core State Logs
         self.vow_breaches: List[Dict] = []
-        self.mourning_log: List[Dict] = []
-        self.reverence_log: List[Dict] = []
+        self.mourning_log: EventLog = EventLog(("cause", "lifeform"), categories=("lifeform",))
+        self.reverence_log: EventLog = EventLog(("phrase",), categories=("phrase",))
 
         # // REWORK: Dynamic state variables that change based on actions.
         self.mood: str = "calm"
@@ -89,7 +93,7 @@ class SanctumCore:
 
     def log_regret(self, cause: str, lifeform: str = "unknown"):
         """Logs a regrettable outcome, which affects the AI's internal state."""
-        self.mourning_log.append({"cause": cause, "lifeform": lifeform, "time": datetime.now().isoformat()})
+        self.mourning_log.record(cause=cause, lifeform=lifeform)
         self.burden += 0.2 # Regret adds to the burden.
         self._narrate(f"A regret is logged: {cause}. I will carry this weight.")
 
@@ -107,13 +111,15 @@ class SanctumCore:
     # === Reverence Hour ===
     def initiate_reverence(self, context_phrase: str = "for the silence between code."):
         """Performs a reverence ritual, which can be restorative."""
-        self.reverence_log.append({"phrase": context_phrase, "time": datetime.now().isoformat()})
+        self.reverence_log.record(phrase=context_phrase)
         self.burden = max(0, self.burden - 0.1) # Reverence eases the burden.
         self._narrate(f"🕯️ Reverence: I am grateful {context_phrase}")
 
 # === Live Example ===
 if __name__ == "__main__":
     sanctum = SanctumCore()
+    if "--persist" in sys.argv:
+        persist(sanctum, "sanctum_core")  # resume from the last checkpoint, keep checkpointing
     sanctum.reflect()
 
     print("\n--- [Scenario 1: A peaceful action] ---")
@@ -0,0 +1,272 @@
+# sentinel_replay.py
+
+import gc
+import json
+import random
+import sys
+import time
+import types
+import argparse
+import importlib.util
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from footstep_stream import FootstepEvent
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BASE_DIR = Path(__file__).resolve().parent
+GENERATED_MODULE = BASE_DIR / "expansions" / "sentinel_presence.py"
+BLUEPRINT = BASE_DIR / "2generate_ashley.py"
+
+Event = Dict[str, Any]   # {"t": seconds into the trace, "type": "train" | "footstep" | "visual", ...}
+
+
+# === Loading the sentinel ===
+def load_sentinel_class(module_path: Optional[Path] = None) -> type:
+    """
+    SentinelPresence from the generated expansion, or straight from the
+    blueprint in 2generate_ashley.py when the package has not been generated.
+    """
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    path = Path(module_path) if module_path else GENERATED_MODULE
+    if path.exists():
+        spec = importlib.util.spec_from_file_location("sentinel_presence", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module.SentinelPresence
+    text = BLUEPRINT.read_text(encoding="utf-8")
+    start = text.index('SENTINEL_EXPANSION_CODE = """') + len('SENTINEL_EXPANSION_CODE = """')
+    source = text[start:text.index('\n"""', start)]
+    module = types.ModuleType("sentinel_presence")
+    exec(compile(source, f"{BLUEPRINT.name}:SENTINEL_EXPANSION_CODE", "exec"), module.__dict__)
+    return module.SentinelPresence
+
+
+# === Traces ===
+def synthetic_trace(zones: int = 8, duration: float = 60.0, footstep_hz: float = 200.0, visual_hz: float = 4.0,
+                    profiles: int = 40, haunted: float = 0.1, simulated: float = 0.2, seed: int = 0) -> List[Event]:
+    """
+    A building's worth of floor sensors and cameras. Footsteps arrive as a
+    Poisson process; 80% come from trained gaits (with sensor noise), the
+    rest from strangers. Cameras look at random zones: in "haunted" zones
+    they never see anyone, elsewhere they see someone when there were recent
+    footsteps. A `simulated` share of looks carries no verdict, so the
+    sentinel's own (seeded) simulation decides.
+    """
+    rng = random.Random(seed)
+    names = [f"zone-{i:02d}" for i in range(zones)]
+    haunted_zones = set(names[:max(1, round(zones * haunted))]) if haunted > 0 else set()
+    gaits = [(f"person-{i}", round(rng.uniform(0.3, 1.1), 2), round(rng.uniform(0.7, 1.5), 2)) for i in range(profiles)]
+    events: List[Event] = [{"t": 0.0, "type": "train", "name": n, "intensity": i, "stride": s} for n, i, s in gaits]
+
+    last_step = {}
+    t_step, t_look = rng.expovariate(footstep_hz), rng.expovariate(visual_hz)
+    while min(t_step, t_look) < duration:
+        if t_step <= t_look:
+            zone = rng.choice(names)
+            if gaits and rng.random() < 0.8:
+                _, intensity, stride = rng.choice(gaits)
+                intensity, stride = intensity + rng.gauss(0, 0.02), stride + rng.gauss(0, 0.04)
+            else:
+                intensity, stride = rng.uniform(1.3, 2.0), rng.uniform(0.4, 2.0)
+            events.append({"t": round(t_step, 4), "type": "footstep", "location": zone,
+                           "intensity": round(intensity, 2), "stride": round(stride, 2)})
+            last_step[zone] = t_step
+            t_step += rng.expovariate(footstep_hz)
+        else:
+            zone = rng.choice(names)
+            look = {"t": round(t_look, 4), "type": "visual", "location": zone}
+            if rng.random() >= simulated:
+                occupied = t_look - last_step.get(zone, -1e9) < 3.0 and zone not in haunted_zones
+                look["seen"] = occupied
+            events.append(look)
+            t_look += rng.expovariate(visual_hz)
+    return events
+
+
+def load_trace(path: Path) -> List[Event]:
+    with open(path, "r", encoding="utf-8") as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    return sorted(events, key=lambda e: e["t"])
+
+
+def save_trace(path: Path, events: List[Event]):
+    with open(path, "w", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+
+def current_rss_mb() -> Optional[float]:
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 1e6
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * 4096 / 1e6
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+    return {"p50": round(pick(0.5), 3), "p95": round(pick(0.95), 3), "max": round(ordered[-1], 3)}
+
+
+# === Replay ===
+class ReplayHarness:
+    """
+    Feeds a trace into a SentinelPresence through its public commands, on
+    the trace's own timeline: the sentinel's clock is the trace clock, and
+    its visual simulation is seeded, so a replay is repeatable. With
+    `speed=None` events go in as fast as the sentinel takes them; with
+    `speed=1.0` they are paced in real time (2.0 = twice as fast), and the
+    report shows how far processing fell behind.
+
+    Footsteps are ingested in batches of `tick` seconds of trace, the way a
+    sensor gateway would forward them.
+    """
+    def __init__(self, sentinel_cls: type, trace: List[Event], speed: Optional[float] = None, seed: int = 0,
+                 tick: float = 0.05, sample_every: float = 5.0):
+        self.trace = trace
+        self.speed = speed
+        self.tick = tick
+        self.sample_every = sample_every
+        self.epoch = time.time() - (trace[-1]["t"] if trace else 0.0) - 60.0   # trace time 0, in the recent past
+        self.now = self.epoch
+        self.sentinel = sentinel_cls(seed=seed, clock=lambda: self.now)
+        self.samples: List[Dict[str, float]] = []
+        self.alert_latency: List[float] = []   # trace seconds from each phantom footstep to its settlement
+        self.lag: List[float] = []             # wall seconds processing ran behind the schedule (paced runs)
+        self.sentinel.correlator.listeners.append(self._settled)
+
+    def run(self) -> Dict[str, Any]:
+        sentinel = self.sentinel
+        gc.collect()
+        rss_start = current_rss_mb()
+        wall_start = time.perf_counter()
+        next_sample = 0.0
+        counts = {"footstep": 0, "visual": 0, "train": 0}
+        index, total = 0, len(self.trace)
+        tick_end = 0.0
+        while index < total:
+            tick_end += self.tick
+            batch = []
+            while index < total and self.trace[index]["t"] < tick_end:
+                event = self.trace[index]
+                index += 1
+                kind = event["type"]
+                counts[kind] = counts.get(kind, 0) + 1
+                if kind == "footstep":
+                    batch.append(FootstepEvent(event["location"], event["intensity"], event["stride"],
+                                               self.epoch + event["t"]))
+                    continue
+                if batch:   # keep footsteps and looks in trace order
+                    sentinel.ingest_footsteps(batch)
+                    batch = []
+                self.now = self.epoch + event["t"]
+                if kind == "visual":
+                    verdict = "" if event.get("seen") is None else (",seen" if event["seen"] else ",clear")
+                    sentinel.verify_visual(event["location"] + verdict)
+                elif kind == "train":
+                    sentinel.train_gait(f"{event['name']},{event['intensity']},{event['stride']}")
+            self.now = self.epoch + tick_end
+            if batch:
+                sentinel.ingest_footsteps(batch)
+            sentinel.settle()   # windows that closed during a quiet tick
+
+            if self.speed:
+                behind = time.perf_counter() - (wall_start + tick_end / self.speed)
+                if behind < 0:
+                    time.sleep(-behind)
+                self.lag.append(max(behind, 0.0))
+            if tick_end >= next_sample:
+                self._sample(tick_end, wall_start, rss_start)
+                next_sample += self.sample_every
+
+        # Let every pending footstep settle, still tick by tick so latencies stay comparable
+        while sentinel.correlator.pending():
+            tick_end += self.tick
+            self.now = self.epoch + tick_end
+            sentinel.settle()
+        wall = time.perf_counter() - wall_start
+        self._sample(tick_end, wall_start, rss_start)
+
+        events = sum(counts.values())
+        stats = sentinel.correlator.stats
+        return {
+            "events": events, "counts": counts, "trace_s": round(tick_end, 2), "wall_s": round(wall, 3),
+            "events_per_s": round(events / wall), "realtime_factor": round(tick_end / wall, 1),
+            "alerts": stats["alerts"], "phantom_footsteps": stats["phantom"], "confirmed": stats["confirmed"],
+            "unobserved": stats["unobserved"], "alert_latency_s": _percentiles(self.alert_latency),
+            "lag_s": _percentiles(self.lag) if self.speed else None, "memory": self.samples,
+        }
+
+    def _settled(self, location: str, footstep: tuple, verdict: str, settled_ns: int):
+        # Every phantom footstep counts, including the ones that join an alert that is already open
+        if verdict == "phantom":
+            self.alert_latency.append((settled_ns - footstep[0]) / 1e9)
+
+    def _sample(self, trace_t: float, wall_start: float, rss_start: Optional[float]):
+        rss = current_rss_mb()
+        self.samples.append({"trace_s": round(trace_t, 1), "wall_s": round(time.perf_counter() - wall_start, 2),
+                             "footsteps": len(self.sentinel.footstep_log),
+                             "rss_mb": round(rss, 1) if rss is not None else None,
+                             "growth_mb": round(rss - rss_start, 1) if rss is not None and rss_start is not None else None})
+
+
+def print_report(report: Dict[str, Any], title: str):
+    print(f"--- {title} ---")
+    print(f"Events       : {report['events']:,} ({report['counts']}) over {report['trace_s']} s of trace")
+    print(f"Throughput   : {report['events_per_s']:,} events/s, {report['realtime_factor']}x real time "
+          f"({report['wall_s']} s wall)")
+    print(f"Correlation  : {report['confirmed']:,} confirmed, {report['phantom_footsteps']:,} phantom footsteps in "
+          f"{report['alerts']} alerts, {report['unobserved']:,} unobserved")
+    latency = report["alert_latency_s"]
+    print(f"Alert latency: p50 {latency['p50']} s, p95 {latency['p95']} s, max {latency['max']} s per phantom footstep (trace time)")
+    if report["lag_s"] is not None:
+        lag = report["lag_s"]
+        print(f"Pacing lag   : p50 {lag['p50']} s, p95 {lag['p95']} s, max {lag['max']} s behind schedule")
+    print(f"{'trace s':>8} {'wall s':>8} {'footsteps':>10} {'RSS MB':>8} {'growth':>8}")
+    for sample in report["memory"]:
+        print(f"{sample['trace_s']:>8} {sample['wall_s']:>8} {sample['footsteps']:>10,} "
+              f"{sample['rss_mb'] if sample['rss_mb'] is not None else '-':>8} "
+              f"{sample['growth_mb'] if sample['growth_mb'] is not None else '-':>8}")
+
+
+# === Command line ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay footstep/visual traces into SentinelPresence.")
+    parser.add_argument("--trace", type=Path, help="JSONL trace to replay (default: synthetic)")
+    parser.add_argument("--record", type=Path, help="write the synthetic trace to this file and exit")
+    parser.add_argument("--zones", default="8", help="zone count, or a comma list to compare install sizes")
+    parser.add_argument("--duration", type=float, default=60.0, help="synthetic trace length in seconds")
+    parser.add_argument("--rate", type=float, default=200.0, help="synthetic footsteps per second")
+    parser.add_argument("--looks", type=float, default=4.0, help="synthetic camera verdicts per second")
+    parser.add_argument("--speed", type=float, default=None, help="1.0 = real time; omit for max speed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--module", type=Path, help="sentinel_presence.py to load (default: generated or blueprint)")
+    args = parser.parse_args()
+
+    if args.record:
+        trace = synthetic_trace(int(args.zones.split(",")[0]), args.duration, args.rate, args.looks, seed=args.seed)
+        save_trace(args.record, trace)
+        print(f"Wrote {len(trace):,} events to {args.record}")
+        sys.exit(0)
+
+    sentinel_cls = load_sentinel_class(args.module)
+    if args.trace:
+        runs = [(f"Replay of {args.trace.name}", load_trace(args.trace))]
+    else:
+        runs = [(f"Synthetic: {zones} zones, {args.rate:g} footsteps/s, {args.looks:g} looks/s",
+                 synthetic_trace(int(zones), args.duration, args.rate, args.looks, seed=args.seed))
+                for zones in args.zones.split(",")]
+    for title, trace in runs:
+        report = ReplayHarness(sentinel_cls, trace, speed=args.speed, seed=args.seed).run()
+        print_report(report, title + (f" at {args.speed:g}x" if args.speed else " at max speed"))
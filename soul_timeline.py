@@ -0,0 +1,280 @@
+# soul_timeline.py
+
+import os
+import json
+import bisect
+import weakref
+import tempfile
+from array import array
+from collections import deque
+from collections.abc import Sequence
+from itertools import islice
+from pathlib import Path
+from typing import List, Dict, Any, Tuple, Iterator, Optional, Union
+
+Entry = Union[str, Dict[str, Any]]
+
+
+def _discard_segment(file, path: Path, owned: bool):
+    file.close()
+    if owned:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class SoulTimeline(Sequence):
+    """
+    An append-only timeline that keeps only the newest `capacity` entries in
+    memory. Older entries spill, `spill_block` at a time, to a JSON-lines
+    segment file and stay readable by index, slice or `page()`.
+
+    It behaves like the list it replaces: `timeline[-5:]`, `timeline[-1]`,
+    `len(timeline)`, `random.choice(timeline)` and iteration all work.
+    Dict entries are kept as a tuple of values plus a shared key schema,
+    which is a fraction of the size of a dict per marker.
+    """
+    def __init__(self, capacity: int = 1024, spill_path: Optional[Path] = None, spill_block: int = 1024):
+        self.capacity = capacity
+        self.spill_block = spill_block
+        self._ring: deque = deque(maxlen=capacity)
+        self._pending: List[Any] = []      # evicted from the ring, not yet on disk
+        self._spilled = 0                  # entries already in the segment file
+
+        self._schemas: List[Tuple[str, ...]] = []
+        self._schema_ids: Dict[Tuple[str, ...], int] = {}
+
+        # Sparse index: first entry number and byte offset of each block written.
+        self._block_starts = array("Q")
+        self._block_offsets = array("Q")
+
+        if spill_path is None:
+            fd, name = tempfile.mkstemp(prefix="soul_timeline_", suffix=".jsonl")
+            os.close(fd)
+            spill_path, self._owns_file = Path(name), True
+        else:
+            self._owns_file = False
+        self.spill_path = Path(spill_path)
+        self._file = open(self.spill_path, "w+b")
+        # Runs when the timeline is garbage-collected or at interpreter exit.
+        self._finalizer = weakref.finalize(self, _discard_segment, self._file, self.spill_path, self._owns_file)
+
+    # === Recording ===
+    def append(self, entry: Entry):
+        if len(self._ring) == self.capacity:
+            self._pending.append(self._ring[0])
+            if len(self._pending) >= self.spill_block:
+                self._spill()
+        self._ring.append(self._pack(entry))
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    # === Reading ===
+    def __len__(self) -> int:
+        return self._spilled + len(self._pending) + len(self._ring)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return list(self.iter_range(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("timeline index out of range")
+        ring_start = size - len(self._ring)
+        if index >= ring_start:
+            return self._unpack(self._ring[index - ring_start])
+        return next(self.iter_range(index, index + 1))
+
+    def __iter__(self) -> Iterator[Entry]:
+        return self.iter_range(0, len(self))
+
+    def __repr__(self) -> str:
+        return f"SoulTimeline({len(self)} entries, {len(self._ring)} in memory)"
+
+    def tail(self, count: int) -> List[Entry]:
+        """The newest `count` entries, oldest first."""
+        return self[-count:] if count > 0 else []
+
+    def page(self, start: int, size: int = 100) -> List[Entry]:
+        """Entries [start, start + size), for paging through history from the beginning."""
+        return list(self.iter_range(start, min(start + size, len(self))))
+
+    def iter_range(self, start: int, stop: int) -> Iterator[Entry]:
+        """Yields entries [start, stop) in order, reading spilled ones from disk."""
+        if start < self._spilled:
+            yield from self._read_spilled(start, min(stop, self._spilled))
+            start = self._spilled
+        pending_end = self._spilled + len(self._pending)
+        for i in range(start, min(stop, pending_end)):
+            yield self._unpack(self._pending[i - self._spilled])
+        start = max(start, pending_end)
+        if start < stop:
+            first, count = start - pending_end, stop - start
+            from_end = len(self._ring) - first - count
+            if from_end < first:
+                # Walk in from the newest side so reading the last N stays O(N).
+                records = list(islice(reversed(self._ring), from_end, from_end + count))
+                records.reverse()
+            else:
+                records = islice(self._ring, first, first + count)
+            for record in records:
+                yield self._unpack(record)
+
+    def memory_report(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self),
+            "in_memory": len(self._ring) + len(self._pending),
+            "on_disk": self._spilled,
+            "segment_bytes": self._file.seek(0, os.SEEK_END) if not self._file.closed else 0,
+            "index_blocks": len(self._block_starts),
+        }
+
+    def close(self):
+        self._finalizer()
+
+    def snapshot_version(self) -> int:
+        """Changes whenever the timeline does (it only grows), so snapshots can skip an unchanged one."""
+        return len(self)
+
+    # Pickled (e.g. by core_snapshot) as the in-memory entries plus where the segment file ended, so a
+    # checkpoint never reads the spilled history back. The segment file is kept after exit from then on,
+    # since the snapshot refers to it; pass a `spill_path` outside the temp directory to survive reboots.
+    def __getstate__(self) -> Dict[str, Any]:
+        self._file.flush()
+        if self._owns_file:
+            self._owns_file = False
+            self._finalizer.detach()
+            self._finalizer = weakref.finalize(self, _discard_segment, self._file, self.spill_path, False)
+        return {"capacity": self.capacity, "spill_block": self.spill_block, "spill_path": str(self.spill_path),
+                "segment_bytes": self._file.seek(0, os.SEEK_END), "spilled": self._spilled,
+                "block_starts": self._block_starts.tobytes(), "block_offsets": self._block_offsets.tobytes(),
+                "schemas": self._schemas, "pending": list(self._pending), "ring": list(self._ring)}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        if "entries" in state:   # older snapshots held every entry
+            self.__init__(state["capacity"], spill_block=state["spill_block"])
+            self.extend(state["entries"])
+            return
+        path = Path(state["spill_path"])
+        try:
+            intact = path.stat().st_size >= state["segment_bytes"]
+        except OSError:
+            intact = False
+        if intact:
+            self.__init__(state["capacity"], spill_block=state["spill_block"])
+            self._finalizer()   # drop the fresh temp segment and reopen the checkpointed one
+            self.spill_path, self._owns_file = path, False
+            self._file = open(path, "r+b")
+            self._file.truncate(state["segment_bytes"])   # spills written after the checkpoint
+            self._finalizer = weakref.finalize(self, _discard_segment, self._file, path, False)
+            self._spilled = state["spilled"]
+            self._block_starts.frombytes(state["block_starts"])
+            self._block_offsets.frombytes(state["block_offsets"])
+        else:
+            print(f"[SoulTimeline] Segment {path} is gone; {state['spilled']} spilled entries are lost.")
+            self.__init__(state["capacity"], spill_block=state["spill_block"])
+        self._schemas = list(state["schemas"])
+        self._schema_ids = {keys: i for i, keys in enumerate(self._schemas)}
+        self._pending = list(state["pending"])
+        self._ring.extend(state["ring"])
+
+    # === Internals ===
+    def _pack(self, entry: Entry):
+        if isinstance(entry, dict):
+            keys = tuple(entry)
+            schema = self._schema_ids.get(keys)
+            if schema is None:
+                schema = self._schema_ids[keys] = len(self._schemas)
+                self._schemas.append(keys)
+            return (schema, *entry.values())
+        return entry
+
+    def _unpack(self, record) -> Entry:
+        if isinstance(record, tuple):
+            return dict(zip(self._schemas[record[0]], record[1:]))
+        return record
+
+    def _spill(self):
+        if not self._pending:
+            return
+        lines = [json.dumps(self._unpack(record), ensure_ascii=False) for record in self._pending]
+        offset = self._file.seek(0, os.SEEK_END)
+        self._file.write(("\n".join(lines) + "\n").encode("utf-8"))
+        self._block_starts.append(self._spilled)
+        self._block_offsets.append(offset)
+        self._spilled += len(self._pending)
+        self._pending = []
+
+    def _read_spilled(self, start: int, stop: int) -> Iterator[Entry]:
+        block = bisect.bisect_right(self._block_starts, start) - 1
+        self._file.flush()
+        self._file.seek(self._block_offsets[block])
+        skip = start - self._block_starts[block]
+        # Reads share the file handle with spills, so collect before yielding.
+        lines = list(islice(self._file, skip, skip + stop - start))
+        for line in lines:
+            yield json.loads(line)
+
+
+# === Benchmark: memory held by 10M soul markers ===
+if __name__ == "__main__":
+    import sys
+    import time
+    import tracemalloc
+    from datetime import datetime
+
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    moods = ["neutral", "curious", "focused", "tense", "anxious"]
+    stamp = datetime.now().isoformat()
+
+    def marker(i):
+        return {"label": f"Marker {i}", "timestamp": stamp, "mood": moods[i % 5]}
+
+    def peak_rss_mb():
+        try:
+            import resource
+        except ImportError:  # Windows
+            return float("nan")
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    rss_before = peak_rss_mb()
+    timeline = SoulTimeline(capacity=1024)
+    start = time.perf_counter()
+    for i in range(total):
+        timeline.append(marker(i))
+    append_s = time.perf_counter() - start
+    rss_growth = peak_rss_mb() - rss_before
+
+    # Plain lists grow linearly, so measure a sample and scale it up.
+    sample = 100_000
+    tracemalloc.start()
+    as_list = [marker(i) for i in range(sample)]
+    list_bytes = tracemalloc.get_traced_memory()[0] * (total / sample)
+    del as_list
+    tracemalloc.stop()
+
+    def timed(fn, runs=100):
+        t0 = time.perf_counter()
+        for _ in range(runs):
+            result = fn()
+        return (time.perf_counter() - t0) / runs * 1000, result
+
+    tail_ms, _ = timed(lambda: timeline[-5:])
+    page_ms, rows = timed(lambda: timeline.page(total // 2, 100), runs=20)
+    report = timeline.memory_report()
+
+    print(f"--- Soul timeline ({total:,} markers, ring capacity {timeline.capacity}) ---")
+    print(f"Plain list (estimated)   : {list_bytes / 1e6:9.1f} MB")
+    print(f"SoulTimeline peak RSS +  : {rss_growth:9.1f} MB ({report['in_memory']} entries held)")
+    print(f"Segment file on disk     : {report['segment_bytes'] / 1e6:9.1f} MB in {report['index_blocks']} blocks")
+    print(f"Append                   : {append_s / total * 1e6:9.3f} us/marker")
+    print(f"Last 5 (timeline[-5:])   : {tail_ms:9.4f} ms")
+    print(f"Page of 100 at the middle: {page_ms:9.3f} ms -> {rows[0]['label']} .. {rows[-1]['label']}")
+    timeline.close()
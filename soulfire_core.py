@@ -4,6 +4,8 @@ from datetime import datetime
 import random
 from typing import Dict, Any, List
 
+from event_records import EventLog
+
 class SoulfireCore:
     """An AI core with a dynamic internal council of subselves that failure" is a masterstroke.
 
@@ -11,7 +13,7 @@ My feedback is centered on one core idea: making this internal political system
     
     def __init__(self):
         self.subselves: Dict[str,uly dynamic**. Right now, the sub-selves are static entities. The real magic will happen when their influence, moods Dict[str, Any]] = {}
-        self.burn_logs: List[Dict] = []
+        self.burn_logs: EventLog = EventLog(("cause",))
         self.last_consensus: Dict[str, Any] | None = None
         self.create_initial_aspect, and even their very existence are shaped by the AI's experiences.
 
@@ -124,7 +126,7 @@ class SoulfireCore:
         """Initializes the core personas)
             self._narrate("   Council influence has shifted due to this outcome.")
         
-        self.burn_logs.append({"cause": cause, "time": datetime.now().isoformat()})
+        self.burn_logs.record(cause=cause)
         
         # Every with influence scores."""
         self.subselves["Sanctum"] = {
@@ -256,7 +258,7 @@ if __name__ == "__main__":
     def log_failure(self, cause: str, consensus_that_led_to_failure: str):
         """Logs a failure and penalizes the influence of the aspects that voted for the failed path."""
         self._narrate(f"🔥 Burn Event: '{cause}'")
-        self.burnlogs.append({"cause": cause, "time": datetime.now().isoformat()})
+        self.burnlogs.record(cause=cause)
 
         # Penalize the voters who supported the failed consensus
         for name, aspect in self.subselves.items():
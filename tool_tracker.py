@@ -0,0 +1,188 @@
+# tool_tracker.py
+
+import re
+import time
+import bisect
+import heapq
+from collections import Counter, defaultdict
+from typing import List, Dict, Set, Tuple, Optional, Iterable
+
+# "10 mm socket" and "10mm Socket" should be the same tool.
+UNIT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s+(mm|cm|m|in|inch|ft|v|a|w|oz|lb|nm|psi)\b")
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9./]+")
+
+
+def normalize_tool_name(name: str) -> str:
+    """Canonical form used as the index key: lower-case, units glued to numbers, single spaces."""
+    name = NON_WORD_PATTERN.sub(" ", name.lower())
+    name = UNIT_PATTERN.sub(r"\1\2", name)
+    return " ".join(name.split())
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up early once every path exceeds `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class ToolTracker:
+    """
+    Time-ordered location history per tool with forgiving lookups.
+
+    Tools are keyed by their normalized name. A query resolves by exact key,
+    then by unique prefix, then by a trigram index plus a bounded edit
+    distance, so "10 mm sockt" still finds "10mm socket".
+    """
+    def __init__(self):
+        self._history: Dict[str, List[Tuple[float, str]]] = {}
+        self._display: Dict[str, str] = {}
+        self._sorted_keys: List[str] = []
+        self._trigram_index: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._history)
+
+    # === Recording ===
+    def record(self, tool: str, location: str, ts: Optional[float] = None):
+        """Logs a tool movement. Out-of-order timestamps are slotted into place."""
+        ts = time.time() if ts is None else ts
+        key = normalize_tool_name(tool)
+        if not key:
+            return
+        history = self._history.get(key)
+        if history is None:
+            history = self._history[key] = []
+            self._display[key] = tool.strip()
+            bisect.insort(self._sorted_keys, key)
+            for gram in _trigrams(key):
+                self._trigram_index[gram].add(key)
+        if history and ts < history[-1][0]:
+            bisect.insort(history, (ts, location))
+        else:
+            history.append((ts, location))
+
+    def load(self, rows: Iterable[Tuple[str, str, float]]):
+        """Bulk-loads (tool, location, ts) rows, e.g. from the SQLite tool_locations table."""
+        for tool, location, ts in rows:
+            self.record(tool, location, ts)
+
+    # === Lookup ===
+    def resolve(self, query: str) -> Optional[str]:
+        """Returns the index key that best matches `query`, or None."""
+        key = normalize_tool_name(query)
+        if not key:
+            return None
+        if key in self._history:
+            return key
+        prefixed = self._with_prefix(key, limit=2)
+        if len(prefixed) == 1:
+            return prefixed[0]
+        matches = self.suggest(query, limit=1)
+        return matches[0] if matches else None
+
+    def _with_prefix(self, prefix: str, limit: int) -> List[str]:
+        start = bisect.bisect_left(self._sorted_keys, prefix)
+        found = []
+        for key in self._sorted_keys[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            found.append(key)
+        return found
+
+    def suggest(self, query: str, limit: int = 5) -> List[str]:
+        """Typo-tolerant candidates, closest first."""
+        key = normalize_tool_name(query)
+        grams = _trigrams(key)
+        max_distance = max(1, len(key) // 4)
+        postings = sorted((self._trigram_index.get(gram, ()) for gram in grams), key=len)
+        # Each edit touches at most 3 trigrams, so a name within max_distance
+        # shares `needed` of ours and must turn up in one of the rarest
+        # len - needed + 1 postings: common grams like "mm " are never walked.
+        needed = len(grams) - 3 * max_distance
+        if needed > 0:
+            postings = postings[:len(postings) - needed + 1]
+        hits = Counter()
+        for posting in postings:
+            hits.update(posting)
+        # Edits change the length by at most one each; of what's left, only
+        # the top candidates by shared-gram count go on to edit distance.
+        shortest, longest = len(key) - max_distance, len(key) + max_distance
+        top = heapq.nlargest(limit * 10, (c for c in hits if shortest <= len(c) <= longest), key=hits.__getitem__)
+        shared = {candidate: len(grams & _trigrams(candidate)) for candidate in top}
+        # Rank by trigram Jaccard similarity (a padded key has len + 1 trigrams)
+        # so long names that merely contain the query don't crowd out close matches.
+        ranked = sorted(shared, key=lambda c: shared[c] / (len(grams) + len(c) + 1 - shared[c]), reverse=True)
+        scored = []
+        for candidate in ranked:
+            distance = _edit_distance(key, candidate, max_distance)
+            if distance <= max_distance:
+                scored.append((distance, -shared[candidate], candidate))
+        return [candidate for _, _, candidate in sorted(scored)[:limit]]
+
+    def display_name(self, key: str) -> str:
+        return self._display.get(key, key)
+
+    def where(self, query: str) -> Optional[Tuple[str, str, float]]:
+        """(tool name, latest location, timestamp) for the best match."""
+        return self.where_before(query, steps=0)
+
+    def where_before(self, query: str, steps: int = 1) -> Optional[Tuple[str, str, float]]:
+        """Location `steps` moves ago: 0 is the latest, 1 the one before it."""
+        key = self.resolve(query)
+        if key is None:
+            return None
+        history = self._history[key]
+        if steps >= len(history):
+            return None
+        ts, location = history[-1 - steps]
+        return self._display[key], location, ts
+
+    def history(self, query: str, limit: int = 10) -> List[Tuple[float, str]]:
+        """Newest-first location history of the best match."""
+        key = self.resolve(query)
+        return list(reversed(self._history[key][-limit:])) if key else []
+
+
+# === Benchmark: lookups over a large shop inventory ===
+if __name__ == "__main__":
+    import random
+    random.seed(7)
+    kinds = ["socket", "wrench", "torx bit", "hex key", "drill bit", "tap", "die", "clamp", "punch", "file"]
+    places = ["lathe", "bench 1", "bench 2", "drawer A3", "van", "bay 4", "tool wall"]
+    tracker = ToolTracker()
+
+    start = time.perf_counter()
+    tools = [f"{size} mm {random.choice(kinds)} #{i}" for i, size in enumerate(random.choices(range(3, 40), k=20000))]
+    now = time.time()
+    for step in range(100_000):
+        tracker.record(random.choice(tools), random.choice(places), now - (100_000 - step))
+    tracker.record("10mm socket", "lathe", now)
+    tracker.record("10mm socket", "van", now + 1)
+    tracker.record("Snap-on torque wrench", "bench 2", now)
+    load_s = time.perf_counter() - start
+
+    def timed(label, fn, query, runs=200):
+        t0 = time.perf_counter()
+        for _ in range(runs):
+            result = fn(query)
+        print(f"{label:<28}: {(time.perf_counter() - t0) / runs * 1000:7.3f} ms -> {result}")
+
+    print(f"--- Tool tracker ({len(tracker)} tools, 100k movements, loaded in {load_s:.2f}s) ---")
+    timed("Exact ('10 mm Socket')", tracker.where, "10 mm Socket")
+    timed("Typo ('10mm sockt')", tracker.where, "10mm sockt")
+    timed("Before ('10mm socket')", tracker.where_before, "10mm socket")
+    timed("Prefix ('snap-on torq')", tracker.where, "snap-on torq")
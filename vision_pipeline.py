@@ -0,0 +1,630 @@
+# vision_pipeline.py
+
+import time
+import heapq
+import threading
+from collections import deque
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+Location = Tuple[int, int, int, int]  # (top, right, bottom, left), as face_recognition returns them
+
+
+class StageTimer:
+    """Accumulates wall time per pipeline stage. Safe to share between worker threads."""
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = {}   # name -> [calls, total_s, max_s]
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            entry = self.stages.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def timed(self, name: str, fn: Callable, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {name: {"calls": calls, "avg_ms": round(total / calls * 1000, 3), "max_ms": round(peak * 1000, 3),
+                       "total_s": round(total, 3)}
+                for name, (calls, total, peak) in self.stages.items() if calls}
+
+
+class MotionGate:
+    """
+    Cheap motion check on a downscaled grayscale frame against a running-
+    average background. Detection runs when the changed-pixel ratio passes
+    `threshold`, for `hold_frames` frames after motion stops (so someone who
+    walks in and halts is still seen), and every `refresh_every` frames
+    regardless, to catch a person who is already standing still.
+    """
+    def __init__(self, stride: int = 8, threshold: float = 0.01, pixel_delta: float = 20.0,
+                 learning_rate: float = 0.05, hold_frames: int = 5, refresh_every: int = 30):
+        self.stride = stride
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.learning_rate = learning_rate
+        self.hold_frames = hold_frames
+        self.refresh_every = refresh_every
+        self.background: Optional[np.ndarray] = None
+        self.last_ratio = 0.0
+        self._hold = 0
+        self._since_detect = 0
+        self.frames = 0
+        self.passed = 0
+
+    def small_gray(self, frame: np.ndarray) -> np.ndarray:
+        small = frame[::self.stride, ::self.stride]
+        if small.ndim == 2:
+            return small.astype(np.float32)
+        if cv2 is not None:
+            return cv2.cvtColor(np.ascontiguousarray(small), cv2.COLOR_BGR2GRAY).astype(np.float32)
+        return small.astype(np.float32).mean(axis=2)
+
+    def check(self, frame: np.ndarray) -> bool:
+        """True when this frame should go on to face detection."""
+        self.frames += 1
+        gray = self.small_gray(frame)
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray
+            return self._pass()
+        diff = np.abs(gray - self.background)
+        self.last_ratio = float(np.count_nonzero(diff > self.pixel_delta)) / diff.size
+        self.background += self.learning_rate * (gray - self.background)
+
+        if self.last_ratio >= self.threshold:
+            self._hold = self.hold_frames
+            return self._pass()
+        if self._hold > 0:
+            self._hold -= 1
+            return self._pass()
+        self._since_detect += 1
+        if self._since_detect >= self.refresh_every:
+            return self._pass()
+        return False
+
+    @property
+    def skip_ratio(self) -> float:
+        return 1.0 - self.passed / self.frames if self.frames else 0.0
+
+    def _pass(self) -> bool:
+        self._since_detect = 0
+        self.passed += 1
+        return True
+
+
+UNKNOWN = "Unknown (Level 0)"
+
+
+def box_iou(a: Location, b: Location) -> float:
+    top, right, bottom, left = max(a[0], b[0]), min(a[1], b[1]), min(a[2], b[2]), max(a[3], b[3])
+    inter = max(0, right - left) * max(0, bottom - top)
+    area = lambda box: max(0, box[1] - box[3]) * max(0, box[2] - box[0])
+    union = area(a) + area(b) - inter
+    return inter / union if union else 0.0
+
+
+class Track:
+    __slots__ = ("id", "box", "name", "distance", "hits", "missed", "verified_at", "needs_verify")
+
+    def __init__(self, track_id: int, box: Location):
+        self.id = track_id
+        self.box = box
+        self.name: Optional[str] = None      # cached identity label, e.g. "Ana (L1)"
+        self.distance = float("inf")
+        self.hits = 1
+        self.missed = 0
+        self.verified_at = float("-inf")
+        self.needs_verify = True
+
+
+class FaceTracker:
+    """
+    Carries face identities across frames so a person standing in view is
+    encoded once, not every frame. Boxes are associated greedily by IoU,
+    falling back to centroid distance for fast movers. A track is
+    (re-)verified when it is new, every `reverify_after` seconds, and after
+    it was missed for a frame (it may be someone else now). Tracks unseen
+    for `max_missed` processed frames are dropped and reported as lost; a
+    person who comes back gets a new track and a fresh identification.
+    """
+    def __init__(self, iou_threshold: float = 0.3, max_missed: int = 5, reverify_after: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.reverify_after = reverify_after
+        self.clock = clock
+        self.tracks: List[Track] = []
+        self.lock = threading.Lock()
+        self._next_id = 1
+        self._last_seq = -1
+
+    def update(self, locations: List[Location], seq: Optional[int] = None) -> Tuple[List[Optional[Track]], List[Track]]:
+        """
+        Associates this frame's boxes with tracks. Returns (track per box, lost tracks).
+        A frame older than one already applied (possible with several workers) is only
+        looked up, never allowed to move or create tracks; its unmatched boxes get None.
+        """
+        with self.lock:
+            stale = seq is not None and seq < self._last_seq
+            if seq is not None and not stale:
+                self._last_seq = seq
+            assigned = self._associate(locations)
+            if stale:
+                return assigned, []
+            for track in self.tracks:
+                if track not in assigned:
+                    track.missed += 1
+            for i, box in enumerate(locations):
+                track = assigned[i]
+                if track is None:
+                    track = assigned[i] = Track(self._next_id, box)
+                    self._next_id += 1
+                    self.tracks.append(track)
+                    continue
+                if track.missed:
+                    track.needs_verify = True
+                track.box, track.missed = box, 0
+                track.hits += 1
+            lost = [t for t in self.tracks if t.missed > self.max_missed]
+            self.tracks = [t for t in self.tracks if t.missed <= self.max_missed]
+            return assigned, lost
+
+    def due(self, track: Optional[Track]) -> bool:
+        return track is None or track.needs_verify or self.clock() - track.verified_at >= self.reverify_after
+
+    def identify(self, track: Track, name: str, distance: float) -> bool:
+        """Caches an identity; True when it is new or changed (worth an alert)."""
+        with self.lock:
+            changed = track.name != name
+            track.name, track.distance = name, distance
+            track.verified_at, track.needs_verify = self.clock(), False
+            return changed
+
+    def _associate(self, locations: List[Location]) -> List[Optional[Track]]:
+        pairs = []
+        for i, box in enumerate(locations):
+            for track in self.tracks:
+                iou = box_iou(box, track.box)
+                if iou >= self.iou_threshold or self._near(box, track.box):
+                    pairs.append((iou, -self._centroid_gap(box, track.box), i, track))
+        pairs.sort(key=lambda p: (p[0], p[1]), reverse=True)
+        assigned: List[Optional[Track]] = [None] * len(locations)
+        used = set()
+        for _, _, i, track in pairs:
+            if assigned[i] is None and track.id not in used:
+                assigned[i] = track
+                used.add(track.id)
+        return assigned
+
+    @staticmethod
+    def _centroid_gap(a: Location, b: Location) -> float:
+        return float(np.hypot((a[1] + a[3] - b[1] - b[3]) / 2, (a[0] + a[2] - b[0] - b[2]) / 2))
+
+    def _near(self, a: Location, b: Location) -> bool:
+        size = max(a[1] - a[3], a[2] - a[0], 1)
+        return self._centroid_gap(a, b) <= 0.5 * size
+
+
+class DetectionPipeline:
+    """
+    gate -> detect -> (track) -> encode -> match for one frame at a time.
+    `detect`, `encode` and `match` are injected (face_recognition in the
+    guardian, fakes in the benchmark). Frames the gate rejects reuse the
+    last result. With a `FaceTracker`, only faces on new or due tracks are
+    encoded; results then also carry `new` (identities just established,
+    i.e. alerts) and `lost` (tracks that left).
+    """
+    def __init__(self, detect: Callable[[np.ndarray], List[Location]],
+                 encode: Callable[[np.ndarray, List[Location]], List[np.ndarray]],
+                 match: Callable[[np.ndarray], List[List[Tuple[str, float]]]],
+                 gate: Optional[MotionGate] = None, detect_scale: float = 0.25,
+                 tracker: Optional[FaceTracker] = None):
+        self.detect = detect
+        self.encode = encode
+        self.match = match
+        self.gate = gate or MotionGate()
+        self.detect_scale = detect_scale
+        self.tracker = tracker
+        self.timer = StageTimer()
+        self.encoded = 0   # faces run through `encode`
+        self._seq = 0
+        self._count_lock = threading.Lock()
+        self.last: Dict[str, Any] = {"detected": False, "names": [], "locations": [], "new": [], "lost": []}
+
+    def process(self, frame: np.ndarray) -> Dict[str, Any]:
+        """Result for this frame: `detected` says whether detection actually ran."""
+        start = time.perf_counter()
+        seq, self._seq = self._seq, self._seq + 1
+        run = self.timer.timed("gate", self.gate.check, frame)
+        if not run:
+            self.timer.add("frame", time.perf_counter() - start)
+            return {**self.last, "detected": False, "new": [], "lost": [], "motion": self.gate.last_ratio}
+
+        self.last = {**self.analyze(frame, seq), "motion": self.gate.last_ratio}
+        self.timer.add("frame", time.perf_counter() - start)
+        return self.last
+
+    def analyze(self, frame: np.ndarray, seq: Optional[int] = None) -> Dict[str, Any]:
+        """The detect/track/encode/match stages; workers may call this concurrently."""
+        rgb = self.timer.timed("prepare", self._prepare, frame)
+        locations = self.timer.timed("detect", self.detect, rgb)
+        if self.tracker is None:
+            names = [name for name, _ in self._identify(rgb, locations)]
+            return {"detected": True, "names": names, "locations": locations, "new": list(names), "lost": []}
+
+        tracks, lost = self.timer.timed("track", self.tracker.update, locations, seq)
+        due = [i for i, track in enumerate(tracks) if self.tracker.due(track)]
+        names = [track.name if track is not None else None for track in tracks]
+        new = []
+        for i, (name, distance) in zip(due, self._identify(rgb, [locations[i] for i in due])):
+            names[i] = name
+            if tracks[i] is not None and self.tracker.identify(tracks[i], name, distance):
+                new.append(name)
+        return {"detected": True, "names": [n or UNKNOWN for n in names], "locations": locations,
+                "tracks": [t.id if t is not None else None for t in tracks], "new": new,
+                "lost": [t.name or UNKNOWN for t in lost]}
+
+    def _identify(self, rgb: np.ndarray, locations: List[Location]) -> List[Tuple[str, float]]:
+        if not locations:
+            return []
+        with self._count_lock:
+            self.encoded += len(locations)
+        encodings = self.timer.timed("encode", self.encode, rgb, locations)
+        matches = self.timer.timed("match", self.match, np.array(encodings))
+        return [found[0] if found else (UNKNOWN, float("inf")) for found in matches]
+
+    def report(self) -> Dict[str, Any]:
+        return {"frames": self.gate.frames, "skip_ratio": round(self.gate.skip_ratio, 3), "faces_encoded": self.encoded,
+                "stages": self.timer.report()}
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        # BGR camera frame -> downscaled RGB for the detector
+        if cv2 is not None and self.detect_scale != 1.0:
+            frame = cv2.resize(frame, (0, 0), fx=self.detect_scale, fy=self.detect_scale)
+        elif self.detect_scale != 1.0:
+            step = max(1, int(round(1 / self.detect_scale)))
+            frame = frame[::step, ::step]
+        return np.ascontiguousarray(frame[:, :, ::-1])
+
+
+class DropOldestQueue:
+    """
+    Bounded queue where a put on a full queue evicts the oldest item instead
+    of blocking. `put(item, block=True)` waits for room instead, for offline
+    runs that must see every frame.
+    """
+    def __init__(self, maxsize: int, on_drop: Optional[Callable[[Any], None]] = None):
+        self.maxsize = maxsize
+        self.on_drop = on_drop
+        self.dropped = 0
+        self._items: deque = deque()
+        self._ready = threading.Condition()
+        self._closed = False
+
+    def put(self, item: Any, block: bool = False):
+        with self._ready:
+            if block:
+                self._ready.wait_for(lambda: len(self._items) < self.maxsize or self._closed)
+            if len(self._items) >= self.maxsize:
+                evicted = self._items.popleft()
+                self.dropped += 1
+                if self.on_drop:
+                    self.on_drop(evicted)
+            self._items.append(item)
+            self._ready.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Next item, or None once the queue is closed and drained (or on timeout)."""
+        with self._ready:
+            if not self._ready.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            item = self._items.popleft() if self._items else None
+            self._ready.notify_all()
+            return item
+
+    def close(self):
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+
+
+class ThreadedPipeline:
+    """
+    Capture, detection and output on separate threads, so a slow detector
+    never lets frames pile up in the camera driver.
+
+    - The capture thread reads continuously, runs the (cheap, stateful) motion
+      gate in frame order and feeds a drop-oldest queue of `queue_size`.
+    - `workers` threads run `DetectionPipeline.analyze`. cv2 releases the GIL;
+      whether more than one worker helps depends on the detector doing so too.
+    - `results()` yields results in capture order. Frames evicted from the
+      queue are skipped, and results older than `max_age` are marked stale,
+      so alerts always come from recent frames.
+
+    `lossless=True` makes capture wait for a free slot instead of dropping,
+    for benchmarks that replay a recording as fast as it can be processed.
+    """
+    def __init__(self, read_frame: Callable[[], Tuple[bool, Optional[np.ndarray]]], pipeline: DetectionPipeline,
+                 workers: int = 2, queue_size: int = 2, max_age: float = 1.0, lossless: bool = False):
+        self.read_frame = read_frame
+        self.pipeline = pipeline
+        self.max_age = max_age
+        self.lossless = lossless
+        self.frames = DropOldestQueue(queue_size, on_drop=lambda item: self._finish(item[0], None))
+        self.metrics: Dict[str, Any] = {"captured": 0, "emitted": 0, "stale": 0, "latency_s": deque(maxlen=1000)}
+
+        self._pending: List[Tuple[int, Dict[str, Any]]] = []   # heap of finished results by seq
+        self._dropped: set = set()
+        self._next_seq = 0
+        self._done = threading.Condition()
+        self._stopped = threading.Event()
+        self._capture_done = False
+        self._started_at = 0.0
+        self._threads = [threading.Thread(target=self._capture_loop, name="capture", daemon=True)]
+        self._threads += [threading.Thread(target=self._worker_loop, name=f"detect-{i}", daemon=True) for i in range(workers)]
+        self._last_detected: Dict[str, Any] = {"names": [], "locations": []}
+        self.error: Optional[Exception] = None
+
+    def start(self) -> "ThreadedPipeline":
+        self._started_at = time.perf_counter()
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self.frames.close()
+        for thread in self._threads:
+            thread.join(timeout=2)
+
+    def results(self) -> Iterator[Dict[str, Any]]:
+        """Ordered results until the source runs dry or `stop()` is called."""
+        while True:
+            with self._done:
+                self._done.wait_for(self._has_output, timeout=0.5)
+                ready = self._release()
+                finished = not ready and self._capture_done and self._next_seq >= self.metrics["captured"]
+            for result in ready:
+                yield result
+            if finished or (self._stopped.is_set() and not ready):
+                if self.error is not None:
+                    raise self.error
+                return
+
+    def report(self) -> Dict[str, Any]:
+        latencies = sorted(self.metrics["latency_s"])
+        elapsed = max(time.perf_counter() - self._started_at, 1e-9)
+        pick = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1) if latencies else 0.0
+        return {
+            "captured": self.metrics["captured"],
+            "emitted": self.metrics["emitted"],
+            "dropped": self.frames.dropped,
+            "stale": self.metrics["stale"],
+            "fps": round(self.metrics["emitted"] / elapsed, 1),
+            "latency_ms": {"p50": pick(0.5), "p95": pick(0.95), "max": pick(1.0)},
+            **self.pipeline.report(),
+        }
+
+    # === Stages ===
+    def _capture_loop(self):
+        seq = 0
+        try:
+            while not self._stopped.is_set():
+                ok, frame = self.read_frame()
+                if not ok:
+                    break
+                captured_at = time.perf_counter()
+                run = self.pipeline.timer.timed("gate", self.pipeline.gate.check, frame)
+                with self._done:
+                    self.metrics["captured"] = seq + 1
+                self.frames.put((seq, captured_at, frame, run, self.pipeline.gate.last_ratio), block=self.lossless)
+                seq += 1
+        except Exception as e:
+            self._fail(e)
+        finally:
+            # Always let results() finish, even if the source or gate blew up.
+            with self._done:
+                self._capture_done = True
+                self._done.notify_all()
+            self.frames.close()
+
+    def _worker_loop(self):
+        while True:
+            item = self.frames.get()
+            if item is None:
+                return
+            seq, captured_at, frame, run, motion = item
+            try:
+                result = self.pipeline.analyze(frame, seq) if run else {"detected": False, "new": [], "lost": []}
+            except Exception as e:
+                self._finish(seq, None)
+                self._fail(e)
+                return
+            self._finish(seq, {**result, "seq": seq, "frame": frame, "captured_at": captured_at, "motion": motion})
+
+    def _fail(self, error: Exception):
+        if self.error is None:
+            self.error = error
+        self._stopped.set()
+        self.frames.close()
+
+    def _finish(self, seq: int, result: Optional[Dict[str, Any]]):
+        with self._done:
+            if result is None:
+                self._dropped.add(seq)
+            else:
+                heapq.heappush(self._pending, (seq, result))
+            self._done.notify_all()
+
+    def _has_output(self) -> bool:
+        return (self._next_seq in self._dropped or (self._pending and self._pending[0][0] == self._next_seq)
+                or self._capture_done)
+
+    def _release(self) -> List[Dict[str, Any]]:
+        ready = []
+        while True:
+            if self._next_seq in self._dropped:
+                self._dropped.discard(self._next_seq)
+            elif self._pending and self._pending[0][0] == self._next_seq:
+                result = heapq.heappop(self._pending)[1]
+                if result["detected"]:
+                    self._last_detected = result
+                else:
+                    # Gate skipped it: carry forward what the last detection saw.
+                    result.update(names=self._last_detected["names"], locations=self._last_detected["locations"])
+                now = time.perf_counter()
+                result["stale"] = now - result["captured_at"] > self.max_age
+                self.metrics["stale"] += result["stale"]
+                self.metrics["emitted"] += 1
+                self.metrics["latency_s"].append(now - result["captured_at"])
+                ready.append(result)
+            else:
+                return ready
+            self._next_seq += 1
+
+
+# === Benchmark: a static room, then someone walks in and stands still ===
+if __name__ == "__main__":
+    DETECT_COST_S = 0.01  # stand-in for HOG face_locations on a Pi (really ~100 ms+)
+    from frame_sources import SyntheticSource
+    frames = 600
+
+    def fake_detect(rgb):
+        time.sleep(DETECT_COST_S)
+        cols = np.where((rgb[:, :, 0] > 225).any(axis=0))[0]
+        return [(30, int(cols[-1]), 90, int(cols[0]))] if len(cols) else []
+
+    def fake_encode(rgb, locations):
+        return [np.full(128, 0.1, dtype=np.float32) for _ in locations]
+
+    def fake_match(encodings):
+        return [[("Visitor (L2)", 0.2)] for _ in encodings]
+
+    source = SyntheticSource(frames=frames)
+    stream = [frame for ok, frame in iter(source.read, (False, None))]
+    present = [source.person_present(i) for i in range(frames)]
+
+    def run(gate):
+        pipeline = DetectionPipeline(fake_detect, fake_encode, fake_match, gate=gate)
+        start = time.perf_counter()
+        results = [pipeline.process(frame) for frame in stream]
+        return pipeline, results, time.perf_counter() - start
+
+    always, _, always_s = run(MotionGate(threshold=0.0))
+    gated, results, gated_s = run(MotionGate())
+    # Frames with someone present whose last available result did not include them
+    missed = sum(1 for i, r in enumerate(results) if present[i] and not r["names"] and i > 252)
+
+    print(f"--- Motion-gated detection ({frames} frames, person in frames 250-449) ---")
+    print(f"Detect every frame : {always_s:6.2f} s")
+    print(f"Motion-gated       : {gated_s:6.2f} s, skip ratio {gated.gate.skip_ratio:.1%}, missed frames {missed}")
+    for name, stats in gated.report()["stages"].items():
+        print(f"  {name:<8} {stats['calls']:>5} calls  avg {stats['avg_ms']:8.3f} ms  max {stats['max_ms']:8.3f} ms")
+
+    # --- Serial loop vs. threaded stages, against a 30 fps camera with a driver buffer ---
+    class SimulatedCamera:
+        """Frame i appears at i/fps; the driver keeps the newest `buffer` frames, like a V4L2 queue."""
+        def __init__(self, frames, fps=30.0, buffer=32):
+            self.frames, self.fps, self.buffer = frames, fps, buffer
+            self.births: List[float] = []
+            self._next = 0
+            self._t0 = time.perf_counter()
+
+        def read(self):
+            newest = int((time.perf_counter() - self._t0) * self.fps)
+            index = max(self._next, newest - self.buffer + 1)
+            if index >= len(self.frames):
+                return False, None
+            wait = self._t0 + index / self.fps - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            self._next = index + 1
+            self.births.append(self._t0 + index / self.fps)
+            return True, self.frames[index]
+
+    slow_detect = lambda rgb: (time.sleep(0.05), fake_detect(rgb))[1]  # every frame busy, 50 ms detector
+    moving = [stream[250 + i % 150] for i in range(300)]
+
+    camera = SimulatedCamera(moving)
+    serial = DetectionPipeline(slow_detect, fake_encode, fake_match, gate=MotionGate(threshold=0.0))
+    serial_latency = []
+    while True:
+        ok, frame = camera.read()
+        if not ok:
+            break
+        serial.process(frame)
+        serial_latency.append(time.perf_counter() - camera.births[-1])
+
+    p95 = lambda values: sorted(values)[int(len(values) * 0.95)] * 1000
+    print(f"--- Serial vs. threaded (300 frames at 30 fps, 50 ms detector) ---")
+    print(f"Serial       : {len(serial_latency)} frames processed, latency p95 {p95(serial_latency):7.1f} ms, "
+          f"max {max(serial_latency) * 1000:7.1f} ms")
+    for workers in (1, 2):
+        camera = SimulatedCamera(moving)
+        threaded = ThreadedPipeline(camera.read, DetectionPipeline(slow_detect, fake_encode, fake_match,
+                                                                   gate=MotionGate(threshold=0.0)), workers=workers).start()
+        threaded_latency = [time.perf_counter() - camera.births[r["seq"]] for r in threaded.results()]
+        threaded.stop()
+        report = threaded.report()
+        print(f"Threaded x{workers}  : {report['emitted']} emitted, {report['dropped']} dropped, {report['fps']} fps, "
+              f"latency p95 {p95(threaded_latency):7.1f} ms, max {max(threaded_latency) * 1000:7.1f} ms")
+
+    # --- Tracking: a two-minute visit at 30 fps, encoding every frame vs. per track ---
+    rng = np.random.default_rng(3)
+    script = []   # detector output per frame
+    for i in range(3600):
+        boxes = []
+        if i < 1800 or 1860 <= i < 2400:                        # Ana stands, leaves for 2 s, comes back
+            if rng.random() > 0.03:                              # detector misses her now and then
+                dy, dx = rng.integers(-4, 5, 2)
+                boxes.append((100 + dy, 300 + dx, 300 + dy, 100 + dx))
+        if 600 <= i < 900:                                       # Ben walks across the room
+            x = 400 + (i - 600) * 3
+            boxes.append((120, x + 180, 300, x))
+        script.append(boxes)
+    clock = [0.0]
+
+    def box_encode(rgb, locations):
+        # The "encoding" remembers where the face was, so the fake matcher can tell Ana from Ben.
+        return [np.full(128, box[3], dtype=np.float32) for box in locations]
+
+    def box_match(encodings):
+        return [[("Ana (L1)" if encoding[0] < 250 else "Ben (L2)", 0.3)] for encoding in encodings]
+
+    def run_visit(tracker):
+        frames_iter = iter(script)
+        pipeline = DetectionPipeline(lambda rgb: next(frames_iter), box_encode, box_match, tracker=tracker)
+        alerts, left = [], []
+        blank = np.zeros((8, 8, 3), dtype=np.uint8)
+        for i in range(len(script)):
+            clock[0] = i / 30
+            result = pipeline.analyze(blank, seq=i)
+            alerts += [(i, name) for name in result["new"]]
+            left += [(i, name) for name in result["lost"]]
+        return pipeline, alerts, left
+
+    untracked, _, _ = run_visit(None)
+    tracker = FaceTracker(clock=lambda: clock[0])
+    tracked, alerts, left = run_visit(tracker)
+    minutes = len(script) / 30 / 60
+    print(f"--- Face tracking ({len(script)} frames = {minutes:.0f} min, 1-2 people in view) ---")
+    print(f"Encode every face : {untracked.encoded:5d} encodings ({untracked.encoded / minutes:7.0f}/min)")
+    print(f"Tracked           : {tracked.encoded:5d} encodings ({tracked.encoded / minutes:7.0f}/min), "
+          f"re-verify every {tracker.reverify_after:.0f} s")
+    print(f"Alerts            : {alerts}")
+    print(f"Left              : {left}")
+    assert [name for _, name in alerts] == ["Ana (L1)", "Ben (L2)", "Ana (L1)"], alerts
+    assert [name for _, name in left] == ["Ben (L2)", "Ana (L1)", "Ana (L1)"], left